@@ -0,0 +1,158 @@
+"""
+Precomputed sprite atlas: every sprite in pokemon_data.csv normalized once to a 100x100 RGBA tile.
+
+The atlas is one raw file of back-to-back RGBA tiles plus a JSON index keyed by catalog row.
+The bot memory-maps it at startup, so a roster grid is just a few tile copies: no network,
+no decoding and no resampling.
+
+Build (re-run whenever pokemon_data.csv or the sprite URLs change):
+    python atlas.py
+"""
+import os
+import io
+import json
+import mmap
+import asyncio
+import logging
+
+import config
+from PIL import Image
+
+logger = logging.getLogger("atlas")
+
+TILE_SIZE = 100
+TILE_BYTES = TILE_SIZE * TILE_SIZE * 4  # RGBA
+ATLAS_VERSION = 1
+
+
+def normalize_tile(image):
+    """Shrinks the sprite to fit a 100x100 tile (never upscales) and centers it on a transparent background."""
+    image = image.convert("RGBA")
+    image.thumbnail((TILE_SIZE, TILE_SIZE))
+    tile = Image.new("RGBA", (TILE_SIZE, TILE_SIZE), (255, 255, 255, 0))
+    tile.paste(image, ((TILE_SIZE - image.width) // 2, (TILE_SIZE - image.height) // 2), image)
+    return tile
+
+
+# ==========================================
+# 🗺️ MEMORY-MAPPED ATLAS
+# ==========================================
+
+class SpriteAtlas:
+    def __init__(self, path, index_path):
+        self.path = path
+        self.index_path = index_path
+        self.buffer = None  # mmap of the tile file
+        self.by_name = {}  # {name: (tile number, sprite url)}
+        self.load_attempted = False
+        self.stats = {"hits": 0, "misses": 0}
+
+    def load(self):
+        """Memory-maps the atlas. Returns False (and the bot falls back to the sprite cache) if it was never built."""
+        self.load_attempted = True
+        if not (os.path.exists(self.path) and os.path.exists(self.index_path)):
+            logger.info("No sprite atlas found, roster images will use the sprite cache (run atlas.py to build it)")
+            return False
+
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") != ATLAS_VERSION or index.get("tile_size") != TILE_SIZE:
+                logger.warning("Sprite atlas was built with another format, ignoring it (rebuild with atlas.py)")
+                return False
+
+            with open(self.path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(buffer) != index["tiles"] * TILE_BYTES:
+                logger.warning("Sprite atlas size does not match its index, ignoring it (rebuild with atlas.py)")
+                return False
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Failed to load sprite atlas: {e}")
+            return False
+
+        self.buffer = buffer
+        self.by_name = {entry["name"]: (entry["tile"], entry["sprite"]) for entry in index["rows"].values()}
+        logger.info(f"Sprite atlas loaded: {index['tiles']} tiles for {len(self.by_name)} Pokemon")
+        return True
+
+    def tile(self, name, sprite_url):
+        """
+        Returns the 100x100 RGBA tile for this Pokemon, or None if it isn't in the atlas
+        (or the CSV now points to a different sprite than the one the atlas was built from).
+        The image reads straight from the memory map; paste it, don't modify it.
+        """
+        if self.buffer is None and not self.load_attempted:
+            self.load()
+
+        entry = self.by_name.get(name)
+        if self.buffer is None or entry is None or entry[1] != sprite_url:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        offset = entry[0] * TILE_BYTES
+        view = memoryview(self.buffer)[offset:offset + TILE_BYTES]
+        return Image.frombuffer("RGBA", (TILE_SIZE, TILE_SIZE), view, "raw", "RGBA", 0, 1)
+
+
+sprite_atlas = SpriteAtlas(config.SPRITE_ATLAS_FILE, config.SPRITE_ATLAS_INDEX)
+
+
+# ==========================================
+# 🏗️ BUILD STEP
+# ==========================================
+
+async def build_atlas(pokemon_db, path, index_path):
+    """
+    Downloads (through the sprite cache) and normalizes every sprite in the catalog, then writes
+    the tile file and its index. Rows sharing a sprite URL share a tile. Returns the index dict.
+    """
+    import sprites
+    import http_pool
+
+    urls = sorted({url for url in pokemon_db.sprites if url.startswith("http")})
+    try:
+        images = await asyncio.gather(*(sprites.sprite_cache.get(url) for url in urls))
+    finally:
+        await http_pool.close()
+
+    tiles = io.BytesIO()
+    tile_of = {}
+    for url, image in zip(urls, images):
+        if image is None:
+            logger.warning(f"Skipping sprite that could not be fetched: {url}")
+            continue
+        tile_of[url] = len(tile_of)
+        tiles.write(normalize_tile(image).tobytes())
+
+    index = {
+        "version": ATLAS_VERSION,
+        "tile_size": TILE_SIZE,
+        "tiles": len(tile_of),
+        "rows": {str(row_id): {"name": name, "sprite": sprite, "tile": tile_of[sprite]}
+                 for row_id, (name, sprite) in enumerate(zip(pokemon_db.names, pokemon_db.sprites))
+                 if sprite in tile_of}
+    }
+
+    # Write to temp files first so a running bot never maps a half-written atlas
+    for target, payload, mode in ((path, tiles.getvalue(), "wb"), (index_path, json.dumps(index), "w")):
+        with open(target + ".tmp", mode) as f:
+            f.write(payload)
+        os.replace(target + ".tmp", target)
+
+    return index
+
+
+def main():
+    import logic
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s | %(name)s | %(message)s")
+    logic.load_data()
+    index = asyncio.run(build_atlas(logic.pokemon_db, config.SPRITE_ATLAS_FILE, config.SPRITE_ATLAS_INDEX))
+    size_mb = index["tiles"] * TILE_BYTES / (1024 * 1024)
+    print(f"🗺️ Atlas built: {index['tiles']} tiles ({size_mb:.1f} MB) covering {len(index['rows'])} of "
+          f"{len(logic.pokemon_db)} catalog rows -> {config.SPRITE_ATLAS_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Benchmark suite for the draft hot paths.
+
+Times logic.load_data and the candidate/tier/odds/roll queries at early, mid and late draft states
+for several table sizes, plus a full silent draft through engine.next_turn against stub channels.
+Results are written as JSON so two commits can be compared.
+
+Usage:
+    python benchmarks/bench_draft.py --json before.json
+    python benchmarks/bench_draft.py --json after.json --compare before.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # config.CSV_FILE is relative to the repo root
+
+import config
+import logic
+
+PLAYER_COUNTS = (2, 8, 24)
+# Pick number of the player being queried; the table is pre-filled up to the round before it
+STAGES = {"early": 1, "mid": 6, "late": config.TOTAL_POKEMON}
+
+
+class BenchPlayer:
+    """Minimal player object (no .send, so the engine skips every DM)."""
+
+    def __init__(self, player_id):
+        self.id = player_id
+        self.display_name = f"Bench_{player_id}"
+        self.mention = f"@Bench_{player_id}"
+
+
+class StubChannel:
+    """Thread stand-in that accepts and drops every message."""
+    id = 0
+    jump_url = "https://discord.com/channels/0/0"
+
+    def __init__(self):
+        self.parent = self
+        self.sent = 0
+
+    async def send(self, *args, **kwargs):
+        self.sent += 1
+
+
+class NoSleepAsyncio:
+    """Stand-in for engine's `asyncio` module: pacing sleeps only yield once, everything else is the real asyncio."""
+
+    def __getattr__(self, name):
+        return getattr(asyncio, name)
+
+    @staticmethod
+    async def sleep(delay, result=None):
+        return await asyncio.sleep(0, result)
+
+
+# ==========================================
+# ⏱️ HELPERS
+# ==========================================
+
+def time_call(func, repeat):
+    """Median wall time of one call in microseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return round(statistics.median(samples), 2)
+
+
+def build_session(num_players, pick_number, seed=1234):
+    """Plays auto picks until every player is about to make `pick_number`."""
+    random.seed(seed)
+    session = logic.DraftSession(thread_id=None, players=[BenchPlayer(i) for i in range(num_players)])
+    for _ in range(pick_number - 1):
+        for player in session.order:
+            pick = len(session.rosters[player.id]) + 1
+            logic.reset_burned(session)
+            tiers = logic.get_valid_tiers(session, player.id, pick)
+            name, tier, sprite = logic.roll_pokemon(session, tiers, player.id, pick)
+            if name:
+                logic.record_pick(session, player.id, name, tier, sprite)
+        session.order.reverse()
+    return session
+
+
+# ==========================================
+# 🏃 BENCHMARKS
+# ==========================================
+
+def bench_load_data(repeat):
+    return {"load_data_us": time_call(logic.load_data, repeat)}
+
+
+def bench_queries(repeat):
+    """
+    Every query is timed cold (state version bumped before each call, like the first call of a turn)
+    and warm (served by the turn cache, like the repeated calls within the same turn).
+    """
+    results = {}
+    for num_players in PLAYER_COUNTS:
+        for stage, pick in STAGES.items():
+            session = build_session(num_players, pick)
+            uid = session.order[0].id
+            tiers = logic.get_valid_tiers(session, uid, pick)
+
+            def cold(func):
+                def run():
+                    logic.bump_state_version(session)
+                    func()
+                return run
+
+            queries = {
+                "get_valid_candidates": lambda: logic.get_valid_candidates(session, uid, pick),
+                "get_valid_tiers": lambda: logic.get_valid_tiers(session, uid, pick),
+                "calculate_tier_percentages": lambda: logic.calculate_tier_percentages(session, uid, pick),
+                "roll_pokemon": lambda: logic.roll_pokemon(session, tiers, uid, pick),
+            }
+            row = {}
+            for label, func in queries.items():
+                row[f"{label}_cold_us"] = time_call(cold(func), repeat)
+                row[f"{label}_warm_us"] = time_call(func, repeat)
+            results[f"{num_players}p_{stage}"] = row
+    return results
+
+
+def bench_silent_draft(repeat):
+    """Full Mode 2 draft through engine.next_turn. The per-pick pacing sleeps are skipped to time CPU only."""
+    import engine
+    import history
+    import outbound
+
+    history.draft_history = history.DraftHistory(":memory:")  # Don't mix benchmark drafts into the real history
+
+    results = {}
+    real_scheduler = outbound.scheduler
+    engine.asyncio = NoSleepAsyncio()  # Only engine's own sleeps are skipped, not the global asyncio.sleep
+    try:
+        for num_players in PLAYER_COUNTS:
+            samples = []
+            for run in range(repeat):
+                random.seed(run)
+                session = logic.DraftSession(thread_id=None, auto_mode=2,
+                                             players=[BenchPlayer(i) for i in range(num_players)])
+                # Unbounded bucket: the stub channel has no rate limit, so time the engine, not the pacing
+                outbound.scheduler = outbound.OutboundScheduler(bucket_limit=float("inf"),
+                                                                bucket_window=config.OUTBOUND_BUCKET_WINDOW,
+                                                                max_retries=config.OUTBOUND_MAX_RETRIES)
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    asyncio.run(engine.next_turn(session, StubChannel(), None))
+                samples.append((time.perf_counter() - start) * 1000)
+            results[f"{num_players}p"] = {"silent_draft_ms": round(statistics.median(samples), 2)}
+    finally:
+        engine.asyncio = asyncio
+        outbound.scheduler = real_scheduler
+    return results
+
+
+# ==========================================
+# 📊 REPORTING
+# ==========================================
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=ROOT).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def flatten(results, prefix=""):
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)):
+            yield f"{prefix}{key}", value
+
+
+def print_comparison(current, baseline):
+    old = dict(flatten(baseline["results"]))
+    print(f"\nComparison against {baseline.get('revision') or 'baseline'}:")
+    for key, value in flatten(current["results"]):
+        if key in old and old[key]:
+            change = (value - old[key]) / old[key] * 100
+            flag = "⚠️" if change > 10 else "  "
+            print(f"{flag} {key:<60} {old[key]:>12.2f} -> {value:>12.2f} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="Samples per query benchmark (median is kept)")
+    parser.add_argument("--draft-repeat", type=int, default=5, help="Full silent drafts per table size")
+    parser.add_argument("--skip-engine", action="store_true", help="Skip the engine.next_turn draft benchmark")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Previous JSON results to diff against")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    results = {"load": bench_load_data(max(1, args.repeat // 20)), "queries": bench_queries(args.repeat)}
+    if not args.skip_engine:
+        results["engine"] = bench_silent_draft(args.draft_repeat)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "catalog_rows": len(logic.pokemon_db),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Cold-start benchmark: compact stdlib catalog vs. the legacy pandas load_data().
+
+Every sample runs in a fresh interpreter so import costs are really paid.
+Usage:  python benchmarks/bench_startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CSV_PATH = os.path.join(ROOT, "pokemon_data.csv")
+CACHE_PATH = os.path.join(tempfile.gettempdir(), "bench_startup.catalog")
+
+# Each probe prints {"import_ms", "load_ms", "rows", "rss_kb"} as JSON.
+PROBE_HEADER = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+"""
+
+PROBE_FOOTER = """
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "load_ms": (t2 - t1) * 1000,
+    "rows": rows,
+    "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+"""
+
+COMPACT_PROBE = """
+import catalog
+t1 = time.perf_counter()
+rows = len(catalog.load_catalog({csv!r}))
+"""
+
+# Binary cache hit (the cache file is written by warm_cache() before the runs)
+CACHED_PROBE = """
+import catalog
+t1 = time.perf_counter()
+rows = len(catalog.load_catalog_cached({csv!r}, {cache!r}))
+"""
+
+# Replica of the pre-catalog logic.load_data() (pandas DataFrame + row-wise apply)
+LEGACY_PROBE = """
+import pandas as pd
+from catalog import normalize_root
+t1 = time.perf_counter()
+db = pd.read_csv({csv!r})
+db.columns = db.columns.str.strip().str.lower()
+db['mega'] = db['mega'].str.strip().str.upper()
+db['root_name'] = db.apply(lambda r: normalize_root(r['name'], str(r['mega']).strip().upper() == 'Y'), axis=1)
+root_map = dict(zip(db['name'], db['root_name']))
+rows = len(db)
+"""
+
+
+def run_probe(body):
+    code = PROBE_HEADER.format(root=ROOT) + body.format(csv=CSV_PATH, cache=CACHE_PATH) + PROBE_FOOTER
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None, proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"
+    return json.loads(proc.stdout), None
+
+
+def summarize(samples):
+    return {
+        key: round(statistics.median(s[key] for s in samples), 2)
+        for key in ("import_ms", "load_ms", "rss_kb")
+    } | {"rows": samples[0]["rows"], "total_ms": round(
+        statistics.median(s["import_ms"] + s["load_ms"] for s in samples), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per loader (median is reported)")
+    args = parser.parse_args()
+
+    results = {}
+    sys.path.insert(0, ROOT)
+    import catalog
+    catalog.load_catalog_cached(CSV_PATH, CACHE_PATH)  # Warm the binary cache
+
+    for label, body in (("compact", COMPACT_PROBE), ("compact_cached", CACHED_PROBE), ("legacy_pandas", LEGACY_PROBE)):
+        samples = []
+        for _ in range(args.runs):
+            sample, error = run_probe(body)
+            if error:
+                print(f"{label}: skipped ({error})")
+                break
+            samples.append(sample)
+        if samples:
+            results[label] = summarize(samples)
+
+    for label, r in results.items():
+        print(f"{label:>14}: import {r['import_ms']:8.2f} ms | load {r['load_ms']:8.2f} ms | "
+              f"total {r['total_ms']:8.2f} ms | peak RSS {r['rss_kb'] / 1024:7.1f} MiB | rows {r['rows']}")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+In-process Discord stand-in for driving engine.next_turn without a gateway.
+
+Provides fake threads/channels, messages, members and interactions that record every API call
+into a FakeTransport, with simulated latency, per-channel rate-limit buckets (429s) and
+simulated button clicks on RollView/DraftView. Everything runs on a time scale so a
+one-hour interactive draft can be replayed in seconds and projected back to real time.
+"""
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+
+import discord
+
+import config
+
+# Captured before any time warp so the fake transport always sleeps for real
+real_sleep = asyncio.sleep
+
+ApiCall = namedtuple("ApiCall", ["endpoint", "route", "started", "latency", "status"])
+
+# Button labels as defined in views.py
+ROLL_LABEL = "🎰 Jala la palanca"
+KEEP_LABEL = "✅ Aceptar"
+REROLL_LABEL = "⟳ Reintentar"
+SUMMARY_LABEL = "📊 Resumen"
+
+_ids = itertools.count(1_000_000)
+
+
+# ==========================================
+# ⏳ TIME WARP
+# ==========================================
+
+@contextmanager
+def time_warp(scale):
+    """
+    Runs every asyncio.sleep (and the view timeouts) `scale` times faster or slower.
+    Inside the block, 1 simulated second takes `scale` real seconds.
+    """
+    async def scaled_sleep(delay, *args, **kwargs):
+        return await real_sleep(delay * scale, *args, **kwargs)
+
+    saved = asyncio.sleep, config.ROLL_TIMEOUT, config.DECISION_TIMEOUT
+    asyncio.sleep = scaled_sleep
+    config.ROLL_TIMEOUT *= scale
+    config.DECISION_TIMEOUT *= scale
+    try:
+        yield
+    finally:
+        asyncio.sleep, config.ROLL_TIMEOUT, config.DECISION_TIMEOUT = saved
+
+
+# ==========================================
+# 📡 TRANSPORT
+# ==========================================
+
+class FakeResponse:
+    """Enough of aiohttp.ClientResponse for discord.HTTPException."""
+
+    def __init__(self, status, reason, headers=None):
+        self.status = status
+        self.reason = reason
+        self.headers = headers or {}
+
+
+class FakeTransport:
+    """
+    Records every API call made through the fake objects.
+
+    latency: mean simulated seconds per request (jittered +-50%)
+    bucket_limit/bucket_window: per-channel message bucket (Discord allows ~5 sends per 5s per channel)
+    raise_on_429: raise discord.HTTPException instead of waiting out the bucket like discord.py does
+    """
+
+    def __init__(self, scale=1.0, latency=0.12, bucket_limit=5, bucket_window=5.0, raise_on_429=False, seed=None):
+        self.scale = scale
+        self.latency = latency
+        self.bucket_limit = bucket_limit
+        self.bucket_window = bucket_window
+        self.raise_on_429 = raise_on_429
+        self.rng = random.Random(seed)
+        self.calls = []
+        self.buckets = {}  # {bucket key: [simulated send times]}
+        self.started_at = time.perf_counter()
+
+    def now(self):
+        """Simulated seconds since the transport was created."""
+        return (time.perf_counter() - self.started_at) / self.scale
+
+    async def request(self, endpoint, **params):
+        """
+        Simulates one HTTP request: rate-limit bucket check, then network latency.
+        `endpoint` is the route template (e.g. "POST /channels/{channel_id}/messages").
+        Like Discord, every route of a channel shares that channel's bucket.
+        """
+        route = endpoint.format(**params)
+        bucket_key = params.get("channel_id", endpoint)
+        while True:
+            started = self.now()
+            sent = [t for t in self.buckets.get(bucket_key, []) if started - t < self.bucket_window]
+            self.buckets[bucket_key] = sent
+
+            if len(sent) >= self.bucket_limit:
+                retry_after = self.bucket_window - (started - sent[0])
+                self.calls.append(ApiCall(endpoint, route, started, 0.0, 429))
+                if self.raise_on_429:
+                    headers = {"Retry-After": f"{retry_after:.3f}", "X-RateLimit-Remaining": "0",
+                               "X-RateLimit-Reset-After": f"{retry_after:.3f}", "X-RateLimit-Bucket": str(bucket_key)}
+                    raise discord.HTTPException(FakeResponse(429, "Too Many Requests", headers),
+                                                "You are being rate limited.")
+                await real_sleep(retry_after * self.scale)
+                continue
+
+            sent.append(started)
+            latency = self.latency * self.rng.uniform(0.5, 1.5)
+            await real_sleep(latency * self.scale)
+            self.calls.append(ApiCall(endpoint, route, started, latency, 200))
+            return
+
+    def summary(self):
+        """Per-endpoint call counts and latency totals (simulated seconds)."""
+        by_endpoint = Counter()
+        latency = Counter()
+        for call in self.calls:
+            by_endpoint[call.endpoint] += 1
+            latency[call.endpoint] += call.latency
+        return {
+            "api_calls": sum(1 for c in self.calls if c.status == 200),
+            "rate_limited": sum(1 for c in self.calls if c.status == 429),
+            "api_time_s": round(sum(c.latency for c in self.calls), 3),
+            "by_endpoint": {endpoint: {"calls": n, "latency_s": round(latency[endpoint], 3)}
+                            for endpoint, n in by_endpoint.most_common()}
+        }
+
+
+# ==========================================
+# 👥 FAKE DISCORD OBJECTS
+# ==========================================
+
+class FakeRole:
+    def __init__(self, name):
+        self.id = next(_ids)
+        self.name = name
+        self.mention = f"<@&{self.id}>"
+
+
+class FakeMessage:
+    def __init__(self, channel, content=None, embed=None, view=None, file=None):
+        self.id = next(_ids)
+        self.channel = channel
+        self.content = content
+        self.embed = embed
+        self.view = view
+        self.file = file
+        self.deleted = False
+        self.jump_url = f"{channel.jump_url}/{self.id}"
+
+    async def edit(self, **kwargs):
+        await self.channel.transport.request("PATCH /channels/{channel_id}/messages/{message_id}",
+                                             channel_id=self.channel.id, message_id=self.id)
+        for key in ("content", "embed", "view"):
+            if key in kwargs:
+                setattr(self, key, kwargs[key])
+        if kwargs.get("view") is not None and self.channel.clicker:
+            self.channel.clicker.attach(self, kwargs["view"])
+        return self
+
+    async def delete(self):
+        await self.channel.transport.request("DELETE /channels/{channel_id}/messages/{message_id}",
+                                             channel_id=self.channel.id, message_id=self.id)
+        self.deleted = True
+
+
+class FakeChannel:
+    """Text channel or thread. Threads have a `.parent` channel."""
+
+    def __init__(self, transport, name, parent=None, clicker=None):
+        self.id = next(_ids)
+        self.name = name
+        self.transport = transport
+        self.parent = parent
+        self.clicker = clicker
+        self.mention = f"<#{self.id}>"
+        self.jump_url = f"https://discord.com/channels/0/{self.id}"
+        self.messages = []
+
+    async def send(self, content=None, *, embed=None, view=None, file=None, **kwargs):
+        await self.transport.request("POST /channels/{channel_id}/messages", channel_id=self.id)
+        message = FakeMessage(self, content, embed, view, file)
+        self.messages.append(message)
+        if view is not None and self.clicker:
+            self.clicker.attach(message, view)
+        return message
+
+
+class FakeMember:
+    def __init__(self, transport, name, roles=()):
+        self.id = next(_ids)
+        self.name = name
+        self.display_name = name
+        self.mention = f"<@{self.id}>"
+        self.roles = [FakeRole(r) if isinstance(r, str) else r for r in roles]
+        self.transport = transport
+        self.dm_channel = None
+        self.dms = []
+
+    async def send(self, content=None, *, embed=None, file=None, **kwargs):
+        if self.dm_channel is None:
+            await self.transport.request("POST /users/@me/channels")
+            self.dm_channel = FakeChannel(self.transport, f"dm-{self.name}")
+        message = await self.dm_channel.send(content, embed=embed, file=file)
+        self.dms.append(message)
+        return message
+
+
+class FakeInteractionResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    async def edit_message(self, **kwargs):
+        await self._ack("edit_message")
+
+    async def send_message(self, *args, **kwargs):
+        await self._ack("send_message")
+
+    async def _ack(self, kind):
+        self.done = True
+        started = self.interaction.transport.now()
+        await self.interaction.transport.request("POST /interactions/{interaction_id}/callback",
+                                                 interaction_id=self.interaction.id)
+        # Discord rejects interaction responses sent more than 3 seconds after the click
+        self.interaction.ack_delay = started - self.interaction.created_at
+
+
+class FakeInteraction:
+    def __init__(self, transport, user, message):
+        self.id = next(_ids)
+        self.transport = transport
+        self.user = user
+        self.message = message
+        self.created_at = transport.now()
+        self.ack_delay = None
+        self.response = FakeInteractionResponse(self)
+
+
+# ==========================================
+# 🖱️ SIMULATED PLAYERS
+# ==========================================
+
+class AutoClicker:
+    """
+    Clicks the draft buttons like a human would: waits a random think time, then presses
+    Roll, Keep, Reroll or Summary on behalf of the coach the view belongs to.
+    """
+
+    def __init__(self, transport, think_time=(2.0, 8.0), reroll_chance=0.3, summary_chance=0.05,
+                 timeout_chance=0.0, seed=None):
+        self.transport = transport
+        self.think_time = think_time
+        self.reroll_chance = reroll_chance
+        self.summary_chance = summary_chance
+        self.timeout_chance = timeout_chance
+        self.rng = random.Random(seed)
+        self.tasks = set()
+        self.interactions = []
+        self.think_samples = []
+
+    def attach(self, message, view):
+        if not any(getattr(child, "label", None) in (ROLL_LABEL, KEEP_LABEL) for child in view.children):
+            return
+        task = asyncio.get_running_loop().create_task(self.click_later(message, view))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def choose(self, view):
+        labels = {getattr(child, "label", None): child for child in view.children}
+        if ROLL_LABEL in labels:
+            return labels[ROLL_LABEL]
+        if SUMMARY_LABEL in labels and self.rng.random() < self.summary_chance:
+            return labels[SUMMARY_LABEL]
+        if self.rng.random() < self.reroll_chance:
+            return labels[REROLL_LABEL]
+        return labels[KEEP_LABEL]
+
+    async def click_later(self, message, view):
+        if self.rng.random() < self.timeout_chance:
+            return  # Let the view time out
+
+        think = self.rng.uniform(*self.think_time)
+        self.think_samples.append(think)
+        await real_sleep(think * self.transport.scale)
+        if view.is_finished():
+            return
+
+        button = self.choose(view)
+        interaction = FakeInteraction(self.transport, view.coach, message)
+        self.interactions.append(interaction)
+        await button.callback(interaction)
+
+    def summary(self):
+        acks = [i.ack_delay for i in self.interactions if i.ack_delay is not None]
+        return {
+            "clicks": len(self.interactions),
+            "mean_think_s": round(sum(self.think_samples) / len(self.think_samples), 3) if self.think_samples else 0.0,
+            "max_ack_delay_s": round(max(acks), 3) if acks else 0.0,
+            "late_acks": sum(1 for a in acks if a > 3.0)
+        }
+
+
+def build_guild(transport, num_players, clicker=None, thread_name=None):
+    """Creates a parent channel, the draft thread and `num_players` members with the Draft role."""
+    parent = FakeChannel(transport, "draft-announcements")
+    thread = FakeChannel(transport, thread_name or config.THREAD_NAME, parent=parent, clicker=clicker)
+    members = [FakeMember(transport, f"Coach_{i}", roles=[config.PING_ROLE_NAME]) for i in range(num_players)]
+    return thread, members
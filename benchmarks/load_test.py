@@ -0,0 +1,115 @@
+"""
+Offline end-to-end load test: runs a full draft through engine.next_turn on the fake Discord transport.
+
+Reports how many API calls the draft made (per endpoint), how many hit a rate limit, the simulated
+wall-clock time of the whole draft and the interaction acknowledgement delays.
+
+Usage:  python benchmarks/load_test.py --players 16 --mode 0 --scale 0.001 [--json result.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # config.CSV_FILE is relative to the repo root
+
+import config
+import dispatcher
+import engine
+import history
+import http_pool
+import render_pool
+import logic
+import metrics
+import outbound
+import views
+from benchmarks.fake_discord import AutoClicker, FakeTransport, build_guild, time_warp
+
+
+async def run_draft(args):
+    transport = FakeTransport(scale=args.scale, latency=args.latency, raise_on_429=args.raise_on_429, seed=args.seed)
+    clicker = AutoClicker(transport, think_time=(args.think_min, args.think_max), reroll_chance=args.reroll_chance,
+                          timeout_chance=args.timeout_chance, seed=args.seed)
+    thread, members = build_guild(transport, args.players, clicker=clicker)
+    outbound.scheduler.clock = transport.now  # Bucket windows and waits in simulated seconds
+
+    session = logic.create_session(thread.id, members, auto_mode=args.mode, draft_id="LOADTEST")
+    render_pool.loop_monitor.start()
+    started = time.perf_counter()
+    await engine.next_turn(session, thread, None)
+    elapsed = time.perf_counter() - started
+    render_pool.loop_monitor.stop()
+
+    for task in list(clicker.tasks):
+        task.cancel()
+    await http_pool.close()
+
+    picks = sum(len(r) for r in session.rosters.values())
+    return {
+        "players": args.players,
+        "mode": args.mode,
+        "completed": picks == args.players * config.TOTAL_POKEMON,
+        "picks": picks,
+        "real_time_s": round(elapsed, 3),
+        "simulated_time_s": round(elapsed / args.scale, 1),
+        "transport": transport.summary(),
+        "clicks": clicker.summary(),
+        "turn_cache": logic.get_cache_stats(session),
+        "render_pool": render_pool.render_pool.summary(),
+        "io_pool": render_pool.io_pool.summary(),
+        "event_loop": render_pool.loop_monitor.summary(),
+        "dm_dispatcher": dispatcher.dm_dispatcher.stats,
+        "outbound": outbound.scheduler.summary(),
+        "metrics": metrics.summary()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=16)
+    parser.add_argument("--mode", type=int, default=0, choices=(0, 1, 2), help="0=Interactive, 1=Auto, 2=Silent")
+    parser.add_argument("--scale", type=float, default=0.001, help="Real seconds per simulated second")
+    parser.add_argument("--latency", type=float, default=0.12, help="Mean simulated API latency (seconds)")
+    parser.add_argument("--think-min", type=float, default=2.0, help="Fastest player reaction (seconds)")
+    parser.add_argument("--think-max", type=float, default=8.0, help="Slowest player reaction (seconds)")
+    parser.add_argument("--reroll-chance", type=float, default=0.3)
+    parser.add_argument("--timeout-chance", type=float, default=0.0, help="Chance a player never clicks")
+    parser.add_argument("--raise-on-429", action="store_true",
+                        help="Surface 429s as HTTPException instead of waiting them out like discord.py")
+    parser.add_argument("--images", action="store_true", help="Build real roster images (downloads sprites)")
+    parser.add_argument("--render-workers", type=int, default=config.RENDER_WORKERS,
+                        help="Render pool threads (0 = render on the event loop, to measure the difference)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the result to this JSON file")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    random.seed(args.seed)
+    logic.load_data()
+
+    render_pool.render_pool = render_pool.RenderPool(args.render_workers, config.RENDER_QUEUE_SIZE)
+    history.draft_history = history.DraftHistory(":memory:")  # Don't mix load test drafts into the real history
+    if not args.images:
+        # Keep the run offline: the final DMs go out without the roster image
+        async def no_image(*a, **k):
+            return None
+
+        views.create_roster_image_file = no_image
+
+    with time_warp(args.scale):
+        result = asyncio.run(run_draft(args))
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+import csv
+import os
+import sys
+import mmap
+import struct
+import zlib
+import logging
+from array import array
+from itertools import compress
+
+logger = logging.getLogger("catalog")
+
+
+# ==========================================
+# 🔧 ROOT FAMILY NORMALIZATION
+# ==========================================
+
+def normalize_root(name, is_mega):
+    """
+    Determines the 'Family ID' (Root Name) for a Pokemon.
+    Used to implement the rule: "You cannot own both Base and Mega of the same species."
+
+    Logic:
+    1. If it's a MEGA (Mega='Y'):
+       - Strip 'mega ' prefix.
+       - Strip ' x' or ' y' suffixes.
+    2. If it's NOT a Mega:
+       - Use the name as is.
+
+    Note: Primal Groudon/Kyogre are handled by Tier Restrictions (High Caps), not name matching.
+    """
+    name = str(name).lower().strip()
+    return strip_mega(name) if is_mega else name
+
+
+def strip_mega(name):
+    """Root of a lowercased Mega name: 'mega charizard x' -> 'charizard'."""
+    # Remove "mega " prefix
+    if name.startswith("mega "):
+        name = name[5:].strip()
+
+    # Remove Suffixes (Variant X/Y)
+    if name.endswith(" x"):
+        name = name[:-2].strip()
+    elif name.endswith(" y"):
+        name = name[:-2].strip()
+    return name
+
+
+def normalize_roots(names, mega_flags):
+    """
+    Column-wise normalize_root: lowercases the whole name column in one pass, then strips only
+    the Mega rows (about 1 in 10) instead of branching on every row.
+    """
+    roots = [str(name).lower().strip() for name in names]
+    for row_id in compress(range(len(roots)), mega_flags):
+        roots[row_id] = strip_mega(roots[row_id])
+    return roots
+
+
+# ==========================================
+# 📚 COMPACT CATALOG
+# ==========================================
+
+class Catalog:
+    """
+    Read-only, column-oriented copy of pokemon_data.csv.
+    Row N of every column describes the same Pokemon, and row N owns bit N in every mask,
+    so the draft rules can filter the whole pool with plain integer AND/NOT operations.
+    """
+    __slots__ = (
+        "names",  # [str] Display names, as written in the CSV (the row id is the name id)
+        "tiers",  # array('H') Tier cost per row
+        "sprites",  # [str] Interned sprite URLs ("" when missing)
+        "root_ids",  # array('H') Root family id per row
+        "root_names",  # [str] Root family name per root id
+        "mega_mask",  # Rows flagged Mega='Y'
+        "high_mega_mask",  # Mega rows with tier >= 240
+        "all_mask",  # Every row in the catalog
+        "tier_rows",  # {tier: array('H') of row ids}
+        "tier_masks",  # {tier: Bitmask of rows in that tier}
+        "name_masks",  # {name: Bitmask of rows with that name}
+        "root_masks",  # [Bitmask of rows in that family] indexed by root id
+    )
+
+    def __init__(self, rows=()):
+        """Builds the columns and the derived indexes from (name, tier, is_mega, sprite) tuples."""
+        rows = list(rows)
+        self.names = [row[0] for row in rows]
+        self.tiers = array('H', [row[1] for row in rows])
+        mega_flags = [row[2] for row in rows]
+        self.sprites = [sys.intern(row[3]) for row in rows]
+
+        root_lookup = {}
+        self.root_ids = array('H', [root_lookup.setdefault(root, len(root_lookup))
+                                    for root in normalize_roots(self.names, mega_flags)])
+        self.root_names = list(root_lookup)
+
+        self.mega_mask = 0
+        self.high_mega_mask = 0
+        self.tier_masks = {}
+        self.root_masks = [0] * len(self.root_names)
+        for row_id, (tier, root_id, is_mega) in enumerate(zip(self.tiers, self.root_ids, mega_flags)):
+            bit = 1 << row_id
+            self.root_masks[root_id] |= bit
+            self.tier_masks[tier] = self.tier_masks.get(tier, 0) | bit
+            if is_mega:
+                self.mega_mask |= bit
+                if tier >= 240:
+                    self.high_mega_mask |= bit
+        self.tier_rows = {}
+        for row_id, tier in enumerate(self.tiers):
+            self.tier_rows.setdefault(tier, array('H')).append(row_id)
+        self.build_name_masks()
+
+    def build_name_masks(self):
+        """Name masks and the full mask, rebuilt from the name column on every load (the cache doesn't store them)."""
+        self.name_masks = dict(zip(self.names, (1 << row_id for row_id in range(len(self.names)))))
+        if len(self.name_masks) != len(self.names):
+            # Duplicate names (only possible in a lenient load): every row of a name shares its mask
+            self.name_masks = {}
+            for row_id, name in enumerate(self.names):
+                self.name_masks[name] = self.name_masks.get(name, 0) | (1 << row_id)
+        self.all_mask = (1 << len(self.names)) - 1
+
+    def __len__(self):
+        return len(self.names)
+
+    def row(self, row_id):
+        """Returns: Name, Tier, Sprite URL"""
+        return self.names[row_id], self.tiers[row_id], self.sprites[row_id]
+
+    def is_mega(self, name):
+        """True if any row with this name is flagged as a Mega."""
+        return bool(self.name_masks.get(name, 0) & self.mega_mask)
+
+    def family_mask(self, name):
+        """Bitmask of every row that shares a root family with this name."""
+        mask = 0
+        for row_id in iter_rows(self.name_masks.get(name, 0)):
+            mask |= self.root_masks[self.root_ids[row_id]]
+        return mask
+
+
+def iter_rows(mask):
+    """Yields the row ids set in a bitmask, lowest first."""
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+
+REQUIRED_COLUMNS = ("name", "tier", "mega", "sprite")
+
+
+class CatalogError(ValueError):
+    """The CSV failed validation. `problems` lists every issue found (not just the first)."""
+
+    def __init__(self, problems):
+        super().__init__(f"{len(problems)} problem(s) in the Pokemon CSV: " + "; ".join(problems[:5]))
+        self.problems = problems
+
+
+def load_catalog(path, known_tiers=None):
+    """
+    Parses the CSV with the stdlib csv module.
+    Headers are matched case-insensitively ('Name', 'Tier', 'Mega', 'sprite'); extra columns are ignored.
+    Returns None if the file does not exist.
+
+    With `known_tiers` (e.g. config.TIER_PROBS) the file is validated strictly: all four columns present,
+    every tier numeric and known, Mega 'Y'/'N', no duplicate names. Any problem raises CatalogError.
+    Without it, bad lines are skipped with a warning (the lenient startup behaviour).
+    """
+    if not os.path.exists(path):
+        return None
+
+    strict = known_tiers is not None
+    problems = []
+    rows = []
+    seen = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = [h.strip().lower() for h in next(reader, [])]
+        col = {h: i for i, h in enumerate(header) if h}
+        missing = [c for c in REQUIRED_COLUMNS if c not in col and (strict or c in ("name", "tier"))]
+        if missing:
+            raise CatalogError([f"missing column(s): {', '.join(missing)}"])
+        name_i, tier_i = col["name"], col["tier"]
+        mega_i, sprite_i = col.get("mega"), col.get("sprite")
+
+        for line_no, record in enumerate(reader, start=2):
+            cells = record + [""] * (len(header) - len(record))
+            name = cells[name_i]
+            if not name:
+                continue
+            try:
+                tier = int(float(cells[tier_i]))
+            except ValueError:
+                problems.append(f"line {line_no}: invalid tier {cells[tier_i]!r}")
+                continue
+
+            if strict:
+                if tier not in known_tiers:
+                    problems.append(f"line {line_no}: unknown tier {tier} for {name}")
+                if cells[mega_i].strip().upper() not in ("Y", "N"):
+                    problems.append(f"line {line_no}: Mega must be Y or N, got {cells[mega_i]!r}")
+                if name in seen:
+                    problems.append(f"line {line_no}: duplicate name {name} (first on line {seen[name]})")
+                seen.setdefault(name, line_no)
+
+            # Standardize Mega column to 'Y' or 'N'
+            is_mega = mega_i is not None and cells[mega_i].strip().upper() == 'Y'
+            sprite = cells[sprite_i].strip() if sprite_i is not None else ""
+            rows.append((name, tier, is_mega, sprite))
+
+    if strict and not rows:
+        problems.append("no Pokemon rows")
+    if problems:
+        if strict:
+            raise CatalogError(problems)
+        for problem in problems:
+            logger.warning(f"Skipping CSV {problem}")
+
+    return Catalog(rows)
+
+
+# ==========================================
+# 💾 BINARY CATALOG CACHE
+# ==========================================
+# Layout (little endian): header, then
+#   tiers u16[rows] | root ids u16[rows] | mega mask | high mega mask
+#   | per tier: u16 tier, u16 row count, mask, u16 row ids[count] | root masks [roots] | names, sprites, root names ("\n"-joined UTF-8, each prefixed by a u32 length)
+# Every mask is stored as ceil(rows / 8) bytes.
+
+CACHE_MAGIC = b"KKCAT"
+CACHE_VERSION = 1
+CACHE_HEADER = struct.Struct("<5sH12sIII")  # magic, version, CSV digest, rows, roots, tiers
+
+
+def file_digest(path):
+    """CRC32 plus byte size of the CSV: enough to tell edits apart, without loading hashlib at startup."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return struct.pack("<IQ", zlib.crc32(data), len(data))
+
+
+def save_cache(cat, cache_path, digest):
+    """Serializes the catalog with its derived indexes (written to a temp file, then renamed)."""
+    width = (len(cat) + 7) // 8
+    to_bytes = lambda mask: mask.to_bytes(width, "little")
+    parts = [CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, digest, len(cat), len(cat.root_names), len(cat.tier_masks)),
+             cat.tiers.tobytes(), cat.root_ids.tobytes(), to_bytes(cat.mega_mask), to_bytes(cat.high_mega_mask)]
+    for tier, mask in cat.tier_masks.items():
+        parts += [struct.pack("<HH", tier, len(cat.tier_rows[tier])), to_bytes(mask), cat.tier_rows[tier].tobytes()]
+    parts += [to_bytes(mask) for mask in cat.root_masks]
+    for column in (cat.names, cat.sprites, cat.root_names):
+        blob = "\n".join(column).encode("utf-8")
+        parts += [struct.pack("<I", len(blob)), blob]
+
+    with open(cache_path + ".tmp", "wb") as f:
+        f.write(b"".join(parts))
+    os.replace(cache_path + ".tmp", cache_path)
+
+
+def load_cache(cache_path, digest):
+    """Memory-maps a cache file. Returns the Catalog, or None if it is missing, corrupt or for another CSV."""
+    try:
+        with open(cache_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            magic, version, cached_digest, rows, roots, tiers = CACHE_HEADER.unpack_from(buf, 0)
+            if magic != CACHE_MAGIC or version != CACHE_VERSION or cached_digest != digest:
+                return None
+
+            width = (rows + 7) // 8
+            offset = CACHE_HEADER.size
+
+            def take(size):
+                nonlocal offset
+                chunk = buf[offset:offset + size]
+                offset += size
+                return chunk
+
+            def mask():
+                return int.from_bytes(take(width), "little")
+
+            def strings():
+                blob = take(struct.unpack("<I", take(4))[0]).decode("utf-8")
+                return blob.split("\n") if blob else []
+
+            cat = Catalog.__new__(Catalog)
+            cat.tiers = array('H', take(rows * 2))
+            cat.root_ids = array('H', take(rows * 2))
+            cat.mega_mask = mask()
+            cat.high_mega_mask = mask()
+            cat.tier_masks = {}
+            cat.tier_rows = {}
+            for _ in range(tiers):
+                tier, count = struct.unpack("<HH", take(4))
+                cat.tier_masks[tier] = mask()
+                cat.tier_rows[tier] = array('H', take(count * 2))
+            start = offset
+            offset += roots * width
+            cat.root_masks = [int.from_bytes(buf[o:o + width], "little") for o in range(start, offset, width)]
+            cat.names = strings()
+            cat.sprites = [sys.intern(url) for url in strings()]
+            cat.root_names = strings()
+    except (OSError, ValueError, struct.error, UnicodeDecodeError):
+        return None
+
+    if len(cat.names) != rows or len(cat.sprites) != rows or len(cat.root_names) != roots:
+        return None
+    cat.build_name_masks()
+    return cat
+
+
+def load_catalog_cached(path, cache_path, known_tiers=None):
+    """
+    load_catalog() behind the binary cache: if `cache_path` was built from this exact CSV (same digest),
+    the catalog is mapped straight from it, with no CSV parsing, no root normalization and no index build.
+    Otherwise the CSV is parsed and the cache rewritten. Strict loads (`known_tiers`) always parse and
+    validate the CSV, then refresh the cache. Returns None if the CSV does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    digest = file_digest(path)
+    if known_tiers is None:
+        cached = load_cache(cache_path, digest)
+        if cached is not None:
+            return cached
+
+    cat = load_catalog(path, known_tiers)
+    try:
+        save_cache(cat, cache_path, digest)
+    except OSError as e:
+        logger.warning(f"Could not write the catalog cache {cache_path}: {e}")
+    return cat
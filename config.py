@@ -15,6 +15,10 @@ TOKEN = os.getenv('DISCORD_TOKEN')
 # --- DATA SOURCE ---
 # The CSV file must contain columns: 'Name', 'Mega' (Y/N), 'Tier' (Integer)
 CSV_FILE = 'pokemon_data.csv'
+# The CSV is watched for edits (new season tiers) and reloaded without a restart; see also !reload_pool.
+CATALOG_WATCH_INTERVAL = 5.0    # Seconds between checks of the CSV (0 disables the watcher)
+# Parsed catalog + indexes, keyed by the CSV's CRC32 + size; startup maps it instead of parsing the CSV.
+CATALOG_CACHE_FILE = 'pokemon_data.catalog'
 
 # --- GAME RULES (RESTORED FROM YOUR UPLOAD) ---
 MAX_POINTS = 1200       # Total salary cap per player
@@ -59,6 +63,11 @@ STAFF_ROLE_NAME = "NPO-Draft Staff"
 # Chance for Delibird Fake Out to trigger on a pull of Tier 60 or less.
 FAKE_OUT_CHANCE = 0.13
 
+# --- RNG ---
+# Every draft draws its snake order and rolls (tiers, Pokemon, Fake Out) from a random.Random seeded with this value.
+# None = a fresh seed per draft; it is logged and journaled, so any draft can be replayed.
+DRAFT_SEED = None
+
 # ==========================================
 # 🧵 THREAD & ANNOUNCEMENT SETTINGS
 # ==========================================
@@ -72,4 +81,93 @@ PING_ROLE_NAME = "Draft"
 # ==========================================
 # The file where detailed background DEBUG logs will be saved.
 # The terminal will only show INFO and above to stay clean.
-LOG_FILE = 'kokoloko.log'
\ No newline at end of file
+LOG_FILE = 'kokoloko.log'
+LOG_FILE_LEVEL = 'DEBUG'        # 'INFO' skips every debug line (and the work to build it)
+LOG_CONSOLE_LEVEL = 'INFO'
+LOG_MAX_MB = 10                 # Rotate once the log reaches this size...
+LOG_BACKUPS = 5                 # ...keeping this many gzip'd backups (kokoloko.log.1.gz is the newest)
+
+# ==========================================
+# 🗄️ SPRITE CACHE SETTINGS
+# ==========================================
+# Downloaded sprites are kept on disk (keyed by URL) so roster images don't re-download them.
+SPRITE_CACHE_DIR = 'sprite_cache'
+SPRITE_CACHE_MAX_MB = 64            # Disk budget; least recently used sprites are evicted first
+SPRITE_MEMORY_CACHE_ITEMS = 512     # Decoded sprites kept in memory
+SPRITE_CACHE_TTL = 7 * 24 * 3600    # Seconds before a cached sprite is revalidated (ETag / Last-Modified)
+
+# Precomputed 100x100 tiles of every sprite in the CSV (built with `python atlas.py`, memory-mapped at startup)
+SPRITE_ATLAS_FILE = 'sprite_atlas.bin'
+SPRITE_ATLAS_INDEX = 'sprite_atlas.json'
+
+# ==========================================
+# 🔌 HTTP POOL SETTINGS
+# ==========================================
+# One shared connection pool (created on startup) is used for every sprite download.
+HTTP_POOL_LIMIT = 20            # Max open connections in total
+HTTP_POOL_LIMIT_PER_HOST = 6    # Max open connections to a single sprite host
+HTTP_DNS_CACHE_TTL = 300        # Seconds a DNS lookup is reused
+HTTP_TOTAL_TIMEOUT = 15         # Seconds for a whole request (connect + download)
+HTTP_CONNECT_TIMEOUT = 5        # Seconds to establish the connection
+HTTP_RETRIES = 2                # Extra attempts after a timeout, connection error, 429 or 5xx
+HTTP_BACKOFF_BASE = 0.5         # First retry waits ~0.5s, then doubles
+HTTP_BACKOFF_MAX = 8            # Cap for a single backoff wait (also caps Retry-After)
+
+# ==========================================
+# 🧵 RENDER POOL SETTINGS
+# ==========================================
+# Pillow decode/compositing/encode runs on worker threads so button clicks are never stalled.
+RENDER_WORKERS = 2              # Worker threads (0 = render inline on the event loop, the old behaviour)
+RENDER_QUEUE_SIZE = 8           # Max render jobs pending or running at once
+LOOP_MONITOR_INTERVAL = 0.25    # Seconds between event loop heartbeats
+LOOP_STALL_THRESHOLD = 0.1      # A heartbeat later than this (seconds) counts as a stall
+
+# Blocking I/O that isn't rendering (history SQLite, journal fsyncs, profile reports, catalog reloads) has its
+# own small pool, so it never queues behind roster renders or counts against RENDER_QUEUE_SIZE.
+IO_WORKERS = 2                  # Worker threads (0 = run inline on the event loop)
+IO_QUEUE_SIZE = 32              # Max I/O jobs pending or running at once
+
+# ==========================================
+# 📬 END-OF-DRAFT DM SETTINGS
+# ==========================================
+DM_RENDER_CONCURRENCY = 4   # Roster images rendered at the same time
+DM_SEND_CONCURRENCY = 5     # DM requests in flight at once (Discord's real rate-limit headers pace the rest)
+DM_MAX_RETRIES = 3          # Retries per DM after a 429 or 5xx
+
+# ==========================================
+# 🚦 OUTBOUND MESSAGE SCHEDULER
+# ==========================================
+# Every thread/parent channel message is queued per channel and paced to Discord's message bucket.
+OUTBOUND_BUCKET_LIMIT = 5       # Requests per channel...
+OUTBOUND_BUCKET_WINDOW = 5.0    # ...per this many seconds
+OUTBOUND_MAX_RETRIES = 3        # Retries of a 429 before the error reaches the engine
+
+# ==========================================
+# 📓 CRASH RECOVERY JOURNAL
+# ==========================================
+# Every draft event is appended (fsync'd) to journal/<thread id>.log so `!resume_draft` can rebuild it.
+JOURNAL_DIR = 'journal'
+JOURNAL_SNAPSHOT_EVERY = 50     # Events between full snapshots (the log is truncated after each)
+
+# ==========================================
+# 📚 DRAFT HISTORY
+# ==========================================
+# Completed drafts (order, picks, rerolls, burns) are saved here for the staff stats commands.
+HISTORY_DB = 'draft_history.sqlite3'
+HISTORY_TOP_LIMIT = 10          # Rows shown by !most_picked and !player_history
+
+# ==========================================
+# 📈 PERFORMANCE METRICS
+# ==========================================
+# Counters/histograms (query, roll, Discord API, think time, render, DM times) in Prometheus text format.
+METRICS_HOST = '127.0.0.1'      # Local only; scrape http://127.0.0.1:9108/metrics
+METRICS_PORT = 9108             # 0 disables the HTTP endpoint (`!perf` keeps working)
+
+# ==========================================
+# 🔬 DRAFT PROFILING
+# ==========================================
+# cProfile + tracemalloc capture of a whole draft (`!profile_next` arms one; this flag profiles them all).
+# Reports (.pstats, _hot.txt, _memory.txt) are written next to LOG_FILE. No cost when off.
+PROFILE_DRAFTS = False
+PROFILE_TOP_N = 30              # Functions / allocation sites listed in the reports
+PROFILE_TRACEMALLOC_FRAMES = 1  # Stack depth kept per allocation (more = slower, finer memory report)
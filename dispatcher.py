@@ -0,0 +1,88 @@
+import random
+import asyncio
+import logging
+
+import discord
+import config
+import metrics
+
+logger = logging.getLogger("dispatcher")
+
+
+def retry_delay(exc, attempt):
+    """
+    Seconds to wait before retrying a failed request, read from Discord's own rate-limit headers
+    (Retry-After / X-RateLimit-Reset-After) when the response has them, else exponential backoff.
+    """
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    for header in ("Retry-After", "X-RateLimit-Reset-After"):
+        value = headers.get(header)
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    return min(2 ** attempt, 30) * random.uniform(0.5, 1.0)
+
+
+def is_global_limit(exc):
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    return headers.get("X-RateLimit-Global") == "true" or headers.get("X-RateLimit-Scope") == "global"
+
+
+# ==========================================
+# 📮 RATE-LIMIT-AWARE DISPATCHER
+# ==========================================
+
+class Dispatcher:
+    """
+    Sends Discord requests concurrently (up to `concurrency` in flight) and retries 429s and 5xx
+    after the delay Discord asks for. A global rate limit pauses every sender, not just the one that hit it.
+    Other errors (e.g. Forbidden when a user has DMs closed) are raised to the caller right away.
+    """
+
+    def __init__(self, concurrency, max_retries):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.slots = None  # asyncio.Semaphore, created on first use inside the running loop
+        self.paused_until = 0.0  # loop.time() until which a global rate limit holds every sender
+        self.stats = {"sent": 0, "retries": 0, "rate_limited": 0, "failed": 0}
+
+    async def send(self, send_func, *args, **kwargs):
+        """Awaits `send_func(*args, **kwargs)` (e.g. member.send) with rate-limit handling. Returns its result."""
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(self.max_retries + 1):
+            pause = self.paused_until - loop.time()
+            if pause > 0:
+                await asyncio.sleep(pause)
+
+            async with self.slots:
+                try:
+                    with metrics.api_call("dm.send"):
+                        result = await send_func(*args, **kwargs)
+                    self.stats["sent"] += 1
+                    return result
+                except discord.HTTPException as e:
+                    if (e.status != 429 and e.status < 500) or attempt == self.max_retries:
+                        self.stats["failed"] += 1
+                        raise
+                    status = e.status
+                    delay = retry_delay(e, attempt)
+                    if status == 429:
+                        self.stats["rate_limited"] += 1
+                        if is_global_limit(e):
+                            self.paused_until = max(self.paused_until, loop.time() + delay)
+
+            self.stats["retries"] += 1
+            logger.debug(f"Request hit HTTP {status}, retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+            # Attachments were consumed by the failed attempt; rewind them for the retry
+            for value in kwargs.values():
+                if isinstance(value, discord.File):
+                    value.reset()
+            await asyncio.sleep(delay)
+
+
+dm_dispatcher = Dispatcher(concurrency=config.DM_SEND_CONCURRENCY, max_retries=config.DM_MAX_RETRIES)
@@ -1,424 +1,621 @@
 import discord
 import asyncio
 import time
-import random
 import config
 import logic
 import views
+import sprites
+import render_pool
+import dispatcher
+import outbound
+import journal
+import history
+import metrics
 import logging
 
 logger = logging.getLogger("engine")
 
-
-async def next_turn(channel, bot_instance, retries=3):
+# =========================================
+# 🔁 DRAFT STATE MACHINE
+# =========================================
+# The draft loop walks through these phases in a flat `while` loop instead of recursing,
+# so the await stack has a constant depth no matter how many turns, skips or retries happen.
+ROUND_START = "ROUND_START"  # Round bookkeeping: finish the draft or flip the snake order
+TURN_START = "TURN_START"  # Pick the player, skip full rosters, send the 3-turn warning DM
+ROLL = "ROLL"  # (Roll button), RNG roll, suspense GIF and Fake Out
+DECIDE = "DECIDE"  # Keep / Reroll / Timeout (auto modes decide instantly)
+COMMIT = "COMMIT"  # Record the pick and advance to the next player
+
+# Callables notified on every transition: listener(session, phase, turn). `turn` is None outside a turn.
+phase_listeners = []
+
+
+def set_phase(session, phase, turn):
+    """Records the current phase on the session and notifies the listeners."""
+    session.phase = phase
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[PHASE] %s%s", phase, f" ({turn['player'].display_name}, Pick #{turn['pick_num']})" if turn else "")
+    for listener in phase_listeners:
+        try:
+            listener(session, phase, turn)
+        except Exception as e:
+            logger.error(f"Phase listener failed on {phase}: {e}")
+
+
+async def next_turn(session, channel, bot_instance, retries=3):
     """
     The Main Game Loop.
-    Handles Round progression, Player Turns, and Mode Switching.
-    Added a retry parameter to gracefully handle Discord API drops.
+    Handles Round progression, Player Turns, and Mode Switching until the draft ends or is cancelled.
+    `retries` is the Discord API retry budget of EACH turn; a failed turn restarts from TURN_START.
     """
+    phase = ROUND_START
+    turn = None
+    retries_left = retries
+
+    session.loop_running = True
     try:
-        state = logic.draft_state
-
-        # =========================================
-        # 1. ROUND MANAGEMENT
-        # =========================================
-        if state["current_index"] >= len(state["order"]):
-            if state["round"] >= config.TOTAL_POKEMON:
-                if state["active"]:
-                    # 1. Announce locally in the thread
-                    await channel.send(views.MSG["draft_complete"])
-                    for embed in views.create_summary_embed(state):
-                        await channel.send(embed=embed)
-#SILENCING ANNOUNCEMENT TEST <- COMMENT until          logger.error(f"Failed to send final summary to parent: {e}") to silence again
-                    # 2. 📢 ANNOUNCE ROUND 10 (FINAL) TO PARENT CHANNEL
-                    try:
-                        await channel.parent.send(views.MSG.get("announce_draft_complete_parent", "🏁 **¡El Kokoloko Draft ha concluido!** Equipos finales:"))
-                        for embed in views.create_summary_embed(state):
-                            await channel.parent.send(embed=embed)
-                    except Exception as e:
-                        logger.error(f"Failed to send final summary to parent: {e}")
-
-                    # 3. Process final direct messages for all unique participants
-                    seen_players = set()
-                    for player_obj in state["order"]:
-                        if player_obj.id not in seen_players:
-                            seen_players.add(player_obj.id)
-                            if hasattr(player_obj, "send"):
-                                try:
-                                    await player_obj.send(views.MSG.get("dm_draft_over", "El Kokoloko Draft ha concluido. Aquí está el resumen de tu equipo final:"))
-
-                                    personal_embed = views.create_personal_summary_embed(player_obj, state)
-                                    roster = state["rosters"].get(player_obj.id, [])
-
-                                    file_attachment = await views.create_roster_image_file(roster,f"{player_obj.id}_roster.png")
-
-                                    if file_attachment:
-                                        personal_embed.set_image(url=f"attachment://{file_attachment.filename}")
-                                        await player_obj.send(embed=personal_embed, file=file_attachment)
-                                    else:
-                                        await player_obj.send(embed=personal_embed)
-
-                                except discord.Forbidden:
-                                    logger.warning(f"Could not send final DM to {player_obj.display_name}")
-                                except Exception as e:
-                                    logger.error(f"Failed to send final DM to {player_obj.display_name}: {e}")
-
-                                # ---> THE FIX: Pace the API requests to prevent Rate-Limiting <---
-                                await asyncio.sleep(2)
-                                logger.info(f"Sent final DM to {player_obj.display_name}")
-
-                    state["active"] = False
-                    print("🏁 [ENGINE] Draft Complete.")
-                    logger.info("🏁 Draft Complete - Summary sent.")
+        while phase is not None:
+            set_phase(session, phase, turn)
+            phase_started, current = time.perf_counter(), phase
+            try:
+                if phase == ROUND_START:
+                    turn = None
+                    phase = await round_start(session, channel)
+                elif phase == TURN_START:
+                    turn = await turn_start(session, channel)
+                    phase = ROLL if turn else ROUND_START
+                elif phase == ROLL:
+                    phase = await roll(session, channel, turn)
+                elif phase == DECIDE:
+                    phase = await decide(session, channel, turn)
+                elif phase == COMMIT:
+                    await commit(session, channel, turn)
+                    retries_left = retries
+                    phase = ROUND_START
+
+            except discord.HTTPException as e:
+                logger.error(f"Discord API Error encountered. Retries left: {retries_left} | Details: {e}")
+                if retries_left > 0:
+                    retries_left -= 1
+                    logger.info("Attempting to resume turn in 5 seconds...")
+                    await asyncio.sleep(5)
+                    phase = ROUND_START
+                else:
+                    logger.critical("Max API retries reached. Draft loop broken.")
+                    await outbound.scheduler.send(channel, views.MSG["err_api_fatal"], priority=outbound.NOTICE)
+                    return
+
+            except Exception:
+                logger.error("An unexpected error crashed the engine loop:", exc_info=True)
+                await outbound.scheduler.send(channel, views.MSG["err_bot_crash"], priority=outbound.NOTICE)
                 return
+            finally:
+                metrics.phase_seconds.observe(time.perf_counter() - phase_started, phase=current)
 
-            state["round"] += 1
-            state["order"].reverse()
-            state["current_index"] = 0
-
-            mode = state.get("auto_mode", 0)
-            if mode != 2:
-                # Announce the start of the new round in the thread
-                await channel.send(views.MSG["end_of_round"].format(round_num=state['round']))
-# SILENCING ANNOUNCEMENT TEST <-comment the "try" below to silence again
-                # 📢 ANNOUNCE EVEN ROUNDS (2, 4, 6, 8) TO PARENT CHANNEL
-                finished_round = state["round"] - 1
-                if finished_round % 2 == 0:
-                    logger.info(f"Sending global auto-summary to parent channel for end of Round {finished_round}")
-                    try:
-                        await channel.parent.send(views.MSG["announce_round_summary"].format(round_num=finished_round))
-                        for embed in views.create_summary_embed(state):
-                            await channel.parent.send(embed=embed)
-                    except discord.Forbidden:
-                        logger.warning("Could not send summary to parent channel (Permissions missing).")
-                    except Exception as e:
-                        logger.error(f"Failed to send round summary to parent: {e}")
-
-                logger.info(f"--- STARTING ROUND {state['round']} ---")
-                await asyncio.sleep(1)
-            else:
-                print(f"--- ROUND {state['round']} START ---")
-                logger.info(f"--- STARTING ROUND {state['round']} (Silent) ---")
-
-        player = state["order"][state["current_index"]]
-        pick_num = len(state["rosters"][player.id]) + 1
-
-        # RESTORED CRITICAL LOGIC I ACCIDENTALLY OVERWROTE
-        if pick_num > config.TOTAL_POKEMON:
-            state["current_index"] += 1
-            await next_turn(channel, bot_instance)
-            return
-
-        state["burned"] = []
-        rerolls_used = state["rerolls"].get(player.id, 0)
-        can_reroll = (config.MAX_REROLLS - rerolls_used) > 0
-        mode = state.get("auto_mode", 0)
-
-        logger.info(f"[Turn Start] Round {state['round']}, Pick #{pick_num} for {player.display_name}")
-        # END OF RESTORED LOGIC 👆
-
-        # =========================================
-        # 🔔 UPCOMING TURN NOTIFICATION (DM)
-        # =========================================
-        if mode == 0:
-            target_round = state["round"]
-            temp_idx = state["current_index"]
-            is_reversed_sim = False
-            upcoming_players = []
-
-            # Walk forward 3 steps to build a list of the next 3 players
-            for _ in range(3):
-                temp_idx += 1
-                if temp_idx >= len(state["order"]):
-                    target_round += 1
-                    temp_idx = 0
-                    is_reversed_sim = not is_reversed_sim
-
-                if target_round <= config.TOTAL_POKEMON:
-                    if is_reversed_sim:
-                        sim_player = state["order"][::-1][temp_idx]
-                    else:
-                        sim_player = state["order"][temp_idx]
-                    upcoming_players.append(sim_player)
-
-            if len(upcoming_players) == 3:
-                target_player = upcoming_players[-1]
-
-                # Verify if the target actually has rerolls left to justify pinging them
-                target_rerolls = state["rerolls"].get(target_player.id, 0)
-                target_has_rerolls = (config.MAX_REROLLS - target_rerolls) > 0
-
-                # OVERLAP CHECK & REROLL CHECK
-                if target_player != player and target_player not in upcoming_players[:-1] and target_has_rerolls:
-                    if hasattr(target_player, "send"):
-                        try:
-                            dm_embed = views.create_dm_embed(target_player, channel.jump_url)
-                            await target_player.send(embed=dm_embed)
-                            logger.info(f"Sent 3-turn warning DM to {target_player.display_name}")
-                        except discord.Forbidden:
-                            logger.warning(f"Could not send DM to {target_player.display_name} (DMs disabled).")
-                        except Exception as e:
-                            logger.error(f"Failed to send DM to {target_player.display_name}: {e}")
-
-        # =========================================
-        # PATH A: SILENT AUTO (Mode 2)
-        # =========================================
-        if mode == 2:
-            valid_tiers = logic.get_valid_tiers(player.id, pick_num, is_reroll=False)
-            name, tier, sprite_url = logic.roll_pokemon(valid_tiers, player.id, pick_num, is_reroll=False)
-
-            if name:
-                state["rosters"][player.id].append({'name': name, 'tier': tier, 'sprite': sprite_url})
-                state["points"][player.id] += tier
-                print(f"[R{state['round']}] P#{pick_num} {player.display_name}: {name}")
-                pts_left = config.MAX_POINTS - state["points"][player.id]
-                logger.info(
-                    f"[R{state['round']}] Pick #{pick_num} {player.display_name}: {name} (T{tier}) - Left: {pts_left}")
+            # Abort if the draft was canceled while waiting
+            if phase is not None and not session.active:
+                return
+    finally:
+        session.loop_running = False
+
+
+# =========================================
+# 1. ROUND MANAGEMENT
+# =========================================
+
+async def round_start(session, channel):
+    """Advances the round when everyone has picked. Returns the next phase, or None when the draft is over."""
+    if session.current_index < len(session.order):
+        return TURN_START
+
+    if session.round >= config.TOTAL_POKEMON:
+        if session.active:
+            await finish_draft(session, channel)
+        return None
+
+    logic.advance_round(session)
+
+    mode = session.auto_mode
+    if mode != 2:
+        # Announce the start of the new round in the thread
+        await outbound.scheduler.send(channel, views.MSG["end_of_round"].format(round_num=session.round), priority=outbound.NOTICE)
+# SILENCING ANNOUNCEMENT TEST <-comment the parent sends below to silence again
+        # 📢 ANNOUNCE EVEN ROUNDS (2, 4, 6, 8) TO PARENT CHANNEL
+        finished_round = session.round - 1
+        if finished_round % 2 == 0:
+            logger.info(f"Sending global auto-summary to parent channel for end of Round {finished_round}")
+            # Queued without waiting: the next turn starts right away and the summary drains behind it
+            outbound.scheduler.send(channel.parent, views.MSG["announce_round_summary"].format(round_num=finished_round),
+                                    priority=outbound.ANNOUNCEMENT)
+            for embed in views.create_summary_embed(session):
+                outbound.scheduler.send(channel.parent, embed=embed, priority=outbound.ANNOUNCEMENT)
+
+        logger.info(f"--- STARTING ROUND {session.round} ---")
+        await asyncio.sleep(1)
+    else:
+        print(f"--- ROUND {session.round} START ---")
+        logger.info(f"--- STARTING ROUND {session.round} (Silent) ---")
+
+    return TURN_START
+
+
+async def finish_draft(session, channel):
+    """Posts the final summaries and DMs every participant their roster."""
+    # 1. Announce locally in the thread (queued: the summaries drain while the DMs go out)
+    announcements = [outbound.scheduler.send(channel, views.MSG["draft_complete"], priority=outbound.ANNOUNCEMENT)]
+    for embed in views.create_summary_embed(session):
+        announcements.append(outbound.scheduler.send(channel, embed=embed, priority=outbound.ANNOUNCEMENT))
+#SILENCING ANNOUNCEMENT TEST <- COMMENT the parent announcement below to silence again
+    # 2. 📢 ANNOUNCE ROUND 10 (FINAL) TO PARENT CHANNEL
+    announcements.append(outbound.scheduler.send(channel.parent, views.MSG.get("announce_draft_complete_parent", "🏁 **¡El Kokoloko Draft ha concluido!** Equipos finales:"),
+                                                 priority=outbound.ANNOUNCEMENT))
+    for embed in views.create_summary_embed(session):
+        announcements.append(outbound.scheduler.send(channel.parent, embed=embed, priority=outbound.ANNOUNCEMENT))
+
+    # 3. Final direct messages for all unique participants (rendered and sent concurrently)
+    await send_final_dms(session, channel)
+    await asyncio.gather(*announcements, return_exceptions=True)  # Failures are logged by the scheduler
+
+    session.active = False
+    await journal.close(session, "end")  # Durable before the draft is reported done
+    await history.record(session)
+    print("🏁 [ENGINE] Draft Complete.")
+    logger.info("🏁 Draft Complete - Summary sent.")
+    logger.info(f"Turn cache stats: {logic.get_cache_stats(session)}")
+    logger.info(f"Summary render cache stats: {views.get_render_cache_stats(session)}")
+    logger.info(f"Sprite cache stats: {sprites.sprite_cache.stats}")
+    logger.info(f"Render pool stats: {render_pool.render_pool.summary()} | I/O pool: {render_pool.io_pool.summary()} | "
+                f"Event loop: {render_pool.loop_monitor.summary()}")
+    logger.info(f"Outbound scheduler stats: {outbound.scheduler.summary()}")
+
+
+async def send_final_dms(session, channel):
+    """
+    End-of-draft DM fan-out: every roster image renders concurrently (up to DM_RENDER_CONCURRENCY),
+    and each player's DMs go out through the rate-limit-aware dispatcher as soon as their image is ready.
+    Returns one result per recipient: {"player", "ok", "error"}.
+    """
+    recipients = []
+    seen_players = set()
+    for player_obj in session.order:
+        if player_obj.id not in seen_players and hasattr(player_obj, "send"):
+            seen_players.add(player_obj.id)
+            recipients.append(player_obj)
+    if not recipients:
+        return []
+
+    render_slots = asyncio.Semaphore(config.DM_RENDER_CONCURRENCY)
+
+    async def render(player_obj):
+        async with render_slots:
+            roster = session.rosters.get(player_obj.id, [])
+            return await views.create_roster_image_file(roster, f"{player_obj.id}_roster.png")
+
+    renders = {p.id: asyncio.create_task(render(p)) for p in recipients}
+
+    async def deliver(player_obj):
+        send = dispatcher.dm_dispatcher.send
+        started = time.perf_counter()
+        try:
+            await send(player_obj.send, views.MSG.get("dm_draft_over", "El Kokoloko Draft ha concluido. Aquí está el resumen de tu equipo final:"))
+
+            personal_embed = views.create_personal_summary_embed(player_obj, session)
+            try:
+                file_attachment = await renders[player_obj.id]
+            except Exception as e:
+                logger.error(f"Failed to render roster image for {player_obj.display_name}: {e}")
+                file_attachment = None
+
+            if file_attachment:
+                personal_embed.set_image(url=f"attachment://{file_attachment.filename}")
+                await send(player_obj.send, embed=personal_embed, file=file_attachment)
             else:
-                print(f"⚠️ [SILENT] Error: No candidates for {player.display_name}")
-                logger.error(f"⚠️ [SILENT ERROR] No valid pokemon for {player.display_name}")
-
-            state["current_index"] += 1
-            await asyncio.sleep(0.01)
-            await next_turn(channel, bot_instance)
-            return
-
-        # =========================================
-        # PATH B: PUBLIC AUTO (Mode 1)
-        # =========================================
-        if mode == 1 or not can_reroll:
-            valid_tiers = logic.get_valid_tiers(player.id, pick_num, is_reroll=False)
-            name, tier, sprite_url = logic.roll_pokemon(valid_tiers, player.id, pick_num, is_reroll=False)
-
-            if not name:
-                logger.error(f"Critical Auto-Mode Error: No valid candidates for {player.display_name}")
-                await channel.send(views.MSG["err_critical_pool"])
+                await send(player_obj.send, embed=personal_embed)
+
+            logger.info(f"Sent final DM to {player_obj.display_name}")
+            metrics.dm_delivery_seconds.observe(time.perf_counter() - started, outcome="ok")
+            return {"player": player_obj.display_name, "ok": True, "error": None}
+        except discord.Forbidden:
+            logger.warning(f"Could not send final DM to {player_obj.display_name}")
+            error = "DMs closed"
+        except Exception as e:
+            logger.error(f"Failed to send final DM to {player_obj.display_name}: {e}")
+            error = str(e)
+        renders[player_obj.id].cancel()
+        metrics.dm_delivery_seconds.observe(time.perf_counter() - started, outcome="failed")
+        return {"player": player_obj.display_name, "ok": False, "error": error}
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(deliver(p) for p in recipients))
+    failed = [r for r in results if not r["ok"]]
+
+    logger.info(f"📬 Final DMs: {len(results) - len(failed)}/{len(results)} delivered in "
+                f"{time.perf_counter() - started:.1f}s | Dispatcher: {dispatcher.dm_dispatcher.stats}")
+    if failed:
+        try:
+            names = ", ".join(r["player"] for r in failed)
+            await outbound.scheduler.send(channel, views.MSG.get("dm_failed", "⚠️ No se pudo enviar el resumen por DM a: {names}").format(names=names),
+                                         priority=outbound.ANNOUNCEMENT)
+        except Exception as e:
+            logger.error(f"Failed to report undelivered DMs: {e}")
+    return results
+
+
+# =========================================
+# 2. TURN SETUP
+# =========================================
+
+async def turn_start(session, channel):
+    """
+    Builds the context of the current turn.
+    Returns None (after advancing the index) if the player already has a full roster.
+    """
+    player = session.order[session.current_index]
+    pick_num = len(session.rosters[player.id]) + 1
+
+    # RESTORED CRITICAL LOGIC I ACCIDENTALLY OVERWROTE
+    if pick_num > config.TOTAL_POKEMON:
+        logic.advance_turn(session)
+        return None
+
+    logic.rebind_catalog(session)  # A reloaded pool only goes live for this draft between its turns
+    logic.reset_burned(session)
+    rerolls_used = session.rerolls.get(player.id, 0)
+    mode = session.auto_mode
+
+    logger.info(f"[Turn Start] Round {session.round}, Pick #{pick_num} for {player.display_name}")
+    # END OF RESTORED LOGIC 👆
+
+    turn = {
+        "player": player,
+        "pick_num": pick_num,
+        "mode": mode,
+        "can_reroll": (config.MAX_REROLLS - rerolls_used) > 0,
+        "is_reroll": False,  # True once the player has rerolled this turn
+        "summary_used": False,  # Tracks if the Summary button was clicked this turn
+        "name": None,  # Current roll result
+        "tier": None,
+        "sprite_url": "",
+        "rolling_msg": None,  # Rolling GIF message, edited into the decision card
+        "decision": None,  # "KEEP", "AUTO", "FORCED" or None (timeout)
+        "clicked_by": None
+    }
+
+    if mode == 0:
+        await send_upcoming_turn_dm(session, channel, player)
+
+    return turn
+
+
+async def send_upcoming_turn_dm(session, channel, player):
+    """🔔 UPCOMING TURN NOTIFICATION (DM): warns the player who picks 3 turns from now."""
+    target_round = session.round
+    temp_idx = session.current_index
+    is_reversed_sim = False
+    upcoming_players = []
+
+    # Walk forward 3 steps to build a list of the next 3 players
+    for _ in range(3):
+        temp_idx += 1
+        if temp_idx >= len(session.order):
+            target_round += 1
+            temp_idx = 0
+            is_reversed_sim = not is_reversed_sim
+
+        if target_round <= config.TOTAL_POKEMON:
+            if is_reversed_sim:
+                sim_player = session.order[::-1][temp_idx]
             else:
-                state["rosters"][player.id].append({'name': name, 'tier': tier, 'sprite': sprite_url})
-                state["points"][player.id] += tier
-                pts_left = config.MAX_POINTS - state["points"][player.id]
+                sim_player = session.order[temp_idx]
+            upcoming_players.append(sim_player)
 
-                embed = views.create_auto_accept_embed(player, pick_num, name, tier, mode, pts_left, sprite_url)
-                await channel.send(f"{player.mention}", embed=embed)
+    if len(upcoming_players) == 3:
+        target_player = upcoming_players[-1]
 
-                logger.info(f"[Auto-Mode] Assigned {name} (T{tier}) to {player.display_name}")
-                if mode == 1: await asyncio.sleep(0.5)
+        # Verify if the target actually has rerolls left to justify pinging them
+        target_rerolls = session.rerolls.get(target_player.id, 0)
+        target_has_rerolls = (config.MAX_REROLLS - target_rerolls) > 0
 
-        # =========================================
-        # PATH C: INTERACTIVE (Mode 0)
-        # =========================================
-        else:
-            expiry_roll = int(time.time()) + config.ROLL_TIMEOUT
-            odds = logic.calculate_tier_percentages(player.id, pick_num, is_reroll=False)
-            embed_start = views.create_roll_embed(player, pick_num, expiry_roll, views.format_odds_grid(odds))
-            roll_view = views.RollView(player)
+        # OVERLAP CHECK & REROLL CHECK
+        if target_player != player and target_player not in upcoming_players[:-1] and target_has_rerolls:
+            if hasattr(target_player, "send"):
+                try:
+                    dm_embed = views.create_dm_embed(target_player, channel.jump_url)
+                    await target_player.send(embed=dm_embed)
+                    logger.info(f"Sent 3-turn warning DM to {target_player.display_name}")
+                except discord.Forbidden:
+                    logger.warning(f"Could not send DM to {target_player.display_name} (DMs disabled).")
+                except Exception as e:
+                    logger.error(f"Failed to send DM to {target_player.display_name}: {e}")
 
-            # Store the view reference in state for cancellation
-            state["current_view"] = roll_view
 
-            start_msg = await channel.send(f"{player.mention}", embed=embed_start, view=roll_view)
+# =========================================
+# 3. ROLL
+# =========================================
 
-            await roll_view.wait()
+async def roll(session, channel, turn):
+    """Rolls a Pokemon for the turn. Returns the next phase, or None if the draft was cancelled."""
+    player, pick_num = turn["player"], turn["pick_num"]
+    mode = turn["mode"]
 
-            # Abort if the draft was canceled while waiting
-            if not state.get("active", True):
-                return
+    # PATH A/B: SILENT AUTO (Mode 2) and PUBLIC AUTO (Mode 1 or out of rerolls)
+    if mode == 2 or mode == 1 or not turn["can_reroll"]:
+        valid_tiers = logic.get_valid_tiers(session, player.id, pick_num, is_reroll=False)
+        turn["name"], turn["tier"], turn["sprite_url"] = logic.roll_pokemon(session, valid_tiers, player.id, pick_num,
+                                                                            is_reroll=False)
+        turn["decision"] = "AUTO"
+        return COMMIT
 
-            if not roll_view.clicked:
-                logger.info(f"Timeout on Roll Phase for {player.display_name}. Auto-rolling.")
-                embed_start.description = views.MSG["roll_timeout"]
-                embed_start.color = 0xe74c3c
-                await start_msg.edit(embed=embed_start, view=None)
-                await asyncio.sleep(1)
-            else:
-                logger.info(f"{player.display_name} clicked Roll Dice.")
-                embed_start.description = views.MSG["rolling"].format(odds=views.format_odds_grid(odds))
-                embed_start.color = 0xf1c40f
-                await start_msg.edit(embed=embed_start, view=None)
-
-            current_is_reroll = False
-            summary_used_this_turn = False  # Tracks if the button was clicked this turn
-
-            while True:
-                curr_rr = state["rerolls"].get(player.id, 0)
-                curr_left = config.MAX_REROLLS - curr_rr
-                pts_left = config.MAX_POINTS - state["points"].get(player.id, 0)
-
-                v_tiers = logic.get_valid_tiers(player.id, pick_num, is_reroll=current_is_reroll)
-                name, tier, sprite_url = logic.roll_pokemon(v_tiers, player.id, pick_num, is_reroll=current_is_reroll)
-
-                if not name:
-                    logger.error(f"Decision Phase Error: Pool Empty for {player.display_name}")
-                    await channel.send(views.MSG["err_critical_pool"])
-                    break
-
-                logger.info(f"RNG generated: {name} (T{tier}) for {player.display_name}")
-
-                # === 🎰 NUEVA ANIMACIÓN DE RULETA ===
-                # Send the rolling GIF and save the message object
-                rolling_msg = await channel.send("https://24.media.tumblr.com/tumblr_lm4usrayvJ1qa9qygo1_500.gif")
-                await asyncio.sleep(5)  # 5-second suspense delay!
-
-                # Check if canceled during the animation
-                if not state.get("active", True):
-                    if rolling_msg:
-                        await rolling_msg.delete()
-                    return
+    # PATH C: INTERACTIVE (Mode 0)
+    if not turn["is_reroll"]:
+        await wait_for_roll_button(session, channel, turn)
+        if not session.active:
+            return None
 
-                # === EASTER EGG LOGIC ===
-                if tier <= 60 and random.random() < config.FAKE_OUT_CHANCE:
-                    fake_name, fake_tier, fake_sprite_url = logic.get_fake_candidate(player.id, pick_num,
-                                                                                     current_is_reroll)
+    v_tiers = logic.get_valid_tiers(session, player.id, pick_num, is_reroll=turn["is_reroll"])
+    name, tier, sprite_url = logic.roll_pokemon(session, v_tiers, player.id, pick_num, is_reroll=turn["is_reroll"])
+    turn["name"], turn["tier"], turn["sprite_url"] = name, tier, sprite_url
 
-                    if fake_name:
-                        logger.info(
-                            f"Easter Egg Triggered: Faking {player.display_name} with {fake_name} (T{fake_tier}) instead of actual {name} (T{tier})")
+    if not name:
+        logger.error(f"Decision Phase Error: Pool Empty for {player.display_name}")
+        await outbound.scheduler.send(channel, views.MSG["err_critical_pool"], priority=outbound.NOTICE)
+        return COMMIT
 
-                        # Delete the rolling GIF so it doesn't clutter the chat during the Easter Egg
-                        await rolling_msg.delete()
-                        rolling_msg = None
+    logger.info(f"RNG generated: {name} (T{tier}) for {player.display_name}")
+    logic.log_event(session, "roll", user_id=player.id, name=name, tier=tier, is_reroll=turn["is_reroll"])
 
-                        fake_embed = views.create_fake_embed(player, fake_name, fake_tier, fake_sprite_url)
-                        fake_msg = await channel.send(f"{player.mention}", embed=fake_embed)
+    # === 🎰 NUEVA ANIMACIÓN DE RULETA ===
+    # Send the rolling GIF and save the message object
+    rolling_msg = await outbound.scheduler.send(channel, "https://24.media.tumblr.com/tumblr_lm4usrayvJ1qa9qygo1_500.gif")
+    turn["rolling_msg"] = rolling_msg
+    await asyncio.sleep(5)  # 5-second suspense delay!
 
-                        await asyncio.sleep(7)
+    # Check if canceled during the animation
+    if not session.active:
+        if rolling_msg:
+            await outbound.scheduler.delete(rolling_msg)
+        return None
 
-                        spoilered_text = views.MSG["fakeout_spoiler"].format(name=fake_name, tier=fake_tier)
-                        await fake_msg.edit(content=spoilered_text, embed=None)
+    # === EASTER EGG LOGIC ===
+    if tier <= 60 and session.rng.random() < config.FAKE_OUT_CHANCE:
+        await play_fake_out(session, channel, turn)
 
-                        await asyncio.sleep(3)
+    return DECIDE
 
-                        await channel.send(views.MSG["fakeout_delibird"])
-                        await asyncio.sleep(2)
-                        await channel.send("https://24.media.tumblr.com/2453c1bcf3b7081c6e183441591560d1/tumblr_mf7hsn9oLd1rjj66yo1_r2_500.gif")
 
-                        await channel.send(views.MSG["fakeout_reveal"].format(mention=player.mention))
-                        await asyncio.sleep(2)
+async def wait_for_roll_button(session, channel, turn):
+    """Shows the odds card with the Roll button and waits for the click (or the timeout)."""
+    player, pick_num = turn["player"], turn["pick_num"]
 
-                # === FORCED AUTO-ACCEPT (0 REROLLS) ===
-                if curr_left <= 0 and current_is_reroll:
-                    state["rosters"][player.id].append({'name': name, 'tier': tier, 'sprite': sprite_url})
-                    state["points"][player.id] += tier
-                    pts_left = config.MAX_POINTS - state["points"][player.id]
+    expiry_roll = int(time.time()) + config.ROLL_TIMEOUT
+    odds = logic.calculate_tier_percentages(session, player.id, pick_num, is_reroll=False)
+    embed_start = views.create_roll_embed(player, pick_num, expiry_roll, views.format_odds_grid(odds))
+    roll_view = views.RollView(player)
 
-                    embed = views.create_auto_accept_embed(player, pick_num, name, tier, mode, pts_left, sprite_url)
+    # Store the view reference in the session for cancellation
+    session.current_view = roll_view
 
-                    # Edit the GIF into the final card, or send a new one if Easter Egg wiped it
-                    if rolling_msg:
-                        await rolling_msg.edit(content=f"{player.mention}", embed=embed)
-                    else:
-                        await channel.send(f"{player.mention}", embed=embed)
+    start_msg = await outbound.scheduler.send(channel, f"{player.mention}", embed=embed_start, view=roll_view)
 
-                    logger.info(f"Forced accept for {player.display_name} (0 rerolls left).")
-                    break
+    with metrics.view_wait_seconds.time(view="roll"):
+        await roll_view.wait()
 
-                # --- INNER LOOP: UI DISPLAY ---
-                card_msg = None
-                while True:
-                    expiry_dec = int(time.time()) + config.DECISION_TIMEOUT
+    # Abort if the draft was canceled while waiting
+    if not session.active:
+        return
 
-                    embed = views.create_decision_embed(player, pick_num, name, tier, pts_left, curr_left,
-                                                        state['round'], expiry_dec, sprite_url)
-                    view = views.DraftView(player, show_summary=not summary_used_this_turn)
+    if not roll_view.clicked:
+        logger.info(f"Timeout on Roll Phase for {player.display_name}. Auto-rolling.")
+        embed_start.description = views.MSG["roll_timeout"]
+        embed_start.color = 0xe74c3c
+        await outbound.scheduler.edit(start_msg, embed=embed_start, view=None)
+        await asyncio.sleep(1)
+    else:
+        logger.info(f"{player.display_name} clicked Roll Dice.")
+        embed_start.description = views.MSG["rolling"].format(odds=views.format_odds_grid(odds))
+        embed_start.color = 0xf1c40f
+        await outbound.scheduler.edit(start_msg, embed=embed_start, view=None)
 
-                    # Store the view reference in state for cancellation
-                    state["current_view"] = view
 
-                    if rolling_msg:
-                        await rolling_msg.edit(content=f"{player.mention}", embed=embed, view=view)
-                        card_msg = rolling_msg
-                        rolling_msg = None
-                    else:
-                        card_msg = await channel.send(f"{player.mention}", embed=embed, view=view)
+async def play_fake_out(session, channel, turn):
+    """Delibird Fake Out: shows a fake high-tier pull before revealing the real one."""
+    player, pick_num = turn["player"], turn["pick_num"]
+    name, tier = turn["name"], turn["tier"]
 
-                    await view.wait()
+    fake_name, fake_tier, fake_sprite_url = logic.get_fake_candidate(session, player.id, pick_num, turn["is_reroll"])
+    if not fake_name:
+        return
 
-                    # Abort if the draft was canceled while waiting
-                    if not state.get("active", True):
-                        return
+    logger.info(
+        f"Easter Egg Triggered: Faking {player.display_name} with {fake_name} (T{fake_tier}) instead of actual {name} (T{tier})")
 
-                    if view.value == "SUMMARY":
-                        summary_used_this_turn = True
-                        logger.info(f"{player.display_name} requested personal summary.")
+    # Delete the rolling GIF so it doesn't clutter the chat during the Easter Egg
+    await outbound.scheduler.delete(turn["rolling_msg"])
+    turn["rolling_msg"] = None
 
-                        personal_embed = views.create_personal_summary_embed(player, state)
-                        await channel.send(embed=personal_embed)
+    fake_embed = views.create_fake_embed(player, fake_name, fake_tier, fake_sprite_url)
+    fake_msg = await outbound.scheduler.send(channel, f"{player.mention}", embed=fake_embed)
 
-                        continue
+    await asyncio.sleep(7)
 
-                    break
+    spoilered_text = views.MSG["fakeout_spoiler"].format(name=fake_name, tier=fake_tier)
+    await outbound.scheduler.edit(fake_msg, content=spoilered_text, embed=None)
 
-                # Immediately abort outer loop processing if canceled
-                if not state.get("active", True):
-                    return
+    await asyncio.sleep(3)
 
-                # === FIX: STATIC TEXT UPDATE FOR MOBILE AND COUNT-UP AVOIDANCE ===
-                if view.value is None:
-                    embed.description = f"*(Ronda {state['round']})* - **Expiró el tiempo**"
-                    embed.color = 0x95a5a6
-                    for child in view.children:
-                        child.disabled = True
-                else:
-                    embed.description = f"*(Ronda {state['round']})* - **Decisión tomada**"
+    await outbound.scheduler.send(channel, views.MSG["fakeout_delibird"])
+    await asyncio.sleep(2)
+    await outbound.scheduler.send(channel, "https://24.media.tumblr.com/2453c1bcf3b7081c6e183441591560d1/tumblr_mf7hsn9oLd1rjj66yo1_r2_500.gif")
 
-                try:
-                    if card_msg:
-                        await card_msg.edit(embed=embed, view=view)
-                except Exception as e:
-                    logger.debug(f"Failed to edit card_msg to static text: {e}")
+    await outbound.scheduler.send(channel, views.MSG["fakeout_reveal"].format(mention=player.mention))
+    await asyncio.sleep(2)
 
-                    # --- PROCESS RESULT ---
 
-                # --- PROCESS RESULT ---
-                if view.value == "REROLL":
-                    state["rerolls"][player.id] += 1
-                    new_left = config.MAX_REROLLS - state["rerolls"][player.id]
-                    clicker = view.clicked_by.display_name if view.clicked_by else "Staff"
+# =========================================
+# 4. DECISION
+# =========================================
 
-                    logger.info(f"{clicker} hit REROLL on {name}. Rerolls remaining: {new_left}")
-                    await channel.send(views.MSG["action_reroll"].format(clicker=clicker, left=new_left))
+async def decide(session, channel, turn):
+    """
+    Shows the Keep/Reroll card (interactive mode only).
+    Returns ROLL after a reroll, COMMIT after keep/timeout/forced accept, or None if cancelled.
+    """
+    player, pick_num = turn["player"], turn["pick_num"]
+    name, tier, sprite_url = turn["name"], turn["tier"], turn["sprite_url"]
+
+    curr_rr = session.rerolls.get(player.id, 0)
+    curr_left = config.MAX_REROLLS - curr_rr
+    pts_left = config.MAX_POINTS - session.points.get(player.id, 0)
+
+    # === FORCED AUTO-ACCEPT (0 REROLLS) ===
+    if curr_left <= 0 and turn["is_reroll"]:
+        turn["decision"] = "FORCED"
+        return COMMIT
+
+    # --- INNER LOOP: UI DISPLAY ---
+    card_msg = None
+    while True:
+        expiry_dec = int(time.time()) + config.DECISION_TIMEOUT
+
+        embed = views.create_decision_embed(player, pick_num, name, tier, pts_left, curr_left,
+                                            session.round, expiry_dec, sprite_url)
+        view = views.DraftView(player, show_summary=not turn["summary_used"])
+
+        # Store the view reference in the session for cancellation
+        session.current_view = view
+
+        if turn["rolling_msg"]:
+            await outbound.scheduler.edit(turn["rolling_msg"], content=f"{player.mention}", embed=embed, view=view)
+            card_msg = turn["rolling_msg"]
+            turn["rolling_msg"] = None
+        else:
+            card_msg = await outbound.scheduler.send(channel, f"{player.mention}", embed=embed, view=view)
 
-                    if new_left == 0 and hasattr(player, "send"):
-                        try:
-                            out_embed = discord.Embed(
-                                description=views.MSG.get("dm_out_of_rerolls", "Te has quedado sin reintentos."),
-                                color=0xe74c3c
-                            )
-                            await player.send(embed=out_embed)
-                        except Exception as e:
-                            logger.error(f"Failed to send 'Out of Rerolls' DM to {player.display_name}: {e}")
+        with metrics.view_wait_seconds.time(view="decision"):
+            await view.wait()
 
-                    state["burned"].append(name)
-                    current_is_reroll = True
-                    continue
+        # Abort if the draft was canceled while waiting
+        if not session.active:
+            return None
 
-                else:
-                    state["rosters"][player.id].append({'name': name, 'tier': tier, 'sprite': sprite_url})
-                    state["points"][player.id] += tier
+        if view.value == "SUMMARY":
+            turn["summary_used"] = True
+            logger.info(f"{player.display_name} requested personal summary.")
 
-                    if view.value == "KEEP":
-                        msg = views.MSG["action_keep"].format(clicker=view.clicked_by.display_name, name=name)
-                    else:
-                        msg = views.MSG["action_timeout"].format(name=name)
+            personal_embed = views.create_personal_summary_embed(player, session)
+            await outbound.scheduler.send(channel, embed=personal_embed, priority=outbound.NOTICE)
 
-                    logger.info(f"{name} kept by {player.display_name} (Trigger: {view.value})")
-                    await channel.send(msg)
-                    break
+            continue
 
-        state["current_index"] += 1
-        await asyncio.sleep(1)
-        await next_turn(channel, bot_instance)
-
-    except discord.HTTPException as e:
-        logger.error(f"Discord API Error encountered. Retries left: {retries} | Details: {e}")
-        if retries > 0:
-            logger.info("Attempting to resume turn in 5 seconds...")
-            await asyncio.sleep(5)
-            await next_turn(channel, bot_instance, retries=retries - 1)
-        else:
-            logger.critical("Max API retries reached. Draft loop broken.")
-            await channel.send(views.MSG["err_api_fatal"])
+        break
+
+    # === FIX: STATIC TEXT UPDATE FOR MOBILE AND COUNT-UP AVOIDANCE ===
+    if view.value is None:
+        embed.description = f"*(Ronda {session.round})* - **Expiró el tiempo**"
+        embed.color = 0x95a5a6
+        for child in view.children:
+            child.disabled = True
+    else:
+        embed.description = f"*(Ronda {session.round})* - **Decisión tomada**"
 
+    try:
+        if card_msg:
+            await outbound.scheduler.edit(card_msg, embed=embed, view=view)
     except Exception as e:
-        logger.error("An unexpected error crashed the engine loop:", exc_info=True)
-        await channel.send(views.MSG["err_bot_crash"])
\ No newline at end of file
+        logger.debug(f"Failed to edit card_msg to static text: {e}")
+
+    # --- PROCESS RESULT ---
+    if view.value == "REROLL":
+        new_left = logic.use_reroll(session, player.id)
+        clicker = view.clicked_by.display_name if view.clicked_by else "Staff"
+
+        logger.info(f"{clicker} hit REROLL on {name}. Rerolls remaining: {new_left}")
+        await outbound.scheduler.send(channel, views.MSG["action_reroll"].format(clicker=clicker, left=new_left), priority=outbound.NOTICE)
+
+        if new_left == 0 and hasattr(player, "send"):
+            try:
+                out_embed = discord.Embed(
+                    description=views.MSG.get("dm_out_of_rerolls", "Te has quedado sin reintentos."),
+                    color=0xe74c3c
+                )
+                await player.send(embed=out_embed)
+            except Exception as e:
+                logger.error(f"Failed to send 'Out of Rerolls' DM to {player.display_name}: {e}")
+
+        logic.burn_pokemon(session, name)
+        turn["is_reroll"] = True
+        return ROLL
+
+    turn["decision"] = view.value
+    turn["clicked_by"] = view.clicked_by
+    return COMMIT
+
+
+# =========================================
+# 5. COMMIT
+# =========================================
+
+async def commit(session, channel, turn):
+    """Stores the rolled Pokemon on the roster, announces it, and advances to the next player."""
+    player, pick_num, mode = turn["player"], turn["pick_num"], turn["mode"]
+    name, tier, sprite_url = turn["name"], turn["tier"], turn["sprite_url"]
+
+    # PATH A: SILENT AUTO (Mode 2)
+    if mode == 2:
+        if name:
+            logic.record_pick(session, player.id, name, tier, sprite_url)
+            print(f"[R{session.round}] P#{pick_num} {player.display_name}: {name}")
+            pts_left = config.MAX_POINTS - session.points[player.id]
+            logger.info(
+                f"[R{session.round}] Pick #{pick_num} {player.display_name}: {name} (T{tier}) - Left: {pts_left}")
+        else:
+            print(f"⚠️ [SILENT] Error: No candidates for {player.display_name}")
+            logger.error(f"⚠️ [SILENT ERROR] No valid pokemon for {player.display_name}")
+
+        logic.advance_turn(session)
+        await asyncio.sleep(0.01)
+        return
+
+    # PATH B: PUBLIC AUTO (Mode 1)
+    if turn["decision"] == "AUTO":
+        if not name:
+            logger.error(f"Critical Auto-Mode Error: No valid candidates for {player.display_name}")
+            await outbound.scheduler.send(channel, views.MSG["err_critical_pool"], priority=outbound.NOTICE)
+        else:
+            logic.record_pick(session, player.id, name, tier, sprite_url)
+            pts_left = config.MAX_POINTS - session.points[player.id]
+
+            embed = views.create_auto_accept_embed(player, pick_num, name, tier, mode, pts_left, sprite_url)
+            await outbound.scheduler.send(channel, f"{player.mention}", embed=embed)
+
+            logger.info(f"[Auto-Mode] Assigned {name} (T{tier}) to {player.display_name}")
+            if mode == 1: await asyncio.sleep(0.5)
+
+    # PATH C: INTERACTIVE (Mode 0) - the pool-empty error was already announced during the roll
+    elif name and turn["decision"] == "FORCED":
+        logic.record_pick(session, player.id, name, tier, sprite_url)
+        pts_left = config.MAX_POINTS - session.points[player.id]
+
+        embed = views.create_auto_accept_embed(player, pick_num, name, tier, mode, pts_left, sprite_url)
+
+        # Edit the GIF into the final card, or send a new one if Easter Egg wiped it
+        if turn["rolling_msg"]:
+            await outbound.scheduler.edit(turn["rolling_msg"], content=f"{player.mention}", embed=embed)
+        else:
+            await outbound.scheduler.send(channel, f"{player.mention}", embed=embed)
+
+        logger.info(f"Forced accept for {player.display_name} (0 rerolls left).")
+
+    elif name:
+        logic.record_pick(session, player.id, name, tier, sprite_url)
+
+        if turn["decision"] == "KEEP":
+            msg = views.MSG["action_keep"].format(clicker=turn["clicked_by"].display_name, name=name)
+        else:
+            msg = views.MSG["action_timeout"].format(name=name)
+
+        logger.info(f"{name} kept by {player.display_name} (Trigger: {turn['decision']})")
+        await outbound.scheduler.send(channel, msg, priority=outbound.NOTICE)
+
+    logic.advance_turn(session)
+    await asyncio.sleep(1)
@@ -0,0 +1,190 @@
+import time
+import sqlite3
+import logging
+import threading
+
+import config
+import render_pool
+
+logger = logging.getLogger("history")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    draft_id     TEXT PRIMARY KEY,
+    thread_id    INTEGER,
+    mode         INTEGER NOT NULL,
+    players      INTEGER NOT NULL,
+    rounds       INTEGER NOT NULL,
+    finished_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS draft_players (
+    draft_id     TEXT NOT NULL REFERENCES drafts(draft_id) ON DELETE CASCADE,
+    user_id      INTEGER NOT NULL,
+    name         TEXT NOT NULL,
+    seat         INTEGER NOT NULL,   -- Position in the round 1 snake order (1-based)
+    rerolls      INTEGER NOT NULL,
+    points       INTEGER NOT NULL,
+    PRIMARY KEY (draft_id, user_id)
+);
+CREATE TABLE IF NOT EXISTS picks (
+    draft_id     TEXT NOT NULL REFERENCES drafts(draft_id) ON DELETE CASCADE,
+    pick_number  INTEGER NOT NULL,   -- Overall pick of the draft (1-based)
+    round        INTEGER NOT NULL,   -- Also the roster slot: every player picks once per round
+    user_id      INTEGER NOT NULL,
+    pokemon      TEXT NOT NULL,
+    tier         INTEGER NOT NULL,
+    mega         INTEGER NOT NULL,
+    PRIMARY KEY (draft_id, pick_number)
+);
+CREATE TABLE IF NOT EXISTS burns (
+    draft_id     TEXT NOT NULL REFERENCES drafts(draft_id) ON DELETE CASCADE,
+    round        INTEGER NOT NULL,
+    user_id      INTEGER NOT NULL,
+    pokemon      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_picks_user ON picks(user_id, draft_id);
+CREATE INDEX IF NOT EXISTS idx_picks_pokemon ON picks(pokemon);
+CREATE INDEX IF NOT EXISTS idx_picks_round_tier ON picks(round, tier);
+CREATE INDEX IF NOT EXISTS idx_players_user ON draft_players(user_id);
+CREATE INDEX IF NOT EXISTS idx_burns_draft ON burns(draft_id);
+CREATE INDEX IF NOT EXISTS idx_burns_pokemon ON burns(pokemon);
+"""
+
+
+def pick_rows(session):
+    """
+    Returns the picks of a finished session in draft order: [(pick_number, round, user_id, entry)].
+    The snake order flips every round, so each round's order is rebuilt from the final one.
+    """
+    final_round = max((p["round"] for roster in session.rosters.values() for p in roster), default=0)
+    by_round = {}
+    for user_id, roster in session.rosters.items():
+        for entry in roster:
+            by_round.setdefault(entry["round"], {}).setdefault(user_id, []).append(entry)
+
+    rows = []
+    pick_number = 0
+    for round_num in range(1, final_round + 1):
+        flips = session.round - round_num
+        order = session.order if flips % 2 == 0 else session.order[::-1]
+        pending = by_round.get(round_num, {})
+        for player in order:
+            entries = pending.get(player.id)
+            if entries:
+                pick_number += 1
+                rows.append((pick_number, round_num, player.id, entries.pop(0)))
+    return rows
+
+
+def round_one_order(session):
+    """Snake order of round 1, from the order the session ended with."""
+    return session.order if (session.round - 1) % 2 == 0 else session.order[::-1]
+
+
+# ==========================================
+# 📚 DRAFT HISTORY STORE
+# ==========================================
+
+class DraftHistory:
+    """
+    SQLite store of every completed draft: players and seats, every pick with its round and pick number,
+    reroll counts and burned Pokemon. Indexed by player, Pokemon and draft_id so the staff stats
+    commands are plain index lookups.
+
+    The connection is opened lazily and shared by the I/O pool threads (one query at a time),
+    so no SQLite I/O ever runs on the event loop.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = None
+        self.lock = threading.Lock()
+
+    def connect(self):
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA foreign_keys=ON")
+            self.conn.executescript(SCHEMA)
+        return self.conn
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    # --- writes ---
+
+    def save_draft(self, session, finished_at=None):
+        """Writes the whole draft in one transaction (re-saving a draft_id replaces it). Blocking."""
+        draft_id = session.draft_id or f"thread-{session.thread_id}"
+        seats = {}
+        names = {}
+        for seat, player in enumerate(round_one_order(session), start=1):
+            seats.setdefault(player.id, seat)
+            names.setdefault(player.id, player.display_name)
+
+        with self.lock:
+            conn = self.connect()
+            with conn:
+                conn.execute("DELETE FROM drafts WHERE draft_id = ?", (draft_id,))
+                conn.execute("INSERT INTO drafts VALUES (?, ?, ?, ?, ?, ?)",
+                             (draft_id, session.thread_id, session.auto_mode, len(seats),
+                              max((len(r) for r in session.rosters.values()), default=0),
+                              finished_at or time.time()))
+                conn.executemany("INSERT INTO draft_players VALUES (?, ?, ?, ?, ?, ?)",
+                                 [(draft_id, uid, names[uid], seat, session.rerolls.get(uid, 0),
+                                   session.points.get(uid, 0)) for uid, seat in seats.items()])
+                conn.executemany("INSERT INTO picks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                 [(draft_id, number, round_num, uid, entry["name"], entry["tier"], int(entry["mega"]))
+                                  for number, round_num, uid, entry in pick_rows(session)])
+                conn.executemany("INSERT INTO burns VALUES (?, ?, ?, ?)",
+                                 [(draft_id, b["round"], b["user_id"], b["name"]) for b in session.burn_log])
+        return draft_id
+
+    # --- stats queries (blocking) ---
+
+    def query(self, sql, params=()):
+        with self.lock:
+            return self.connect().execute(sql, params).fetchall()
+
+    def most_picked(self, limit=10):
+        """[(pokemon, times picked, average round)] across every recorded draft."""
+        return self.query("SELECT pokemon, COUNT(*) AS n, AVG(round) FROM picks "
+                          "GROUP BY pokemon ORDER BY n DESC, pokemon LIMIT ?", (limit,))
+
+    def spend_per_slot(self, user_id=None):
+        """[(round, average tier, picks)] per roster slot, for everyone or one player."""
+        if user_id is None:
+            return self.query("SELECT round, AVG(tier), COUNT(*) FROM picks GROUP BY round ORDER BY round")
+        return self.query("SELECT round, AVG(tier), COUNT(*) FROM picks WHERE user_id = ? "
+                          "GROUP BY round ORDER BY round", (user_id,))
+
+    def player_history(self, user_id, limit=10):
+        """
+        The player's last drafts, newest first:
+        [(draft_id, finished_at, seat, rerolls, points, "Pokemon (tier), ..." in pick order)].
+        """
+        drafts = self.query("SELECT d.draft_id, d.finished_at, p.seat, p.rerolls, p.points "
+                            "FROM draft_players p JOIN drafts d ON d.draft_id = p.draft_id "
+                            "WHERE p.user_id = ? ORDER BY d.finished_at DESC LIMIT ?", (user_id, limit))
+        history = []
+        for draft_id, finished_at, seat, rerolls, points in drafts:
+            picks = self.query("SELECT pokemon, tier FROM picks WHERE user_id = ? AND draft_id = ? "
+                               "ORDER BY pick_number", (user_id, draft_id))
+            history.append((draft_id, finished_at, seat, rerolls, points,
+                            ", ".join(f"{name} ({tier})" for name, tier in picks)))
+        return history
+
+
+draft_history = DraftHistory(config.HISTORY_DB)
+
+
+async def record(session):
+    """Saves a finished draft off the event loop. A failure is logged, never raised into the engine."""
+    try:
+        draft_id = await render_pool.io_pool.run(draft_history.save_draft, session)
+        logger.info(f"📚 Draft {draft_id} saved to the history database")
+    except Exception as e:
+        logger.error(f"Failed to save draft {session.draft_id} to the history database: {e}")
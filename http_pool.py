@@ -0,0 +1,98 @@
+import random
+import asyncio
+import logging
+from collections import namedtuple
+
+import aiohttp
+import config
+
+logger = logging.getLogger("http_pool")
+
+# Body is only read for 200 responses
+HttpResult = namedtuple("HttpResult", ["status", "headers", "body"])
+
+# Statuses worth retrying: rate limited or a transient upstream failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session = None
+
+
+# ==========================================
+# 🔌 SESSION LIFECYCLE
+# ==========================================
+
+async def start():
+    """Creates the shared ClientSession. Called once from the bot's setup_hook."""
+    global _session
+    if _session is not None and not _session.closed:
+        return _session
+
+    connector = aiohttp.TCPConnector(
+        limit=config.HTTP_POOL_LIMIT,
+        limit_per_host=config.HTTP_POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=config.HTTP_DNS_CACHE_TTL
+    )
+    timeout = aiohttp.ClientTimeout(total=config.HTTP_TOTAL_TIMEOUT, connect=config.HTTP_CONNECT_TIMEOUT)
+    _session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+    logger.info(f"HTTP pool started (limit={config.HTTP_POOL_LIMIT}, per host={config.HTTP_POOL_LIMIT_PER_HOST})")
+    return _session
+
+
+async def close():
+    """Closes the shared ClientSession and its sockets. Called when the bot shuts down."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+        logger.info("HTTP pool closed")
+    _session = None
+
+
+async def get_session():
+    """Returns the shared session, starting it on first use (scripts and benchmarks never run setup_hook)."""
+    if _session is None or _session.closed:
+        return await start()
+    return _session
+
+
+# ==========================================
+# 🔁 REQUESTS WITH RETRY
+# ==========================================
+
+def backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with jitter, or the server's Retry-After when it sent one (capped)."""
+    if retry_after:
+        try:
+            return min(float(retry_after), config.HTTP_BACKOFF_MAX)
+        except ValueError:
+            pass
+    delay = config.HTTP_BACKOFF_BASE * (2 ** attempt)
+    return min(delay, config.HTTP_BACKOFF_MAX) * random.uniform(0.5, 1.0)
+
+
+async def fetch(url, headers=None):
+    """
+    GETs `url` through the shared pool, retrying connection errors, timeouts, 429 and 5xx
+    up to HTTP_RETRIES times. Returns an HttpResult, or None if every attempt failed.
+    """
+    session = await get_session()
+    last_error = None
+
+    for attempt in range(config.HTTP_RETRIES + 1):
+        retry_after = None
+        try:
+            async with session.get(url, headers=headers) as resp:
+                if resp.status not in RETRY_STATUSES:
+                    body = await resp.read() if resp.status == 200 else b""
+                    return HttpResult(resp.status, resp.headers, body)
+                retry_after = resp.headers.get("Retry-After")
+                last_error = f"HTTP {resp.status}"
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            last_error = repr(e)
+
+        if attempt < config.HTTP_RETRIES:
+            delay = backoff_delay(attempt, retry_after)
+            logger.debug(f"GET {url} failed ({last_error}), retry {attempt + 1}/{config.HTTP_RETRIES} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    logger.warning(f"GET {url} gave up after {config.HTTP_RETRIES + 1} attempts: {last_error}")
+    return None
@@ -0,0 +1,322 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+
+import config
+import logic
+import metrics
+import render_pool
+
+logger = logging.getLogger("journal")
+
+# Events that end a draft for good; a journal ending with one of these can't be resumed
+CLOSING_EVENTS = ("end", "cancel")
+
+
+# ==========================================
+# 📓 PICK JOURNAL
+# ==========================================
+
+class DraftJournal:
+    """
+    Append-only, fsync'd log of one draft's events, one JSON object per line:
+    init, roll, reroll, burn, pick, pity, turn, round, mode, resume, end/cancel.
+
+    Each event is written and flushed right away (a bot crash loses nothing); the fsync that makes it
+    survive a power loss runs on the I/O pool, and events appended while one is pending share it.
+
+    Every `snapshot_every` events the whole draft state is captured and written to a compact snapshot
+    (atomically, on the I/O pool), then the log is cut down to the events appended since the capture,
+    so a resume only replays a short tail. Each event carries a sequence number; the snapshot records
+    the last one it covers. Nothing here blocks the event loop on the disk.
+    """
+
+    def __init__(self, session, directory=None, snapshot_every=None, seq=0):
+        self.session = session
+        self.directory = directory or config.JOURNAL_DIR
+        self.snapshot_every = snapshot_every or config.JOURNAL_SNAPSHOT_EVERY
+        self.seq = seq
+        self.since_snapshot = 0
+        self.lock = threading.Lock()  # Guards swapping self.file (event loop) against fsyncs (pool thread)
+        self.sync_pending = False
+        self.sync_task = None
+        self.snapshot_task = None
+        self.tail = None  # Lines appended while a snapshot is being written (kept when the log is cut)
+        os.makedirs(self.directory, exist_ok=True)
+        self.log_path, self.snapshot_path = journal_paths(session.thread_id, self.directory)
+        self.file = open(self.log_path, "a", encoding="utf-8")
+
+    def append(self, kind, **data):
+        self.seq += 1
+        record = {"seq": self.seq, "t": round(time.time(), 3), "event": kind, **data}
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self.file.write(line)
+        self.file.flush()
+        if self.tail is not None:
+            self.tail.append(line)
+        self.request_sync()
+
+        self.since_snapshot += 1
+        if self.since_snapshot >= self.snapshot_every and kind not in CLOSING_EVENTS:
+            self.snapshot()
+
+    # --- fsync ---
+
+    def request_sync(self):
+        """Schedules one fsync off the event loop, unless one is already waiting to run."""
+        if self.sync_pending:
+            return
+        self.sync_pending = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.sync()  # No event loop (scripts): nothing to block
+            return
+        self.sync_task = loop.create_task(self.sync_off_loop())
+
+    async def sync_off_loop(self):
+        try:
+            await render_pool.io_pool.run(self.sync)
+        except Exception as e:
+            logger.error(f"Journal fsync failed for thread {self.session.thread_id}: {e}")
+
+    def sync(self):
+        """fsyncs everything written so far (blocking). The lock is only held to duplicate the descriptor."""
+        with self.lock:
+            self.sync_pending = False
+            if self.file.closed:
+                return
+            fd = os.dup(self.file.fileno())
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    # --- snapshots ---
+
+    def snapshot(self):
+        """Captures the full state now and writes it off the event loop (one snapshot at a time)."""
+        if self.tail is not None:
+            return
+        state = session_state(self.session)
+        state["seq"] = self.seq
+        self.since_snapshot = 0
+        self.tail = []
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.write_snapshot(state)
+            self.cut_log()
+            return
+        self.snapshot_task = loop.create_task(self.snapshot_off_loop(state))
+
+    async def snapshot_off_loop(self, state):
+        try:
+            await render_pool.io_pool.run(self.write_snapshot, state)
+        except Exception as e:
+            logger.error(f"Journal snapshot failed for thread {self.session.thread_id}: {e}")
+            self.tail = None  # The full log is kept; the next threshold tries again
+            return
+        self.cut_log()
+
+    def write_snapshot(self, state):
+        """Writes the snapshot file (tmp file + fsync + rename). Blocking."""
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def cut_log(self):
+        """
+        Restarts the log with only the events appended after the snapshot's capture (on the event loop,
+        no fsync here: the usual batched fsync covers it). A crash before this is harmless: the loader
+        skips log events the snapshot already covers.
+        """
+        tail, self.tail = self.tail, None
+        if self.file.closed:
+            return
+        with self.lock:
+            self.file.close()
+            self.file = open(self.log_path, "w", encoding="utf-8")
+            self.file.writelines(tail)
+            self.file.flush()
+        self.request_sync()
+
+    async def close(self, kind=None, **data):
+        """Appends the closing event, then waits for it (and any snapshot) to be on disk before closing."""
+        if kind:
+            self.append(kind, **data)
+        if self.snapshot_task is not None:
+            await self.snapshot_task
+        await render_pool.io_pool.run(self.sync)
+        with self.lock:
+            self.file.close()
+
+
+def journal_paths(thread_id, directory=None):
+    base = os.path.join(directory or config.JOURNAL_DIR, str(thread_id))
+    return base + ".log", base + ".snapshot.json"
+
+
+def session_state(session):
+    """Everything needed to rebuild the session, in JSON-friendly form."""
+    players = {}
+    for player in session.order:
+        players.setdefault(player.id, player.display_name)
+    return {
+        "thread_id": session.thread_id,
+        "draft_id": session.draft_id,
+        "auto_mode": session.auto_mode,
+        "seed": session.seed,
+        "round": session.round,
+        "current_index": session.current_index,
+        "players": [{"id": pid, "name": name} for pid, name in players.items()],
+        "order": [p.id for p in session.order],
+        "rosters": {str(uid): [{"name": p["name"], "tier": p["tier"], "sprite": p["sprite"], "round": p["round"]}
+                               for p in roster]
+                    for uid, roster in session.rosters.items()},
+        "rerolls": {str(uid): n for uid, n in session.rerolls.items()},
+        "burns": list(session.burn_log),
+        "pity_users": list(session.pity_users),
+        "closed": None
+    }
+
+
+# ==========================================
+# 🔌 ENGINE / COMMAND HOOKS
+# ==========================================
+
+def start(session):
+    """Starts a fresh journal for a new draft (replacing the thread's previous one)."""
+    log_path, snapshot_path = journal_paths(session.thread_id)
+    for path in (log_path, snapshot_path):
+        if os.path.exists(path):
+            os.remove(path)
+    session.journal = DraftJournal(session)
+    state = session_state(session)
+    session.journal.append("init", **{k: state[k] for k in ("draft_id", "auto_mode", "seed", "players", "order")})
+
+
+async def close(session, kind):
+    """Records the end ("end" or "cancel") of a draft and waits until its journal is closed on disk."""
+    draft_journal, session.journal = session.journal, None
+    if draft_journal is not None:
+        await draft_journal.close(kind)
+
+
+# ==========================================
+# ♻️ RESUME
+# ==========================================
+
+def load_state(thread_id):
+    """
+    Rebuilds the draft state dict from the snapshot plus the journal tail.
+    Returns None if the thread has no journal.
+    """
+    log_path, snapshot_path = journal_paths(thread_id)
+    state = None
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, encoding="utf-8") as f:
+            state = json.load(f)
+    if state is None and not os.path.exists(log_path):
+        return None
+
+    covered = state["seq"] if state else 0
+    last_seq = covered
+    if os.path.exists(log_path):
+        with open(log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Ignoring torn journal line for thread {thread_id}")
+                    break  # Only the last line can be torn by a crash
+                if event["seq"] <= covered:
+                    continue
+                state = apply_event(state, event)
+                last_seq = event["seq"]
+
+    if state is not None:
+        state["seq"] = last_seq
+    return state
+
+
+def apply_event(state, event):
+    kind = event["event"]
+    if kind == "init":
+        return {
+            "thread_id": None, "draft_id": event["draft_id"], "auto_mode": event["auto_mode"], "seed": event.get("seed"),
+            "round": 1, "current_index": 0, "players": event["players"], "order": event["order"],
+            "rosters": {str(p["id"]): [] for p in event["players"]},
+            "rerolls": {str(p["id"]): 0 for p in event["players"]},
+            "burns": [], "pity_users": [], "closed": None
+        }
+    if state is None:
+        return None  # Events before an init (shouldn't happen) have nothing to apply to
+
+    uid = str(event.get("user_id"))
+    if kind == "pick":
+        state["rosters"][uid].append({"name": event["name"], "tier": event["tier"], "sprite": event["sprite"],
+                                      "round": event.get("round")})
+    elif kind == "pity":
+        if event["user_id"] not in state["pity_users"]:
+            state["pity_users"].append(event["user_id"])
+    elif kind == "burn":
+        state["burns"].append({"round": event.get("round"), "user_id": event.get("user_id"), "name": event["name"]})
+    elif kind == "reroll":
+        state["rerolls"][uid] += 1
+    elif kind == "turn":
+        state["current_index"] += 1
+    elif kind == "round":
+        state["round"] += 1
+        state["order"].reverse()
+        state["current_index"] = 0
+    elif kind == "mode":
+        state["auto_mode"] = event["auto_mode"]
+    elif kind in CLOSING_EVENTS:
+        state["closed"] = kind
+    # "roll" and "resume" are informational; burns only feed the history (a resumed turn starts with a clean burn list)
+    return state
+
+
+def restore_session(thread_id, state, resolve_player):
+    """
+    Builds a live session from a loaded state. `resolve_player(user_id, name)` returns the player object.
+    The candidate index (taken/blocked masks, Mega and VIP counters) is rebuilt by replaying the picks
+    through logic.record_pick, then the journal is reattached so the draft keeps logging where it left off.
+    """
+    players = {p["id"]: resolve_player(p["id"], p["name"]) for p in state["players"]}
+    order = [players[uid] for uid in state["order"]]
+
+    # Continue from the journaled seed (offset by the journal position, so the resumed rolls aren't a replay
+    # of the first ones): the resumed draft is still reproducible from its journal
+    seed = state.get("seed")
+    seed = f"{seed}/{state['seq']}" if seed is not None else None
+    session = logic.DraftSession(thread_id, order, auto_mode=state["auto_mode"], draft_id=state["draft_id"], seed=seed)
+    with metrics.suppressed():  # Replayed picks were already counted before the crash
+        for uid, roster in state["rosters"].items():
+            for pick in roster:
+                logic.record_pick(session, int(uid), pick["name"], pick["tier"], pick["sprite"],
+                                  round_num=pick.get("round"))
+    session.rerolls.update({int(uid): n for uid, n in state["rerolls"].items()})
+    session.burn_log = list(state.get("burns", []))
+    session.pity_users = set(state["pity_users"])
+    session.round = state["round"]
+    session.current_index = state["current_index"]
+
+    # A crash between recording a pick and advancing the turn leaves the picker at the index: move past them
+    while (session.current_index < len(session.order)
+           and len(session.rosters[session.order[session.current_index].id]) >= session.round):
+        session.current_index += 1
+
+    logic.bump_summary_version(session)
+    logic.sessions[thread_id] = session
+    session.journal = DraftJournal(session, seq=state["seq"])
+    session.journal.append("resume", round=session.round, current_index=session.current_index)
+    session.journal.snapshot()  # Persist the normalized index right away
+    return session
@@ -5,28 +5,26 @@ import config
 import logic
 import views
 import engine
+import http_pool
+import render_pool
+import journal
+import history
+import metrics
+import profiling
+import pool_reload
+import catalog
+import atlas
 import logging
-import sys
+import logs
 import random
 import uuid
+import time
 
 # ==========================================
 # 📝 MASTER LOGGING SETUP
 # ==========================================
-formatter = logging.Formatter('%(asctime)s | %(levelname)-7s | %(name)-8s | %(message)s')
-
-file_handler = logging.FileHandler(config.LOG_FILE, encoding='utf-8')
-file_handler.setLevel(logging.DEBUG)
-file_handler.setFormatter(formatter)
-
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.INFO)
-console_handler.setFormatter(formatter)
-
-root_logger = logging.getLogger()
-root_logger.setLevel(logging.DEBUG)
-root_logger.addHandler(file_handler)
-root_logger.addHandler(console_handler)
+# Records are queued and written (rotating, gzip'd file + console) by a background thread, see logs.py
+logs.setup()
 
 logger = logging.getLogger("kokoloko")
 
@@ -48,31 +46,67 @@ TEST_DUMMIES = [DummyPlayer(9000 + i, f"Dummy_{i}") for i in range(1, 8)]
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
-bot = commands.Bot(command_prefix="!", intents=intents)
+
+
+class KokolokoBot(commands.Bot):
+    async def setup_hook(self):
+        # Runs once per process (on_ready fires again on every gateway reconnect)
+        logic.load_data()
+        pool_reload.start_watcher()
+        # One HTTP pool for the whole bot lifetime (sprite downloads for roster images)
+        await http_pool.start()
+        render_pool.loop_monitor.start()
+        atlas.sprite_atlas.load()
+        await metrics.start_server()
+
+    async def close(self):
+        pool_reload.stop_watcher()
+        render_pool.loop_monitor.stop()
+        render_pool.render_pool.shutdown()
+        render_pool.io_pool.shutdown(wait=True)  # Let pending history saves and journal fsyncs finish
+        history.draft_history.close()
+        await metrics.stop_server()
+        await http_pool.close()
+        await super().close()
+        logs.stop()
+
+
+bot = KokolokoBot(command_prefix="!", intents=intents)
 
 
 @bot.event
 async def on_ready():
-    logic.load_data()
     logger.info(f'🤖 KOKOLOKO: {bot.user} is ready and connected to Discord!')
     logger.info(f'   - Fake Out Chance: {config.FAKE_OUT_CHANCE * 100}%')
 
 
-@bot.command()
-async def toggle_auto(ctx):
-    """Command to cycle draft modes."""
+async def staff_command_allowed(ctx, command):
+    """Shared checks of every staff command: run in the draft thread, by someone with the staff role."""
     if not isinstance(ctx.channel, discord.Thread) or ctx.channel.name != config.THREAD_NAME:
-        return await ctx.send(views.MSG["err_thread"].format(thread=config.THREAD_NAME), delete_after=10)
+        logger.warning(f"{command} attempt outside thread. Channel: {ctx.channel.name}")
+        await ctx.send(views.MSG["err_thread"].format(thread=config.THREAD_NAME), delete_after=10)
+        return False
 
     if not discord.utils.get(ctx.author.roles, name=config.STAFF_ROLE_NAME):
-        logger.warning(f"Unauthorized toggle_auto attempt by {ctx.author}")
-        return await ctx.send(views.MSG["err_staff"])
+        logger.warning(f"Unauthorized {command} attempt by {ctx.author}")
+        await ctx.send(views.MSG["err_staff"])
+        return False
+    return True
+
+
+@bot.command()
+async def toggle_auto(ctx):
+    """Command to cycle draft modes."""
+    if not await staff_command_allowed(ctx, "toggle_auto"):
+        return
 
-    current = logic.draft_state.get("auto_mode", 0)
+    session = logic.get_session(ctx.channel.id)
+    if not session or not session.active:
+        return await ctx.send(views.MSG.get("err_no_active_draft", "⚠️ No active draft."))
 
     # Toggle strictly between 0 (Interactive) and 1 (Auto Public)
-    new_mode = 1 if current == 0 else 0
-    logic.draft_state["auto_mode"] = new_mode
+    new_mode = 1 if session.auto_mode == 0 else 0
+    logic.set_mode(session, new_mode)
 
     logger.info(f"Mode switched by {ctx.author} to {views.MSG['mode_names'][new_mode]}")
     await ctx.send(views.MSG["mode_switch"].format(mode=views.MSG['mode_names'][new_mode]))
@@ -90,55 +124,174 @@ async def summary(ctx):
         return await ctx.send(views.MSG.get("err_draft_role", "🚫 No tienes permiso."))
 
     logger.info(f"Summary requested by {ctx.author}")
-    for embed in views.create_summary_embed(logic.draft_state):
+    for embed in views.create_summary_embed(logic.get_session(ctx.channel.id)):
         await ctx.send(embed=embed)
 
 
+@bot.command()
+async def cache_stats(ctx):
+    """Staff command: shows the cache counters of this thread's draft."""
+    if not await staff_command_allowed(ctx, "cache_stats"):
+        return
+
+    session = logic.get_session(ctx.channel.id)
+    if not session:
+        return await ctx.send(views.MSG.get("err_no_active_draft", "⚠️ No active draft."))
+
+    await ctx.send(embed=views.create_cache_stats_embed(session))
+
+
+@bot.command()
+async def most_picked(ctx, limit: int = config.HISTORY_TOP_LIMIT):
+    """Staff command: most drafted Pokemon across every saved draft."""
+    if not await staff_command_allowed(ctx, "most_picked"):
+        return
+    rows = await render_pool.io_pool.run(history.draft_history.most_picked, max(1, min(limit, 25)))
+    if not rows:
+        return await ctx.send(views.MSG["err_no_history"])
+    await ctx.send(embed=views.create_most_picked_embed(rows))
+
+
+@bot.command()
+async def avg_spend(ctx, member: discord.Member = None):
+    """Staff command: average tier points spent per roster slot (everyone, or one player)."""
+    if not await staff_command_allowed(ctx, "avg_spend"):
+        return
+    rows = await render_pool.io_pool.run(history.draft_history.spend_per_slot, member.id if member else None)
+    if not rows:
+        return await ctx.send(views.MSG["err_no_history"])
+    await ctx.send(embed=views.create_spend_embed(rows, member))
+
+
+@bot.command()
+async def player_history(ctx, member: discord.Member):
+    """Staff command: a player's last saved drafts with their picks."""
+    if not await staff_command_allowed(ctx, "player_history"):
+        return
+    drafts = await render_pool.io_pool.run(history.draft_history.player_history, member.id, config.HISTORY_TOP_LIMIT)
+    if not drafts:
+        return await ctx.send(views.MSG["err_no_history"])
+    await ctx.send(embed=views.create_player_history_embed(member, drafts))
+
+
+@bot.command()
+async def perf(ctx):
+    """Staff command: latency histograms and counters collected since the bot started."""
+    if not await staff_command_allowed(ctx, "perf"):
+        return
+    await ctx.send(embed=views.create_perf_embed(metrics.summary()))
+
+
+@bot.command()
+async def profile_next(ctx):
+    """Staff command: profiles (cProfile + tracemalloc) the next draft started in this thread."""
+    if not await staff_command_allowed(ctx, "profile_next"):
+        return
+    profiling.armed_threads.add(ctx.channel.id)
+    logger.info(f"Profiling armed for the next draft in thread {ctx.channel.id} by {ctx.author}")
+    await ctx.send(views.MSG["profile_armed"])
+
+
+@bot.command()
+async def reload_pool(ctx):
+    """Staff command: re-reads pokemon_data.csv in the background and swaps it in between turns."""
+    if not await staff_command_allowed(ctx, "reload_pool"):
+        return
+    try:
+        diff = await pool_reload.reload()
+    except catalog.CatalogError as e:
+        logger.warning(f"Rejected pool reload by {ctx.author}: {e.problems}")
+        return await ctx.send(views.MSG["err_pool_invalid"].format(problems="\n".join(e.problems[:10])))
+
+    logger.info(f"Pool reload by {ctx.author}: {diff}")
+    when = views.MSG["pool_next_turn"] if diff["deferred"] else views.MSG["pool_now"]
+    await ctx.send(views.MSG["pool_reloaded"].format(when=when, **diff))
+
+
 @bot.command()
 async def cancel_draft(ctx):
     """Forcefully stops an active draft loop."""
-    if not isinstance(ctx.channel, discord.Thread) or ctx.channel.name != config.THREAD_NAME:
-        return await ctx.send(views.MSG["err_thread"].format(thread=config.THREAD_NAME), delete_after=10)
-
-    if not discord.utils.get(ctx.author.roles, name=config.STAFF_ROLE_NAME):
-        logger.warning(f"Unauthorized cancel_draft attempt by {ctx.author}")
-        return await ctx.send(views.MSG["err_staff"])
+    if not await staff_command_allowed(ctx, "cancel_draft"):
+        return
 
-    if not logic.draft_state.get("active", False):
+    session = logic.get_session(ctx.channel.id)
+    if not session or not session.active:
         return await ctx.send(views.MSG.get("err_no_active_draft", "⚠️ No active draft."))
 
     # Kill the loop by setting the counters past the finish line and disabling the active flag
-    logic.draft_state["active"] = False
-    logic.draft_state["current_index"] = 9999
-    logic.draft_state["round"] = 9999
+    session.active = False
+    session.current_index = 9999
+    session.round = 9999
 
     # === NEW: KILL RUNNING TIMERS IMMEDIATELY ===
-    current_view = logic.draft_state.get("current_view")
-    if current_view:
-        current_view.stop()
+    if session.current_view:
+        session.current_view.stop()
+    await journal.close(session, "cancel")
 
     logger.critical(f"🛑 DRAFT FORCEFULLY CANCELLED BY {ctx.author}")
     await ctx.send(views.MSG.get("draft_cancelled", "🛑 Draft Cancelled."))
 
 
+@bot.command()
+async def resume_draft(ctx):
+    """Rebuilds an interrupted draft (restart or crash) from its journal and restarts the loop at the same turn."""
+    if not await staff_command_allowed(ctx, "resume_draft"):
+        return
+
+    existing = logic.get_session(ctx.channel.id)
+    if existing and existing.loop_running:
+        return await ctx.send(views.MSG["err_draft_active"])
+
+    started = time.perf_counter()
+    state = journal.load_state(ctx.channel.id)
+    if state is None or state["closed"]:
+        return await ctx.send(views.MSG["err_nothing_to_resume"])
+
+    def resolve_player(user_id, name):
+        # Real members are looked up again; dummies (and anyone who left the server) become stand-ins without DMs
+        member = ctx.guild.get_member(user_id) if ctx.guild else None
+        return member or DummyPlayer(user_id, name)
+
+    if existing and existing.journal is not None:
+        await existing.journal.close()
+    session = journal.restore_session(ctx.channel.id, state, resolve_player)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    player = session.order[session.current_index] if session.current_index < len(session.order) else None
+    logger.info(f"♻️ [Draft ID: {session.draft_id}] Resumed by {ctx.author} in {elapsed_ms:.1f}ms "
+                f"(Round {session.round}, index {session.current_index})")
+    await ctx.send(views.MSG["draft_resumed"].format(draft_id=session.draft_id, round_num=session.round,
+                                                     player=player.display_name if player else "-"))
+
+    await engine.next_turn(session, ctx.channel, bot)
+
+
 @bot.command()
 async def start_draft(ctx, *members: discord.Member):
     """Main startup command."""
-    if not isinstance(ctx.channel, discord.Thread) or ctx.channel.name != config.THREAD_NAME:
-        logger.warning(f"Start attempt outside thread. Channel: {ctx.channel.name}")
-        return await ctx.send(views.MSG["err_thread"].format(thread=config.THREAD_NAME), delete_after=10)
-
-    if not discord.utils.get(ctx.author.roles, name=config.STAFF_ROLE_NAME):
-        logger.warning(f"Unauthorized start_draft attempt by {ctx.author}")
-        return await ctx.send(views.MSG["err_staff"])
+    if not await staff_command_allowed(ctx, "start_draft"):
+        return
 
-    # 🛑 PREVENT DOUBLE DRAFTS 🛑
-    if logic.draft_state.get("active", False):
+    # 🛑 PREVENT DOUBLE DRAFTS (per thread; other threads/guilds can draft at the same time) 🛑
+    existing = logic.get_session(ctx.channel.id)
+    if existing and existing.active:
         logger.warning(f"Blocked start_draft attempt by {ctx.author}: Draft already running.")
-        return await ctx.send(views.MSG.get("err_draft_active", "🚫 Draft already in progress."))
+        return await ctx.send(views.MSG["err_draft_active"])
 
     logger.info(f"Draft initiation started by {ctx.author}")
-    real = list(members)
+
+    # Opt-in capture (!profile_next / PROFILE_DRAFTS): covers the setup menus and the whole draft loop
+    profiler = profiling.start_if_requested(ctx.channel.id)
+    if profiler is None:
+        return await setup_and_run_draft(ctx, list(members))
+    try:
+        await setup_and_run_draft(ctx, list(members))
+    finally:
+        await profiling.finish(profiler)
+
+
+async def setup_and_run_draft(ctx, real):
+    """Setup menus (dummies, mode), session creation and announcements, then the engine loop."""
     final = []
 
     if TEST_DUMMIES:
@@ -167,12 +320,13 @@ async def start_draft(ctx, *members: discord.Member):
         return await m.edit(content=views.MSG["timeout"], embed=None, view=None)
 
     # === NEW: RANDOMIZE ORDER AND GENERATE DRAFT ID ===
-    random.shuffle(final)
+    # The snake order comes from the draft's seed too, so DRAFT_SEED replays the whole draft
+    seed = config.DRAFT_SEED if config.DRAFT_SEED is not None else random.getrandbits(64)
+    random.Random(seed).shuffle(final)
     draft_id = uuid.uuid4().hex[:6].upper() # Creates a short, unique ID like "9A4F2B"
 
-    logic.initialize_draft(final)
-    logic.draft_state["auto_mode"] = v.value
-    logic.draft_state["draft_id"] = draft_id # Store it in the state dictionary
+    session = logic.create_session(ctx.channel.id, final, auto_mode=v.value, draft_id=draft_id, seed=seed)
+    journal.start(session)
     logger.info(f"[Draft ID: {draft_id}] Draft initialized successfully. Mode: {v.value}, Players: {len(final)}")
 
     if v.value != 2:
@@ -199,12 +353,12 @@ async def start_draft(ctx, *members: discord.Member):
     else:
         logger.info(f"🏆 [Draft ID: {draft_id}] [SILENT] Started")
 
-    await engine.next_turn(ctx.channel, bot)
+    await engine.next_turn(session, ctx.channel, bot)
 
 
 if __name__ == "__main__":
     if config.TOKEN:
         logger.info("Starting bot...")
-        bot.run(config.TOKEN)
+        bot.run(config.TOKEN, log_handler=None)  # discord.py logs propagate to our queued handlers
     else:
         logger.critical("TOKEN missing in config.py")
\ No newline at end of file
@@ -1,193 +1,440 @@
 ##v0.9-alpha
 
-import os
-import pandas as pd
+import functools
 import random
 import config
+import catalog
+import metrics
 import logging
 
 logger = logging.getLogger("logic")
 
 # ==========================================
-# 🧠 GLOBAL STATE MANAGEMENT
+# 🧠 DRAFT SESSIONS
 # ==========================================
-# This dictionary holds the entire game state in memory.
-draft_state = {
-    "active": False,  # Is a draft currently running?
-    "round": 1,  # Current Round number (1 to TOTAL_POKEMON)
-    "order": [],  # List of Player objects in Snake Order
-    "current_index": 0,  # Index of the player whose turn it currently is
-    "rosters": {},  # Dictionary: {user_id: [List of Pokemon Dicts]}
-    "rerolls": {},  # Dictionary: {user_id: Int (Rerolls Used)}
-    "points": {},  # Dictionary: {user_id: Int (Points Spent)}
-    "burned": [],  # List of Pokemon names rejected/burned in the CURRENT turn
-    "auto_mode": 0  # 0=Interactive, 1=Auto Public, 2=Auto Silent
-}
-
-# DataFrames to hold the CSV data and lookups
-pokemon_db = pd.DataFrame()
-root_map = {}  # Maps full names to their "Root Family Name" (e.g. "Mega Charizard X" -> "charizard")
+class DraftSession:
+    """
+    Holds the entire game state of ONE draft.
+    Every draft thread gets its own session, so several leagues can draft at the same time.
+    """
+
+    def __init__(self, thread_id, players=(), auto_mode=0, draft_id=None, seed=None):
+        self.thread_id = thread_id  # Discord thread the draft runs in (registry key)
+        self.draft_id = draft_id  # Short human-readable ID shown in the thread and logs
+        self.active = False  # Is this draft currently running?
+        self.round = 1  # Current Round number (1 to TOTAL_POKEMON)
+        self.order = []  # List of Player objects in Snake Order
+        self.current_index = 0  # Index of the player whose turn it currently is
+        self.rosters = {}  # Dictionary: {user_id: [List of Pokemon Dicts]}
+        self.rerolls = {}  # Dictionary: {user_id: Int (Rerolls Used)}
+        self.points = {}  # Dictionary: {user_id: Int (Points Spent)}
+        self.burned = []  # List of Pokemon names rejected/burned in the CURRENT turn
+        self.burn_log = []  # Every burn of the draft: [{"round", "user_id", "name"}] (saved to the draft history)
+        self.auto_mode = auto_mode  # 0=Interactive, 1=Auto Public, 2=Auto Silent
+        self.current_view = None  # Active RollView/DraftView (stopped on cancel)
+        self.phase = None  # Current engine phase (see engine.py)
+        self.loop_running = False  # True while engine.next_turn is driving this session
+        self.pity_users = set()  # Users whose Pick #6 was forced into the Mega pool
+
+        # Incremental candidate index (row bitmasks, see catalog.Catalog)
+        self.catalog = pokemon_db  # Catalog the masks below index; rebound to a reloaded one at a turn start
+        self.taken_mask = 0  # Rows already drafted by anyone
+        self.burned_mask = 0  # Rows burned in the CURRENT turn
+        self.blocked_roots = {}  # {user_id: Bitmask of rows sharing a family with their roster}
+        self.mega_counts = {}  # {user_id: {"total", "high", "low"} Megas owned}
+        self.vip_counts = {}  # {user_id: {300, 260, 240} picks owned}
+        self.tier_pools = {}  # {tier: [Untaken rows]}, swap-removed as picks are made (O(1) uniform draws)
+        self.pool_index = {}  # {row: Position in its tier pool}
+
+        # Per-draft RNG: every roll of this draft comes from here, so a seed replays the whole draft
+        if seed is None:
+            seed = config.DRAFT_SEED if config.DRAFT_SEED is not None else random.getrandbits(64)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # Turn-scoped memo of pool, tiers and odds.
+        # Entries are only valid for the state version they were computed at.
+        self.version = 0  # Bumped on every roster/points/burned mutation
+        self.cache_version = -1  # Version the cache entries belong to
+        self.cache = {}  # {(function name, user_id, pick_number, is_reroll): result}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # Rendered summary embeds (see views.py), only rebuilt when what they show changes
+        self.summary_version = 0  # Bumped when a roster, points, rerolls or the snake order change
+        self.render_cache = {}  # {"summary" or ("personal", user_id): (summary_version, embeds)}
+        self.render_hits = 0
+        self.render_misses = 0
+
+        self.journal = None  # journal.DraftJournal of a live bot draft (None in simulations and benchmarks)
+
+        if players:
+            initialize_draft(self, players)
+
+
+# Registry of sessions, keyed by thread id. Finished sessions stay until the thread starts a new draft,
+# so `!summary` keeps working after the end.
+sessions = {}
+
+
+def get_session(thread_id):
+    """Returns the session of a thread, or None."""
+    return sessions.get(thread_id)
+
+
+def create_session(thread_id, players, auto_mode=0, draft_id=None, seed=None):
+    """Creates a fresh session for a thread (replacing any finished one) and registers it."""
+    session = DraftSession(thread_id, players, auto_mode=auto_mode, draft_id=draft_id, seed=seed)
+    sessions[thread_id] = session
+    return session
+
+
+# Compact, column-oriented catalog of the CSV (see catalog.Catalog).
+# Every catalog row owns one bit (bit N = row N), so a set of rows is a plain Python int
+# and a candidate query is a handful of AND/NOT operations instead of a table rebuild.
+pokemon_db = catalog.Catalog()
+iter_rows = catalog.iter_rows
 
 
 # ==========================================
 # 🔧 DATA HELPERS
 # ==========================================
 
-def normalize_root(row):
+def load_data():
+    """
+    Loads the CSV file into the compact catalog and builds its tier/family/Mega indexes.
+    Served from the binary catalog cache when it was built from this exact CSV.
+    Must be called on bot startup.
+    """
+    global pokemon_db
+    loaded = catalog.load_catalog_cached(config.CSV_FILE, config.CATALOG_CACHE_FILE)
+    if loaded is not None:
+        pokemon_db = loaded
+        logger.info(f"✅ Logic: CSV Loaded ({len(pokemon_db)} rows).")
+    else:
+        logger.error(f"❌ Logic Error: File {config.CSV_FILE} not found.")
+
+
+def stage_catalog(new_catalog):
+    """
+    Makes a validated catalog the live one. New drafts start on it; a draft loop that is running keeps
+    its own catalog until its next turn start (see rebind_catalog), so no turn ever changes catalog midway.
+    Returns how many running drafts will switch at their next turn.
+    """
+    global pokemon_db
+    pokemon_db = new_catalog
+    deferred = 0
+    for session in sessions.values():
+        if session.loop_running:
+            deferred += 1
+        else:
+            rebind_catalog(session)
+    logger.info(f"✅ Logic: Catalog swapped ({len(pokemon_db)} rows), {deferred} running draft(s) switch next turn.")
+    return deferred
+
+
+def rebind_catalog(session):
     """
-    Determines the 'Family ID' (Root Name) for a Pokemon.
-    Used to implement the rule: "You cannot own both Base and Mega of the same species."
+    Moves a session onto the live catalog if it still indexes an older one. Returns True if it moved.
+    Called between turns, and synchronously on the event loop, so no rule ever sees half of one catalog
+    and half of the other.
+    """
+    if session.catalog is pokemon_db:
+        return False
+    session.catalog = pokemon_db
+    reindex_session(session)
+    return True
 
-    Logic:
-    1. If it's a MEGA (Mega='Y'):
-       - Strip 'mega ' prefix.
-       - Strip ' x' or ' y' suffixes.
-    2. If it's NOT a Mega:
-       - Use the name as is.
 
-    Note: Primal Groudon/Kyogre are handled by Tier Restrictions (High Caps), not name matching.
+def reindex_session(session):
+    """
+    Rebuilds the row bitmasks of a session from its rosters and burned list against its catalog (row numbers
+    differ between catalogs). Recorded picks keep the tier and Mega flag they were drafted with.
+    """
+    db = session.catalog
+    session.taken_mask = 0
+    for user_id, roster in session.rosters.items():
+        blocked = 0
+        for pick in roster:
+            session.taken_mask |= db.name_masks.get(pick['name'], 0)
+            blocked |= db.family_mask(pick['name'])
+        session.blocked_roots[user_id] = blocked
+
+    session.burned_mask = 0
+    for name in session.burned:
+        session.burned_mask |= db.name_masks.get(name, 0)
+    build_tier_pools(session)
+    bump_state_version(session)
+
+
+def get_row_data(session, row_id):
     """
-    name = str(row['name']).lower().strip()
-    is_mega = str(row['mega']).strip().upper() == 'Y'
+    Extracts a row of the session's catalog as a pick tuple.
+    Returns: Name, Tier, Sprite URL
+    """
+    return session.catalog.row(row_id)
+
+
+def initialize_draft(session, players):
+    """Resets all draft state variables of a session for a fresh game."""
+    session.order = list(players)
+    session.rosters = {p.id: [] for p in players}
+    session.rerolls = {p.id: 0 for p in players}
+    session.points = {p.id: 0 for p in players}
+    session.round = 1
+    session.current_index = 0
+    session.active = True
+    session.burned = []
+    session.burn_log = []
+    session.pity_users = set()
+    session.catalog = pokemon_db
+    session.taken_mask = 0
+    session.burned_mask = 0
+    session.blocked_roots = {p.id: 0 for p in players}
+    session.mega_counts = {p.id: {"total": 0, "high": 0, "low": 0} for p in players}
+    session.vip_counts = {p.id: {300: 0, 260: 0, 240: 0} for p in players}
+    build_tier_pools(session)
+    bump_state_version(session)
+    bump_summary_version(session)
+    logger.info(f"Draft logic fully reset and initialized (RNG seed {session.seed}).")
+
+
+def build_tier_pools(session):
+    """Rebuilds the per-tier pools of untaken rows from the catalog and the taken mask."""
+    taken = session.taken_mask
+    session.tier_pools = {tier: [row for row in rows if not taken >> row & 1]
+                          for tier, rows in session.catalog.tier_rows.items()}
+    session.pool_index = {row: i for pool in session.tier_pools.values() for i, row in enumerate(pool)}
+
+
+def remove_from_pools(session, mask):
+    """Swap-removes rows from their tier pool: the last row moves into the hole, so removal is O(1)."""
+    for row in iter_rows(mask):
+        i = session.pool_index.pop(row, None)
+        if i is None:
+            continue
+        pool = session.tier_pools[session.catalog.tiers[row]]
+        last = pool.pop()
+        if last != row:
+            pool[i] = last
+            session.pool_index[last] = i
+
+
+# =========================================
+# ✏️ STATE MUTATIONS
+# =========================================
+# All roster/burn/turn changes go through these helpers so the candidate index, caches and journal stay in sync.
+
+def bump_state_version(session):
+    """Marks the session state as changed. Never reset, so old cache entries can't be mistaken as fresh."""
+    session.version += 1
+
+
+def log_event(session, kind, **data):
+    """Appends an event to the session's crash-recovery journal, if it has one."""
+    if session.journal is not None:
+        session.journal.append(kind, **data)
+
+
+def bump_summary_version(session):
+    """Marks what the summary embeds show (rosters, points, rerolls, order) as changed."""
+    session.summary_version += 1
+
+
+def record_pick(session, user_id, name, tier, sprite_url, round_num=None):
+    """
+    Adds a Pokemon to a user's roster, charges its tier, and marks it taken in the index.
+    The Mega flag and the round it was drafted in are stored on the roster entry, and the running
+    Mega/VIP counters are updated here, so the validation rules never have to rescan the roster.
+    """
+    db = session.catalog
+    is_mega = db.is_mega(name)
+    round_num = round_num or session.round
+
+    session.rosters[user_id].append({'name': name, 'tier': tier, 'sprite': sprite_url, 'mega': is_mega, 'round': round_num})
+    session.points[user_id] += tier
 
     if is_mega:
-        # Remove "mega " prefix
-        if name.startswith("mega "):
-            name = name[5:].strip()
+        counts = session.mega_counts[user_id]
+        counts["total"] += 1
+        if tier >= 240:
+            counts["high"] += 1
+        else:
+            counts["low"] += 1
 
-        # Remove Suffixes (Variant X/Y)
-        if name.endswith(" x"):
-            name = name[:-2].strip()
-        elif name.endswith(" y"):
-            name = name[:-2].strip()
+    vip = session.vip_counts[user_id]
+    if tier in vip:
+        vip[tier] += 1
 
-    return name
+    picked_rows = db.name_masks.get(name, 0)
+    session.taken_mask |= picked_rows
+    remove_from_pools(session, picked_rows)
+    blocked = session.blocked_roots.get(user_id, 0)
+    session.blocked_roots[user_id] = blocked | db.family_mask(name)
+    bump_state_version(session)
+    bump_summary_version(session)
+    metrics.picks_total.inc(mode=session.auto_mode)
+    log_event(session, "pick", user_id=user_id, name=name, tier=tier, sprite=sprite_url, round=round_num)
 
 
-def load_data():
+def use_reroll(session, user_id):
+    """Spends one of the user's rerolls. Returns how many they have left."""
+    session.rerolls[user_id] = session.rerolls.get(user_id, 0) + 1
+    bump_summary_version(session)
+    log_event(session, "reroll", user_id=user_id)
+    return config.MAX_REROLLS - session.rerolls[user_id]
+
+
+def advance_round(session):
+    """Starts the next round: the snake order flips and the first player of the new order picks."""
+    session.round += 1
+    session.order.reverse()
+    session.current_index = 0
+    bump_summary_version(session)
+    log_event(session, "round", round=session.round)
+
+
+def advance_turn(session):
+    """Moves on to the next player of the round."""
+    session.current_index += 1
+    log_event(session, "turn", current_index=session.current_index)
+
+
+def set_mode(session, auto_mode):
+    """Switches the draft mode (0=Interactive, 1=Auto Public, 2=Auto Silent)."""
+    session.auto_mode = auto_mode
+    log_event(session, "mode", auto_mode=auto_mode)
+
+
+def burn_pokemon(session, name):
+    """Excludes a rerolled Pokemon from the pool for the rest of the CURRENT turn."""
+    user_id = session.order[session.current_index].id
+    session.burned.append(name)
+    session.burned_mask |= session.catalog.name_masks.get(name, 0)
+    session.burn_log.append({"round": session.round, "user_id": user_id, "name": name})
+    bump_state_version(session)
+    log_event(session, "burn", user_id=user_id, name=name, round=session.round)
+
+
+def reset_burned(session):
+    """Clears the per-turn burned list at the start of every turn."""
+    session.burned = []
+    session.burned_mask = 0
+    bump_state_version(session)
+
+
+# =========================================
+# 🗃️ TURN CACHE
+# =========================================
+
+def turn_cached(func):
     """
-    Loads the CSV file into pandas, normalizes columns, and builds the Root Map.
-    Must be called on bot startup.
+    Memoizes a (session, user_id, pick_number, is_reroll) query until the next state mutation.
+    One interactive turn asks for the same pool up to 3-4 times (odds, roll, Fake Out).
     """
-    global pokemon_db, root_map
-    if os.path.exists(config.CSV_FILE):
-        pokemon_db = pd.read_csv(config.CSV_FILE)
-        # Lowercase columns for consistency
-        pokemon_db.columns = pokemon_db.columns.str.strip().str.lower()
 
-        # Standardize Mega column to 'Y' or 'N'
-        if 'mega' in pokemon_db.columns:
-            pokemon_db['mega'] = pokemon_db['mega'].str.strip().str.upper()
+    @functools.wraps(func)
+    def wrapper(session, user_id, pick_number=None, is_reroll=False):
+        if session.cache_version != session.version:
+            session.cache.clear()
+            session.cache_version = session.version
+
+        key = (func.__name__, user_id, pick_number, is_reroll)
+        if key in session.cache:
+            session.cache_hits += 1
+            result = session.cache[key]
         else:
-            pokemon_db['mega'] = 'N'
+            session.cache_misses += 1
+            result = func(session, user_id, pick_number, is_reroll)
+            session.cache[key] = result
 
-        # Generate Root Names for Family Protection
-        pokemon_db['root_name'] = pokemon_db.apply(normalize_root, axis=1)
-        root_map = dict(zip(pokemon_db['name'], pokemon_db['root_name']))
+        # Hand out copies so callers can't corrupt the cached value
+        return result.copy() if isinstance(result, (list, dict)) else result
 
-        logger.info(f"✅ Logic: CSV Loaded ({len(pokemon_db)} rows).")
-    else:
-        logger.error(f"❌ Logic Error: File {config.CSV_FILE} not found.")
+    return wrapper
 
 
-def initialize_draft(players):
-    """Resets all draft state variables for a fresh game."""
-    draft_state["order"] = players
-    draft_state["rosters"] = {p.id: [] for p in players}
-    draft_state["rerolls"] = {p.id: 0 for p in players}
-    draft_state["points"] = {p.id: 0 for p in players}
-    draft_state["round"] = 1
-    draft_state["current_index"] = 0
-    draft_state["active"] = True
-    draft_state["burned"] = []
-    logger.info("Draft logic fully reset and initialized.")
+def get_cache_stats(session):
+    """Returns the turn cache counters of a session (for logs and staff diagnostics)."""
+    lookups = session.cache_hits + session.cache_misses
+    return {
+        "hits": session.cache_hits,
+        "misses": session.cache_misses,
+        "entries": len(session.cache),
+        "hit_rate": (session.cache_hits / lookups) if lookups else 0.0
+    }
 
 
 # =========================================
 # 🔍 VALIDATION LOGIC
 # =========================================
 
-def get_mega_counts(user_id):
+def get_mega_counts(session, user_id):
     """
     Counts how many Megas a user has, split by High Tier (>=240) and Low Tier (<240).
+    Reads the running counters maintained by record_pick().
     Returns: (Total Megas, High Megas, Low Megas)
     """
-    roster = draft_state["rosters"].get(user_id, [])
-    high = 0
-    low = 0
-    total = 0
-    for p in roster:
-        # Check DB for Mega Status
-        match = pokemon_db[pokemon_db['name'] == p['name']]
-        if not match.empty:
-            is_mega = match.iloc[0]['mega'] == 'Y'
-            if is_mega:
-                total += 1
-                if p['tier'] >= 240:
-                    high += 1
-                else:
-                    low += 1
-    return total, high, low
-
-
-def get_mega_status(user_id):
+    counts = session.mega_counts.get(user_id)
+    if not counts:
+        return 0, 0, 0
+    return counts["total"], counts["high"], counts["low"]
+
+
+def get_mega_status(session, user_id):
     """
     Determines if a user is allowed to pick more Megas based on the Cap.
     Rule: Max 1 High Mega OR 2 Low Megas.
     """
-    total, high, low = get_mega_counts(user_id)
+    total, high, low = get_mega_counts(session, user_id)
     if high >= 1: return 'NO_MEGAS'  # Cap reached (High)
     if low >= 2: return 'NO_MEGAS'  # Cap reached (Low)
     if low == 1: return 'LOW_ONLY'  # Can only pick one more Low Mega
     return 'ALL_ALLOWED'
 
 
-def get_valid_candidates(user_id, pick_number=None, is_reroll=False):
+@turn_cached
+@metrics.timed(metrics.candidate_query_seconds, query="candidates")
+def get_valid_candidates(session, user_id, pick_number=None, is_reroll=False):
     """
-    Returns the DataFrame of Pokemon allowed for this specific pick.
+    Returns the bitmask of catalog rows allowed for this specific pick.
     Applies: Global Exclusion, Burned List, Family Protection, Pity Rule, Mega Caps.
     """
-    candidates = pokemon_db.copy()
-    logger.debug(f"[WATERFALL LOG] Start Pool Size: {len(candidates)}")
+    db = session.catalog
+    tier_masks = db.tier_masks
+    candidates = db.all_mask
+    # Hot path: the waterfall lines are built lazily, and only when DEBUG is on (the counts aren't free)
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug: logger.debug("[WATERFALL LOG] Start Pool Size: %d", candidates.bit_count())
 
     # 1. REMOVE GLOBALLY PICKED POKEMON
-    all_picked = []
-    for roster in draft_state["rosters"].values():
-        for p in roster:
-            all_picked.append(p['name'])
-
     # Also remove pokemon "burned" (skipped) in this turn
-    excluded_names = set(draft_state['burned'] + all_picked)
-    candidates = candidates[~candidates['name'].isin(excluded_names)]
-    logger.debug(f"[WATERFALL LOG] After Global/Burned Filters: {len(candidates)} remaining.")
+    candidates &= ~(session.taken_mask | session.burned_mask)
+    if debug: logger.debug("[WATERFALL LOG] After Global/Burned Filters: %d remaining.", candidates.bit_count())
 
     # 2. FAMILY PROTECTION (ROOT NAME CHECK)
     # If user owns 'Charizard', remove all 'Mega Charizard X/Y'
-    user_roster = draft_state["rosters"].get(user_id, [])
-    owned_roots = set()
-    for p in user_roster:
-        r_name = root_map.get(p['name'])
-        if r_name:
-            owned_roots.add(r_name)
-
-    # Filter out anything sharing a root name
-    candidates = candidates[~candidates['root_name'].isin(owned_roots)]
-    logger.debug(f"[WATERFALL LOG] After Family Roots {owned_roots}: {len(candidates)} remaining.")
+    candidates &= ~session.blocked_roots.get(user_id, 0)
+    if debug: logger.debug("[WATERFALL LOG] After Family Roots: %d remaining.", candidates.bit_count())
 
     # 3. MEGA PITY RULE
     # Logic: If Pick #6, User has 0 Megas, and this is the FIRST roll (not reroll)
-    mega_total, _, _ = get_mega_counts(user_id)
+    mega_total, _, _ = get_mega_counts(session, user_id)
     if pick_number == 6 and mega_total == 0 and not is_reroll:
 
         # Check if they can actually afford a mega before forcing it
-        points_spent = draft_state["points"].get(user_id, 0)
+        points_spent = session.points.get(user_id, 0)
         max_affordable_now = (config.MAX_POINTS - points_spent) - (
                 (config.TOTAL_POKEMON - pick_number) * config.MIN_TIER_COST)
-        megas_only = candidates[candidates['mega'] == 'Y']
+        megas_only = candidates & db.mega_mask
+        cheapest_mega = min((t for t, mask in tier_masks.items() if mask & megas_only), default=None)
 
-        if not megas_only.empty and max_affordable_now >= megas_only['tier'].min():
+        if cheapest_mega is not None and max_affordable_now >= cheapest_mega:
             logger.info(f"Pity rule activated for user {user_id}. Forcing Megas.")
-            logger.debug(f"[WATERFALL LOG] Pity Rule Applied. Forced Pool Size: {len(megas_only)}")
+            if user_id not in session.pity_users:
+                session.pity_users.add(user_id)
+                log_event(session, "pity", user_id=user_id)
+            if debug: logger.debug("[WATERFALL LOG] Pity Rule Applied. Forced Pool Size: %d", megas_only.bit_count())
             return megas_only
         else:
             # They spent too much to afford the cheapest Mega. Let them skip the pity rule.
@@ -195,84 +442,123 @@ def get_valid_candidates(user_id, pick_number=None, is_reroll=False):
                 f"Pity rule skipped for user {user_id}: too broke for a Mega (Max affordable: {max_affordable_now})")
 
     # 4. STANDARD MEGA CAPS
-    mega_status = get_mega_status(user_id)
+    mega_status = get_mega_status(session, user_id)
     if mega_status == 'NO_MEGAS':
-        candidates = candidates[candidates['mega'] != 'Y']
+        candidates &= ~db.mega_mask
     elif mega_status == 'LOW_ONLY':
         # Allow Non-Megas OR Low Tier Megas
-        condition = (candidates['mega'] != 'Y') | (candidates['tier'] < 240)
-        candidates = candidates[condition]
+        candidates &= ~db.high_mega_mask
 
-    logger.debug(f"[WATERFALL LOG] After Mega Cap ({mega_status}): {len(candidates)} remaining.")
+    if debug: logger.debug("[WATERFALL LOG] After Mega Cap (%s): %d remaining.", mega_status, candidates.bit_count())
 
     return candidates
 
 
-def get_valid_tiers(user_id, pick_number, is_reroll=False):
-    """
-    Calculates which Tiers are clickable on the wheel.
-    Applies: High Tier Rule (A) and Salary Cap (B).
-    """
-    user_roster = draft_state["rosters"].get(user_id, [])
-    points_spent = draft_state["points"].get(user_id, 0)
+# =========================================
+# 🎚️ TIER ELIGIBILITY TABLE
+# =========================================
+# A set of tiers is a bitmask over TIER_ORDER (bit N = TIER_ORDER[N]), in the wheel order of TIER_PROBS.
+TIER_ORDER = tuple(config.TIER_PROBS)
+TIER_BITS = {tier: 1 << i for i, tier in enumerate(TIER_ORDER)}
+HIGH_TIERS = (300, 260, 240)
+MAX_TIER = max(TIER_ORDER)
 
-    # Get available pool
-    valid_candidates_df = get_valid_candidates(user_id, pick_number, is_reroll)
-    available_tiers = set(valid_candidates_df['tier'].unique())
 
-    allowed = list(config.TIER_PROBS.keys())
-    allowed = [t for t in allowed if t in available_tiers]
+def tier_set_mask(tiers):
+    mask = 0
+    for tier in tiers:
+        mask |= TIER_BITS[tier]
+    return mask
 
-    logger.debug(f"[TIER LOG] Tiers populated by valid candidates: {allowed}")
 
-    # --- RULE A: HIGH TIER RESTRICTIONS ---
-    count_300 = sum(1 for p in user_roster if p['tier'] == 300)
-    count_260 = sum(1 for p in user_roster if p['tier'] == 260)
-    count_240 = sum(1 for p in user_roster if p['tier'] == 240)
+@functools.lru_cache(maxsize=None)
+def tiers_in_mask(mask):
+    """The tiers of a tier bitmask, in TIER_PROBS order (a tuple: shared by every caller)."""
+    return tuple(tier for tier in TIER_ORDER if mask & TIER_BITS[tier])
+
 
-    # Logic:
+@functools.lru_cache(maxsize=1024)
+def rule_tier_mask(count_300, count_260, count_240, max_affordable_now):
+    """
+    Tiers allowed by the High Tier Rule (A) and the Salary Cap (B) alone, as a bitmask.
+    Depends only on this small signature, so it is computed once per signature and then looked up;
+    get_valid_tiers() intersects it with the tiers that still have candidates.
+    """
+    banned = set()
+    # --- RULE A: HIGH TIER RESTRICTIONS ---
     # 1. Owning ONE Tier 300 bans all 300/260/240
     # 2. Owning TWO High Tiers (260/240) bans all 300/260/240
-    if count_300 > 0:
-        for t in [300, 260, 240]:
-            if t in allowed: allowed.remove(t)
-    elif (count_260 + count_240) >= 2:
-        for t in [300, 260, 240]:
-            if t in allowed: allowed.remove(t)
-    else:
-        # Intermediate Steps
-        if count_260 > 0:
-            if 300 in allowed: allowed.remove(300)
-            if 260 in allowed: allowed.remove(260)
-        elif count_240 > 0:
-            if 300 in allowed: allowed.remove(300)
-
-    logger.debug(f"[TIER LOG] Tiers after VIP/High Tier Rules: {allowed}")
+    if count_300 > 0 or (count_260 + count_240) >= 2:
+        banned.update(HIGH_TIERS)
+    # Intermediate Steps
+    elif count_260 > 0:
+        banned.update((300, 260))
+    elif count_240 > 0:
+        banned.add(300)
 
     # --- RULE B: SALARY CAP ---
-    points_remaining = config.MAX_POINTS - points_spent
+    # Remove too expensive tiers
+    return tier_set_mask(t for t in TIER_ORDER if t not in banned and t <= max_affordable_now)
+
+
+def rule_signature(session, user_id, pick_number):
+    """
+    The (count_300, count_260, count_240, max_affordable_now) key of rule_tier_mask().
+    Counts are clamped where the rules stop caring, and the budget to the priciest tier, to keep the table small.
+    """
+    vip = session.vip_counts.get(user_id, {})
+    points_remaining = config.MAX_POINTS - session.points.get(user_id, 0)
     picks_remaining_total = config.TOTAL_POKEMON - (pick_number - 1)
     future_picks_needed = picks_remaining_total - 1
 
     # Reserve cash calculation
     reserve_cash = future_picks_needed * config.MIN_TIER_COST
     max_affordable_now = points_remaining - reserve_cash
+    return (min(vip.get(300, 0), 1), min(vip.get(260, 0), 2), min(vip.get(240, 0), 2),
+            min(max_affordable_now, MAX_TIER))
 
-    # Remove too expensive tiers
-    allowed = [t for t in allowed if t <= max_affordable_now]
 
-    logger.debug(f"[TIER LOG] Tiers after Budget Check (Max Affordable: {max_affordable_now}): {allowed}")
+def populated_tier_mask(session, candidates):
+    """Bitmask of the tiers that still hold at least one of these candidate rows."""
+    tier_masks = session.catalog.tier_masks
+    mask = 0
+    for tier, bit in TIER_BITS.items():
+        if tier_masks.get(tier, 0) & candidates:
+            mask |= bit
+    return mask
+
+
+@turn_cached
+@metrics.timed(metrics.candidate_query_seconds, query="tiers")
+def get_valid_tiers(session, user_id, pick_number, is_reroll=False):
+    """
+    Calculates which Tiers are clickable on the wheel.
+    Applies: High Tier Rule (A) and Salary Cap (B), looked up in the memoized rule table.
+    """
+    # Get available pool
+    candidates = get_valid_candidates(session, user_id, pick_number, is_reroll)
+    populated = populated_tier_mask(session, candidates)
+
+    signature = rule_signature(session, user_id, pick_number)
+    allowed = list(tiers_in_mask(populated & rule_tier_mask(*signature)))
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[TIER LOG] Tiers populated by valid candidates: %s", tiers_in_mask(populated))
+        logger.debug("[TIER LOG] Tiers after VIP/High Tier Rules and Budget Check (VIP 300/260/240: %d/%d/%d, "
+                     "Max Affordable: %d): %s", *signature, allowed)
 
     if not allowed:
+        points_spent = session.points.get(user_id, 0)
         logger.warning(
             f"CRITICAL: Allowed Tiers dropped to ZERO for User {user_id}! Points Spent: {points_spent}, Pick: {pick_number}")
 
     return allowed
 
 
-def calculate_tier_percentages(user_id, pick_number, is_reroll=False):
+@turn_cached
+def calculate_tier_percentages(session, user_id, pick_number, is_reroll=False):
     """Recalculates display percentages based on valid tiers."""
-    valid_tiers = get_valid_tiers(user_id, pick_number, is_reroll)
+    valid_tiers = get_valid_tiers(session, user_id, pick_number, is_reroll)
     current_sum = sum(config.TIER_PROBS[t] for t in valid_tiers)
     if current_sum == 0: return {}
     stats = {}
@@ -282,66 +568,111 @@ def calculate_tier_percentages(user_id, pick_number, is_reroll=False):
     return stats
 
 
-def roll_pokemon(valid_tiers, user_id, pick_number, is_reroll=False):
+# =========================================
+# 🎲 SAMPLING ENGINE
+# =========================================
+# Draws from a tier pool that also holds rows this player can't take (burned, family, Mega caps)
+# before falling back to listing the exact candidates of the tier.
+POOL_DRAW_ATTEMPTS = 8
+
+
+@functools.lru_cache(maxsize=256)
+def alias_table(tier_mask):
     """
-    Executes the RNG roll.
-    1. Weighted Random Choice of Tier.
-    2. Uniform Random Choice of Pokemon within that Tier.
+    Walker/Vose alias table of the TIER_PROBS weights of a tier set: (tiers, probabilities, aliases).
+    Built once per valid-tier bitmask, then every weighted tier draw is O(1).
+    """
+    tiers = tiers_in_mask(tier_mask)
+    total = sum(config.TIER_PROBS[t] for t in tiers)
+    if not total:
+        return tiers, (), ()
+
+    n = len(tiers)
+    scaled = [config.TIER_PROBS[t] * n / total for t in tiers]
+    prob = [1.0] * n
+    alias = list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s], alias[s] = scaled[s], l
+        scaled[l] -= 1.0 - scaled[s]
+        (small if scaled[l] < 1.0 else large).append(l)
+    return tiers, tuple(prob), tuple(alias)
+
+
+def draw_tier(rng, tier_mask):
+    """Weighted tier draw from the alias table (one random number: column, then coin). None if no weight."""
+    tiers, prob, alias = alias_table(tier_mask)
+    if not prob:
+        return None
+    u = rng.random() * len(tiers)
+    i = int(u)
+    return tiers[i] if u - i < prob[i] else tiers[alias[i]]
+
+
+def draw_row(session, tier, candidates):
+    """Uniform draw of a candidate row of a tier: rejection sampling on the swap-remove pool, then an exact scan."""
+    rng = session.rng
+    pool = session.tier_pools.get(tier)
+    if pool:
+        for _ in range(POOL_DRAW_ATTEMPTS):
+            row = pool[int(rng.random() * len(pool))]
+            if candidates >> row & 1:
+                return row
+
+    rows = list(iter_rows(candidates & session.catalog.tier_masks.get(tier, 0)))
+    return rows[int(rng.random() * len(rows))] if rows else None
+
+
+@metrics.timed(metrics.roll_seconds)
+def roll_pokemon(session, valid_tiers, user_id, pick_number, is_reroll=False):
+    """
+    Executes the RNG roll with the session's seeded RNG.
+    1. Weighted Random Choice of Tier (alias table of the valid tier set).
+    2. Uniform Random Choice of Pokemon within that Tier (tier pool).
     Returns: Name, Tier, Sprite URL
     """
     if not valid_tiers:
         logger.error(f"roll_pokemon failed: No valid_tiers provided for User {user_id}")
         return None, "NO_VALID_TIERS", ""
 
-    current_sum = sum(config.TIER_PROBS[t] for t in valid_tiers)
-    if current_sum == 0:
+    selected_tier = draw_tier(session.rng, tier_set_mask(valid_tiers))
+    if selected_tier is None:
         logger.error(f"roll_pokemon failed: TIER_PROBS sum is zero for valid tiers: {valid_tiers}")
         return None, "ZERO_SUM", ""
 
-    weights = [config.TIER_PROBS[t] / current_sum for t in valid_tiers]
-    selected_tier = random.choices(valid_tiers, weights=weights, k=1)[0]
+    logger.debug("RNG Selected Tier: %s (Valid Tiers: %s)", selected_tier, valid_tiers)
 
-    logger.debug(f"RNG Selected Tier: {selected_tier} (Valid Tiers: {valid_tiers})")
+    candidates_pool = get_valid_candidates(session, user_id, pick_number, is_reroll)
+    row = draw_row(session, selected_tier, candidates_pool)
 
-    candidates_pool = get_valid_candidates(user_id, pick_number, is_reroll)
-    tier_pool = candidates_pool[candidates_pool['tier'] == selected_tier]
-
-    if tier_pool.empty:
+    if row is None:
         logger.error(
             f"roll_pokemon failed: Selected Tier {selected_tier} is empty! This should not happen if valid_tiers was built correctly.")
         return None, "EMPTY_TIER_POOL", ""
 
-    picked = tier_pool.sample(n=1).iloc[0]
-
-    # Safely extract the sprite URL using 'sprite' (singular) as defined in your CSV
-    sprite_url = str(picked['sprite']) if 'sprite' in picked else ""
-    if sprite_url.lower() == "nan": sprite_url = ""
-
-    return picked['name'], int(picked['tier']), sprite_url
+    return get_row_data(session, row)
 
 
 # --- EASTER EGG HELPER ---
-def get_fake_candidate(user_id, pick_number, is_reroll):
+def get_fake_candidate(session, user_id, pick_number, is_reroll):
     """
     Finds a Pokemon from Tiers 300 or 260 from the available pool.
     Used for the Delibird Fake Out Easter Egg.
     Returns: Name, Tier, Sprite URL
     """
-    candidates = get_valid_candidates(user_id, pick_number, is_reroll)
-    high_tiers = candidates[candidates['tier'].isin([300, 260])]
+    tier_masks = session.catalog.tier_masks
+    high_tier_mask = tier_masks.get(300, 0) | tier_masks.get(260, 0)
 
-    if high_tiers.empty:
+    candidates = get_valid_candidates(session, user_id, pick_number, is_reroll)
+    high_tiers = list(iter_rows(candidates & high_tier_mask))
+
+    if not high_tiers:
         # Fallback: Just grab any unpicked Tier 300/260 globally
-        all_picked = [p['name'] for roster in draft_state["rosters"].values() for p in roster]
-        high_tiers = pokemon_db[(pokemon_db['tier'].isin([300, 260])) & (~pokemon_db['name'].isin(all_picked))]
+        high_tiers = list(iter_rows(high_tier_mask & ~session.taken_mask))
 
-        if high_tiers.empty:
+        if not high_tiers:
             return None, None, ""
 
-    picked = high_tiers.sample(n=1).iloc[0]
-
-    # Safely extract the sprite URL
-    sprite_url = str(picked['sprite']) if 'sprite' in picked else ""
-    if sprite_url.lower() == "nan": sprite_url = ""
-
-    return picked['name'], int(picked['tier']), sprite_url
\ No newline at end of file
+    return get_row_data(session, session.rng.choice(high_tiers))
@@ -0,0 +1,102 @@
+import os
+import sys
+import gzip
+import queue
+import shutil
+import logging
+import logging.handlers
+
+import config
+
+FORMAT = '%(asctime)s | %(levelname)-7s | %(name)-8s | %(message)s'
+
+listener = None  # logging.handlers.QueueListener writing the records, once setup() ran
+
+
+# ==========================================
+# 🗜️ COMPRESSED ROTATION
+# ==========================================
+
+def gzip_namer(name):
+    return name + ".gz"
+
+
+def gzip_rotator(source, dest):
+    """Compresses the full log into its numbered backup (runs on the listener thread, never the event loop)."""
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def rotating_file_handler(path, max_bytes, backups):
+    """Size-based rotation: kokoloko.log, then kokoloko.log.1.gz ... kokoloko.log.<backups>.gz."""
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+    handler.namer = gzip_namer
+    handler.rotator = gzip_rotator
+    return handler
+
+
+# ==========================================
+# 📝 QUEUED LOGGING PIPELINE
+# ==========================================
+
+class RecordQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records with the bare minimum of work on the calling thread.
+    The stock prepare() formats and copies every record for pickling to another process; the listener here
+    is a thread of the same process, so only the %-args are merged (they may be mutated after the call)
+    and the timestamp/layout formatting happens on the writer thread.
+    """
+
+    def prepare(self, record):
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def setup():
+    """
+    Routes every logger through a QueueHandler: the calling code (the event loop) only enqueues the record,
+    and a background QueueListener thread formats it and writes the rotating file and the console.
+
+    The root level is the lowest of the two handler levels, so with LOG_FILE_LEVEL = 'INFO' debug calls
+    are rejected by the level check before any message is built.
+    """
+    global listener
+    if listener is not None:
+        return listener
+
+    formatter = logging.Formatter(FORMAT)
+
+    file_handler = rotating_file_handler(config.LOG_FILE, config.LOG_MAX_MB * 1024 * 1024, config.LOG_BACKUPS)
+    file_handler.setLevel(config.LOG_FILE_LEVEL)
+    file_handler.setFormatter(formatter)
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(config.LOG_CONSOLE_LEVEL)
+    console_handler.setFormatter(formatter)
+
+    # Process/multiprocessing names aren't in FORMAT: skip collecting them for every record
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    records = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    root_logger.setLevel(min(file_handler.level, console_handler.level))
+    root_logger.addHandler(RecordQueueHandler(records))
+    # discord.py used to set its own logger to INFO; with bot.run(log_handler=None) it would inherit the root
+    # level, and every gateway/HTTP debug record would be built, queued and written
+    logging.getLogger("discord").setLevel(logging.INFO)
+
+    listener = logging.handlers.QueueListener(records, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def stop():
+    """Flushes the queued records and stops the writer thread (call on shutdown)."""
+    global listener
+    if listener is not None:
+        listener.stop()
+        listener = None
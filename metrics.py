@@ -0,0 +1,260 @@
+import time
+import bisect
+import logging
+import functools
+from contextlib import contextmanager
+
+import config
+
+logger = logging.getLogger("metrics")
+
+# Bucket upper bounds (seconds). Code paths inside the process are sub-millisecond to milliseconds;
+# Discord calls and renders are tens of milliseconds to seconds; players think for seconds to minutes.
+FAST_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+IO_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+HUMAN_BUCKETS = (1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0, 300.0)
+
+recording = True  # False inside suppressed()
+
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+# ==========================================
+# 📈 METRIC TYPES
+# ==========================================
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}  # {label key: float}
+
+    def inc(self, amount=1, **labels):
+        if not recording:
+            return
+        key = label_key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def exposition(self):
+        for key, value in sorted(self.values.items()):
+            yield f"{self.name}{format_labels(key)} {value}"
+
+
+class Histogram:
+    """
+    Prometheus-style histogram: per label set, a count per bucket (stored non-cumulative,
+    so observe() touches a single slot), the sum and the number of observations.
+    """
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.series = {}  # {label key: [bucket counts..., +Inf count]}
+        self.sums = {}  # {label key: float}
+
+    def observe(self, value, **labels):
+        if not recording:
+            return
+        key = label_key(labels)
+        counts = self.series.get(key)
+        if counts is None:
+            counts = self.series[key] = [0] * (len(self.buckets) + 1)
+            self.sums[key] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[key] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def quantile(self, q, key):
+        """Estimates a quantile from the buckets (linear within a bucket, like PromQL's histogram_quantile)."""
+        counts = self.series[key]
+        rank = q * sum(counts)
+        seen = 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]  # Beyond the last bucket: report its bound
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return 0.0
+
+    def stats(self, key):
+        count = sum(self.series[key])
+        return {
+            "count": count,
+            "mean_ms": round(self.sums[key] / count * 1000, 3) if count else 0.0,
+            "p50_ms": round(self.quantile(0.5, key) * 1000, 3),
+            "p95_ms": round(self.quantile(0.95, key) * 1000, 3)
+        }
+
+    def exposition(self):
+        for key, counts in sorted(self.series.items()):
+            running = 0
+            for bound, count in zip(self.buckets, counts):
+                running += count
+                yield f"{self.name}_bucket{format_labels(key, [('le', repr(float(bound)))])} {running}"
+            running += counts[-1]
+            yield f"{self.name}_bucket{format_labels(key, [('le', '+Inf')])} {running}"
+            yield f"{self.name}_sum{format_labels(key)} {self.sums[key]}"
+            yield f"{self.name}_count{format_labels(key)} {running}"
+
+
+# ==========================================
+# 🗂️ REGISTRY
+# ==========================================
+
+registry = []
+
+
+def counter(name, help_text):
+    metric = Counter(name, help_text)
+    registry.append(metric)
+    return metric
+
+
+def histogram(name, help_text, buckets):
+    metric = Histogram(name, help_text, buckets)
+    registry.append(metric)
+    return metric
+
+
+candidate_query_seconds = histogram("kokoloko_candidate_query_seconds",
+                                    "Candidate/tier queries computed by logic (turn cache misses only)", FAST_BUCKETS)
+roll_seconds = histogram("kokoloko_roll_seconds", "logic.roll_pokemon: weighted tier roll plus the Pokemon pick",
+                         FAST_BUCKETS)
+phase_seconds = histogram("kokoloko_phase_seconds", "Time spent in each engine phase of next_turn", HUMAN_BUCKETS)
+discord_api_seconds = histogram("kokoloko_discord_api_seconds", "Discord API request latency by endpoint",
+                                IO_BUCKETS)
+discord_api_errors = counter("kokoloko_discord_api_errors_total", "Failed Discord API requests by endpoint and status")
+view_wait_seconds = histogram("kokoloko_view_wait_seconds",
+                              "Time a button view waited for the player (think time, timeouts included), by view",
+                              HUMAN_BUCKETS)
+render_seconds = histogram("kokoloko_image_render_seconds", "Roster image: sprite collection plus grid compositing",
+                           IO_BUCKETS)
+dm_delivery_seconds = histogram("kokoloko_dm_delivery_seconds", "End-of-draft DMs of one player, by outcome",
+                                IO_BUCKETS)
+picks_total = counter("kokoloko_picks_total", "Pokemon drafted, by draft mode")
+
+
+def timed(metric, **labels):
+    """Decorator observing the call duration of a sync function into `metric`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metric.observe(time.perf_counter() - started, **labels)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def suppressed():
+    """Drops every observation made inside the block (e.g. picks replayed when a draft is resumed)."""
+    global recording
+    previous, recording = recording, False
+    try:
+        yield
+    finally:
+        recording = previous
+
+
+@contextmanager
+def api_call(endpoint):
+    """Times one Discord request; failures are counted by HTTP status (or exception type)."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        discord_api_errors.inc(endpoint=endpoint, status=getattr(e, "status", type(e).__name__))
+        raise
+    finally:
+        discord_api_seconds.observe(time.perf_counter() - started, endpoint=endpoint)
+
+
+def render():
+    """Every metric in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for metric in registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.exposition())
+    return "\n".join(lines) + "\n"
+
+
+def summary():
+    """Compact view for `!perf` and the load test: {metric: {labels: stats}}."""
+    result = {}
+    for metric in registry:
+        if metric.kind == "histogram":
+            series = {format_labels(key) or "all": metric.stats(key) for key in sorted(metric.series)}
+        else:
+            series = {format_labels(key) or "all": value for key, value in sorted(metric.values.items())}
+        if series:
+            result[metric.name.removeprefix("kokoloko_")] = series
+    return result
+
+
+# ==========================================
+# 🌐 PROMETHEUS ENDPOINT
+# ==========================================
+
+runner = None  # aiohttp.web.AppRunner while the endpoint is up
+
+
+async def start_server(host=None, port=None):
+    """Serves GET /metrics on a local port (METRICS_PORT = 0 disables it)."""
+    global runner
+    from aiohttp import web
+
+    host = host or config.METRICS_HOST
+    port = config.METRICS_PORT if port is None else port
+    if not port or runner is not None:
+        return
+
+    async def handle_metrics(request):
+        return web.Response(body=render().encode("utf-8"),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+    except OSError as e:
+        logger.error(f"Metrics endpoint could not bind {host}:{port}: {e}")
+        await runner.cleanup()
+        runner = None
+        return
+    logger.info(f"📈 Metrics endpoint listening on http://{host}:{port}/metrics")
+
+
+async def stop_server():
+    global runner
+    if runner is not None:
+        await runner.cleanup()
+        runner = None
@@ -0,0 +1,285 @@
+import time
+import heapq
+import functools
+import asyncio
+import itertools
+import logging
+
+import discord
+import config
+import dispatcher
+import metrics
+
+logger = logging.getLogger("outbound")
+
+# ==========================================
+# 🚦 PRIORITIES
+# ==========================================
+# Lower runs first. Within a priority, messages keep the order they were queued in.
+INTERACTIVE = 0  # Turn cards, roll buttons and the edits/deletes that drive them
+NOTICE = 1  # Action notices (kept / rerolled / timed out), errors
+ANNOUNCEMENT = 2  # Round and draft summaries, parent channel posts
+PRIORITY_NAMES = {INTERACTIVE: "interactive", NOTICE: "notice", ANNOUNCEMENT: "announcement"}
+
+# Only these sends are merged. Every job of a merged send resolves to the SAME discord.Message, so editing
+# or deleting "your" message would change the others too: callers of these priorities must never do that
+# (they are fire-and-forget or only awaited for completion). Interactive sends are always sent alone.
+MERGEABLE = (NOTICE, ANNOUNCEMENT)
+
+ENDPOINTS = {"send": "channel.send", "edit": "message.edit", "delete": "message.delete"}  # Metric labels
+
+# Discord message limits used when merging queued sends
+MAX_CONTENT = 2000
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000  # Counted with len(embed), which discord.py implements as Discord does
+
+
+class Job:
+    __slots__ = ("kind", "priority", "seq", "target", "kwargs", "future", "queued_at", "attempts")
+
+    def __init__(self, kind, priority, seq, target, kwargs, future, queued_at):
+        self.kind = kind  # "send", "edit" or "delete"
+        self.priority = priority
+        self.seq = seq  # Queue order; kept on retries so a rate-limited message doesn't lose its place
+        self.target = target  # Channel for sends, Message for edits/deletes
+        self.kwargs = kwargs
+        self.future = future
+        self.queued_at = queued_at
+        self.attempts = 0
+
+    def is_mergeable(self):
+        """
+        A notice/announcement with text and/or a single embed, nothing that makes the message unique
+        (views, files, delete_after...). See MERGEABLE for why interactive sends never merge.
+        """
+        return self.kind == "send" and self.priority in MERGEABLE and set(self.kwargs) <= {"content", "embed"}
+
+
+# ==========================================
+# 📤 PER-CHANNEL QUEUE
+# ==========================================
+
+class ChannelQueue:
+    """
+    Outbound queue of one channel (one Discord rate-limit bucket).
+    Jobs run one at a time in priority order; a drain task runs only while the queue has work.
+    """
+
+    def __init__(self, key, scheduler):
+        self.key = key
+        self.scheduler = scheduler
+        self.heap = []  # [(priority, seq, Job)]
+        self.sent_at = []  # Request start times inside the current bucket window
+        self.paused_until = 0.0  # Set from the headers of a 429
+        self.task = None
+        self.stats = {"requests": 0, "coalesced": 0, "rate_limited": 0, "max_depth": 0}
+
+    def push(self, job):
+        heapq.heappush(self.heap, (job.priority, job.seq, job))
+        self.stats["max_depth"] = max(self.stats["max_depth"], len(self.heap))
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.drain())
+
+    async def wait_for_bucket(self):
+        """Sleeps until both the local bucket window and any 429 pause allow another request."""
+        window, limit = self.scheduler.bucket_window, self.scheduler.bucket_limit
+        while True:
+            now = self.scheduler.clock()
+            self.sent_at = [t for t in self.sent_at if now - t < window]
+            delay = self.paused_until - now
+            if len(self.sent_at) >= limit:
+                delay = max(delay, window - (now - self.sent_at[0]))
+            if delay <= 0:
+                self.sent_at.append(now)
+                return
+            await asyncio.sleep(delay)
+
+    def take_batch(self):
+        """Pops the next job plus any queued jobs that can ride in the same request."""
+        _, _, first = heapq.heappop(self.heap)
+        batch = [first]
+
+        while self.heap and self.heap[0][0] == first.priority:
+            nxt = self.heap[0][2]
+            if first.kind == "edit" and nxt.kind == "edit" and nxt.target is first.target:
+                pass  # Later edit of the same message wins
+            elif first.is_mergeable() and nxt.is_mergeable() and self.fits(batch, nxt):
+                pass  # Text/embeds merge into one message
+            else:
+                break
+            heapq.heappop(self.heap)
+            batch.append(nxt)
+
+        self.stats["coalesced"] += len(batch) - 1
+        return batch
+
+    @staticmethod
+    def fits(batch, job):
+        embeds = [j.kwargs["embed"] for j in batch if j.kwargs.get("embed") is not None]
+        if job.kwargs.get("content"):
+            # Content always renders above the embeds, so text can't follow an embed without reordering
+            if embeds:
+                return False
+            text = "\n".join(j.kwargs["content"] for j in batch + [job] if j.kwargs.get("content"))
+            if len(text) > MAX_CONTENT:
+                return False
+        if job.kwargs.get("embed") is not None:
+            embeds.append(job.kwargs["embed"])
+            if len(embeds) > MAX_EMBEDS or sum(len(e) for e in embeds) > MAX_EMBED_CHARS:
+                return False
+        return True
+
+    @staticmethod
+    def merged_request(batch):
+        first = batch[0]
+        if first.kind == "delete":
+            return first.target.delete, {}
+        if first.kind == "edit":
+            kwargs = {}
+            for job in batch:
+                kwargs.update(job.kwargs)
+            return first.target.edit, kwargs
+        if len(batch) == 1:
+            return first.target.send, first.kwargs
+
+        kwargs = {}
+        text = "\n".join(j.kwargs["content"] for j in batch if j.kwargs.get("content"))
+        embeds = [j.kwargs["embed"] for j in batch if j.kwargs.get("embed") is not None]
+        if text:
+            kwargs["content"] = text
+        if len(embeds) == 1:
+            kwargs["embed"] = embeds[0]
+        elif embeds:
+            kwargs["embeds"] = embeds
+        return first.target.send, kwargs
+
+    async def drain(self):
+        while self.heap:
+            await self.wait_for_bucket()
+            if not self.heap:
+                break
+            batch = self.take_batch()
+            started = self.scheduler.clock()
+            for job in batch:
+                self.scheduler.record_wait(job.priority, started - job.queued_at)
+
+            func, kwargs = self.merged_request(batch)
+            self.stats["requests"] += 1
+            try:
+                with metrics.api_call(ENDPOINTS[batch[0].kind]):
+                    result = await func(**kwargs)
+            except discord.HTTPException as e:
+                if self.retry_later(batch, e):
+                    continue
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+            except Exception as e:
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+            else:
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_result(result)
+
+    def retry_later(self, batch, exc):
+        """Requeues a rate-limited batch after the delay from Discord's headers. False once retries run out."""
+        if exc.status != 429 or batch[0].attempts >= self.scheduler.max_retries:
+            return False
+        self.stats["rate_limited"] += 1
+        delay = dispatcher.retry_delay(exc, batch[0].attempts)
+        self.paused_until = max(self.paused_until, self.scheduler.clock() + delay)
+        logger.debug(f"Channel {self.key} rate limited, pausing {delay:.2f}s")
+        for job in batch:
+            job.attempts += 1
+            heapq.heappush(self.heap, (job.priority, job.seq, job))
+        return True
+
+
+# ==========================================
+# 🗓️ SCHEDULER
+# ==========================================
+
+class OutboundScheduler:
+    """
+    Every engine message (send/edit/delete) goes through here instead of being awaited inline.
+
+    - One queue per channel, paced by a local bucket (`bucket_limit` requests per `bucket_window` seconds)
+      and by the Retry-After of any 429, which is retried without restarting the turn.
+    - Interactive messages jump ahead of notices and announcements waiting on the same bucket.
+    - Queued plain notices/announcements (text and embeds) merge into one message, and repeated edits
+      of one message into one edit, so a backlog drains in fewer requests.
+
+    Each call returns a future: await it to get the Message (and any error), or leave it
+    un-awaited for fire-and-forget announcements (errors are logged). A merged notice/announcement
+    resolves to the shared Message, so only keep the Message of an INTERACTIVE send.
+    """
+
+    def __init__(self, bucket_limit, bucket_window, max_retries):
+        self.bucket_limit = bucket_limit
+        self.bucket_window = bucket_window
+        self.max_retries = max_retries
+        self.queues = {}  # {channel id: ChannelQueue}
+        self.seq = itertools.count()
+        self.clock = time.monotonic  # Seconds; the load test swaps in its simulated clock
+        self.waits = {p: {"count": 0, "total_s": 0.0, "max_s": 0.0} for p in PRIORITY_NAMES}
+
+    def submit(self, kind, priority, channel_key, target, kwargs):
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(functools.partial(log_failure, kind, channel_key))
+        queue = self.queues.get(channel_key)
+        if queue is None:
+            queue = self.queues[channel_key] = ChannelQueue(channel_key, self)
+        queue.push(Job(kind, priority, next(self.seq), target, kwargs, future, self.clock()))
+        return future
+
+    def send(self, channel, content=None, *, priority=INTERACTIVE, **kwargs):
+        if content is not None:
+            kwargs["content"] = content
+        return self.submit("send", priority, channel.id, channel, kwargs)
+
+    def edit(self, message, *, priority=INTERACTIVE, **kwargs):
+        return self.submit("edit", priority, message.channel.id, message, kwargs)
+
+    def delete(self, message, *, priority=INTERACTIVE):
+        return self.submit("delete", priority, message.channel.id, message, {})
+
+    def record_wait(self, priority, wait):
+        stats = self.waits[priority]
+        stats["count"] += 1
+        stats["total_s"] += wait
+        stats["max_s"] = max(stats["max_s"], wait)
+
+    def summary(self):
+        """Queue depth, request counts and wait time per priority."""
+        totals = {"requests": 0, "coalesced": 0, "rate_limited": 0}
+        for queue in self.queues.values():
+            for key in totals:
+                totals[key] += queue.stats[key]
+        return {
+            **totals,
+            "queue_depth": sum(len(q.heap) for q in self.queues.values()),
+            "max_queue_depth": max((q.stats["max_depth"] for q in self.queues.values()), default=0),
+            "wait": {
+                PRIORITY_NAMES[p]: {
+                    "count": s["count"],
+                    "mean_ms": round(s["total_s"] / s["count"] * 1000, 2) if s["count"] else 0.0,
+                    "max_ms": round(s["max_s"] * 1000, 2)
+                } for p, s in self.waits.items()
+            }
+        }
+
+
+def log_failure(kind, channel_key, future):
+    """Retrieves the error of every job so fire-and-forget failures are logged, not lost."""
+    if not future.cancelled() and future.exception() is not None:
+        exc = future.exception()
+        if isinstance(exc, discord.Forbidden):
+            logger.warning(f"Could not {kind} in channel {channel_key} (Permissions missing).")
+        else:
+            logger.error(f"Outbound {kind} in channel {channel_key} failed: {exc!r}")
+
+
+scheduler = OutboundScheduler(bucket_limit=config.OUTBOUND_BUCKET_LIMIT, bucket_window=config.OUTBOUND_BUCKET_WINDOW,
+                              max_retries=config.OUTBOUND_MAX_RETRIES)
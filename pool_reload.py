@@ -0,0 +1,98 @@
+import os
+import asyncio
+import logging
+
+import config
+import catalog
+import logic
+import render_pool
+
+logger = logging.getLogger("pool_reload")
+
+reload_lock = None  # asyncio.Lock, created inside the running loop: one rebuild at a time
+watch_task = None
+
+
+def diff_catalogs(old, new):
+    """Counts what a reload changes: added/removed names and names whose tier moved."""
+    old_tiers = {name: old.tiers[old.name_masks[name].bit_length() - 1] for name in old.name_masks}
+    new_tiers = {name: new.tiers[new.name_masks[name].bit_length() - 1] for name in new.name_masks}
+    return {
+        "rows": len(new),
+        "added": len(new_tiers.keys() - old_tiers.keys()),
+        "removed": len(old_tiers.keys() - new_tiers.keys()),
+        "retiered": sum(1 for name, tier in new_tiers.items() if name in old_tiers and old_tiers[name] != tier)
+    }
+
+
+async def reload(path=None):
+    """
+    Parses, validates and indexes the CSV on the I/O pool (the event loop keeps serving drafts),
+    then makes it the live catalog; running drafts switch to it atomically at their next turn start.
+    Returns the diff (plus "deferred": True if a draft is running). Raises catalog.CatalogError if invalid.
+    """
+    global reload_lock
+    if reload_lock is None:
+        reload_lock = asyncio.Lock()
+    path = path or config.CSV_FILE
+
+    async with reload_lock:
+        new_catalog = await render_pool.io_pool.run(catalog.load_catalog_cached, path, config.CATALOG_CACHE_FILE,
+                                                         config.TIER_PROBS)
+        if new_catalog is None:
+            raise catalog.CatalogError([f"{path} not found"])
+
+        diff = diff_catalogs(logic.pokemon_db, new_catalog)
+        diff["deferred"] = logic.stage_catalog(new_catalog) > 0
+        logger.info(f"🔄 Pokemon pool reloaded from {path}: {diff}")
+        return diff
+
+
+# ==========================================
+# 👀 FILE WATCHER
+# ==========================================
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+async def watch(path, interval):
+    """
+    Polls the CSV and reloads it after a change once the file has stopped changing for one interval
+    (so a half-saved file isn't picked up). Invalid files are logged and the live catalog is kept.
+    """
+    last = file_signature(path)
+    changed = None
+    while True:
+        await asyncio.sleep(interval)
+        current = file_signature(path)
+        if current != last:
+            last, changed = current, current  # Wait one more tick for the write to settle
+            continue
+        if changed is None or current is None:
+            continue
+        changed = None
+        try:
+            await reload(path)
+        except catalog.CatalogError as e:
+            logger.error(f"Ignoring edited {path}, the live catalog is kept: {e.problems}")
+        except Exception as e:
+            logger.error(f"Failed to reload {path}: {e}")
+
+
+def start_watcher():
+    """Starts the CSV watcher (CATALOG_WATCH_INTERVAL = 0 disables it)."""
+    global watch_task
+    if config.CATALOG_WATCH_INTERVAL and watch_task is None:
+        watch_task = asyncio.get_running_loop().create_task(watch(config.CSV_FILE, config.CATALOG_WATCH_INTERVAL))
+
+
+def stop_watcher():
+    global watch_task
+    if watch_task is not None:
+        watch_task.cancel()
+        watch_task = None
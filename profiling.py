@@ -0,0 +1,134 @@
+"""
+Opt-in profiling of one draft: cProfile plus tracemalloc, from `!start_draft` to the end of the draft.
+
+Armed per thread with the staff command `!profile_next`, or for every draft with PROFILE_DRAFTS in config.py.
+When a capture ends, three files are written next to kokoloko.log:
+    profile_<draft id>_<time>.pstats     raw stats (open with `python -m pstats` or snakeviz)
+    profile_<draft id>_<time>_hot.txt    top functions by own time and by cumulative time
+    profile_<draft id>_<time>_memory.txt traced memory per round and the biggest allocation growth
+
+Nothing is hooked while no capture is running, so drafts that aren't profiled pay nothing.
+"""
+import io
+import os
+import time
+import pstats
+import cProfile
+import logging
+import tracemalloc
+
+import config
+import engine
+import logic
+import render_pool
+
+logger = logging.getLogger("profiling")
+
+armed_threads = set()  # Threads whose next !start_draft is profiled
+active = None  # The running DraftProfiler (cProfile can only profile one thing at a time)
+
+
+class DraftProfiler:
+    def __init__(self, thread_id):
+        self.thread_id = thread_id
+        self.profile = cProfile.Profile()
+        self.started_at = time.time()
+        self.baseline = None  # tracemalloc snapshot at the start
+        self.samples = []  # [(label, current bytes, peak bytes)]
+        self.last_round = None
+        self.owns_tracemalloc = False
+
+    # --- capture ---
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(config.PROFILE_TRACEMALLOC_FRAMES)
+            self.owns_tracemalloc = True
+        self.baseline = tracemalloc.take_snapshot()
+        self.sample("start")
+        engine.phase_listeners.append(self.on_phase)
+        self.profile.enable()
+
+    def on_phase(self, session, phase, turn):
+        """Samples traced memory once per round of the profiled draft (ROUND_START also runs between turns)."""
+        if phase == engine.ROUND_START and session.thread_id == self.thread_id and session.round != self.last_round:
+            self.last_round = session.round
+            self.sample(f"round {session.round}")
+
+    def sample(self, label):
+        current, peak = tracemalloc.get_traced_memory()
+        self.samples.append((label, current, peak))
+
+    def stop(self):
+        """Stops both profilers. Returns the final tracemalloc snapshot."""
+        self.profile.disable()
+        if self.on_phase in engine.phase_listeners:
+            engine.phase_listeners.remove(self.on_phase)
+        self.sample("end")
+        snapshot = tracemalloc.take_snapshot()
+        if self.owns_tracemalloc:
+            tracemalloc.stop()
+        return snapshot
+
+    # --- reports (blocking, run on the I/O pool) ---
+
+    def write_reports(self, draft_id, snapshot):
+        directory = os.path.dirname(os.path.abspath(config.LOG_FILE))
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        base = os.path.join(directory, f"profile_{draft_id}_{stamp}")
+        top_n = config.PROFILE_TOP_N
+
+        self.profile.dump_stats(base + ".pstats")
+
+        out = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=out)
+        out.write(f"Draft {draft_id} • {time.time() - self.started_at:.1f}s captured\n\n")
+        out.write(f"===== Top {top_n} by own time (tottime) =====\n")
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(top_n)
+        out.write(f"\n===== Top {top_n} by cumulative time =====\n")
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top_n)
+        with open(base + "_hot.txt", "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+
+        lines = [f"Draft {draft_id} • traced memory (KiB)", f"{'point':<12}{'current':>12}{'peak':>12}"]
+        lines += [f"{label:<12}{current / 1024:>12.1f}{peak / 1024:>12.1f}" for label, current, peak in self.samples]
+        lines += ["", f"===== Top {top_n} allocation growth since start (by line) ====="]
+        lines += [str(stat) for stat in snapshot.compare_to(self.baseline, "lineno")[:top_n]]
+        with open(base + "_memory.txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return base
+
+
+# ==========================================
+# 🔌 COMMAND HOOKS
+# ==========================================
+
+def start_if_requested(thread_id):
+    """Starts a capture if this thread was armed (or PROFILE_DRAFTS is on). Returns the profiler or None."""
+    global active
+    if not (config.PROFILE_DRAFTS or thread_id in armed_threads):
+        return None
+    armed_threads.discard(thread_id)
+    if active is not None:
+        logger.warning(f"Not profiling the draft in thread {thread_id}: another draft is already being profiled")
+        return None
+
+    active = DraftProfiler(thread_id)
+    active.start()
+    logger.info(f"🔬 Profiling the draft in thread {thread_id}")
+    return active
+
+
+async def finish(profiler):
+    """Stops the capture and writes its reports. Errors are logged, never raised into the command."""
+    global active
+    snapshot = profiler.stop()
+    active = None
+
+    session = logic.get_session(profiler.thread_id)
+    draft_id = session.draft_id if session and session.draft_id else f"thread{profiler.thread_id}"
+    try:
+        base = await render_pool.io_pool.run(profiler.write_reports, draft_id, snapshot)
+        logger.info(f"🔬 Profile of draft {draft_id} written to {base}.pstats / _hot.txt / _memory.txt")
+    except Exception as e:
+        logger.error(f"Failed to write the profile of draft {draft_id}: {e}")
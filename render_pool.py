@@ -0,0 +1,116 @@
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+logger = logging.getLogger("render_pool")
+
+
+# ==========================================
+# 🧵 RENDER POOL (PILLOW OFF THE EVENT LOOP)
+# ==========================================
+
+class RenderPool:
+    """
+    Runs blocking image work (decode, compositing, PNG encode, sprite cache disk I/O) on worker threads.
+    Pillow releases the GIL in its C routines, so threads are enough to keep the event loop responsive.
+
+    At most `queue_size` jobs are pending or running at once; callers beyond that wait their turn
+    (a bounded queue, so a league-wide render burst can't pile up unbounded memory).
+    With `workers=0` every job runs inline on the event loop, which is how the old code behaved.
+    """
+
+    def __init__(self, workers, queue_size, name="render"):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name) if workers else None
+        self.slots = None  # asyncio.Semaphore, created on first use inside the running loop
+        self.stats = {"jobs": 0, "queue_wait_s": 0.0, "run_s": 0.0, "max_queue_wait_s": 0.0, "inline_s": 0.0}
+
+    async def run(self, func, *args):
+        if self.executor is None:
+            start = time.perf_counter()
+            result = func(*args)
+            elapsed = time.perf_counter() - start
+            self.stats["jobs"] += 1
+            self.stats["run_s"] += elapsed
+            self.stats["inline_s"] += elapsed  # Time the event loop was blocked
+            return result
+
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.queue_size)
+
+        queued = time.perf_counter()
+        async with self.slots:
+            started = time.perf_counter()
+            wait = started - queued
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+            finally:
+                self.stats["jobs"] += 1
+                self.stats["queue_wait_s"] += wait
+                self.stats["max_queue_wait_s"] = max(self.stats["max_queue_wait_s"], wait)
+                self.stats["run_s"] += time.perf_counter() - started
+
+    def summary(self):
+        return {key: round(value, 4) if isinstance(value, float) else value for key, value in self.stats.items()}
+
+    def shutdown(self, wait=False):
+        """Stops the workers. wait=True lets queued jobs finish (I/O that must reach the disk)."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+# ==========================================
+# 📈 EVENT LOOP BUSY MONITOR
+# ==========================================
+
+class LoopMonitor:
+    """
+    Measures how long the event loop was kept busy: a heartbeat sleeps `interval` seconds and records
+    how late it woke up. Any lateness is time the loop spent running something else synchronously
+    (e.g. an inline Pillow render), which is exactly what delays button interactions.
+    """
+
+    def __init__(self, interval, stall_threshold):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.task = None
+        self.sleep = asyncio.sleep  # Captured at import, so the load test's time warp doesn't distort the heartbeat
+        self.reset()
+
+    def reset(self):
+        self.stats = {"samples": 0, "busy_s": 0.0, "max_lag_ms": 0.0, "stalls": 0}
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.heartbeat())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def heartbeat(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await self.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.stats["samples"] += 1
+            self.stats["busy_s"] += lag
+            self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], lag * 1000)
+            if lag >= self.stall_threshold:
+                self.stats["stalls"] += 1
+                logger.debug(f"Event loop stalled for {lag * 1000:.0f}ms")
+
+    def summary(self):
+        return {key: round(value, 4) if isinstance(value, float) else value for key, value in self.stats.items()}
+
+
+render_pool = RenderPool(workers=config.RENDER_WORKERS, queue_size=config.RENDER_QUEUE_SIZE)
+# Same pool type for blocking non-image I/O (SQLite, fsync, reports), kept apart from the render backlog
+io_pool = RenderPool(workers=config.IO_WORKERS, queue_size=config.IO_QUEUE_SIZE, name="io")
+loop_monitor = LoopMonitor(interval=config.LOOP_MONITOR_INTERVAL, stall_threshold=config.LOOP_STALL_THRESHOLD)
@@ -0,0 +1,200 @@
+"""
+Headless Monte Carlo draft simulator.
+
+Runs complete drafts with the real `logic` rules (pity rule, Mega caps, VIP tier rules, salary cap)
+and no Discord objects, spread across a process pool. Used to tune TIER_PROBS and MAX_POINTS.
+
+Usage:  python simulator.py --drafts 100000 --players 16 [--workers 8] [--seed 1] [--json report.json]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+import logic
+
+logger = logging.getLogger("simulator")
+
+# Bare stand-in for a Discord Member: the rules only ever need `.id` (and `.display_name` for logs)
+SimPlayer = namedtuple("SimPlayer", ["id", "display_name"])
+
+
+# ==========================================
+# 🎲 SINGLE DRAFT
+# ==========================================
+
+def simulate_draft(num_players, seed):
+    """
+    Plays one full snake draft in auto-accept mode (like Fast Simulation, without the event loop).
+    Returns the raw results: {"picks": [(pick_num, name, tier)], "pity": int, "dead_ends": int, "rolls": int}
+    """
+    random.seed(seed)
+    players = [SimPlayer(i, f"Sim_{i}") for i in range(num_players)]
+    random.shuffle(players)
+    session = logic.DraftSession(thread_id=None, players=players, auto_mode=2, seed=seed)
+
+    picks = []
+    dead_ends = 0
+    rolls = 0
+    while True:
+        # Same round/turn bookkeeping as engine.round_start / turn_start / commit
+        if session.current_index >= len(session.order):
+            if session.round >= config.TOTAL_POKEMON:
+                break
+            logic.advance_round(session)
+
+        player = session.order[session.current_index]
+        pick_num = len(session.rosters[player.id]) + 1
+        if pick_num > config.TOTAL_POKEMON:
+            logic.advance_turn(session)
+            continue
+
+        logic.reset_burned(session)
+        valid_tiers = logic.get_valid_tiers(session, player.id, pick_num, is_reroll=False)
+        name, tier, sprite_url = logic.roll_pokemon(session, valid_tiers, player.id, pick_num, is_reroll=False)
+        rolls += 1
+
+        if name:
+            logic.record_pick(session, player.id, name, tier, sprite_url)
+            picks.append((pick_num, name, tier))
+        else:
+            dead_ends += 1
+        logic.advance_turn(session)
+
+    return {"picks": picks, "pity": len(session.pity_users), "dead_ends": dead_ends, "rolls": rolls}
+
+
+# ==========================================
+# 🏭 PROCESS POOL
+# ==========================================
+
+def init_worker():
+    """Loads the catalog once per worker and silences the per-pick logging."""
+    logging.disable(logging.CRITICAL)
+    logic.load_data()
+
+
+def run_batch(num_players, seeds):
+    """Simulates a batch of drafts in a worker and returns aggregated counters (cheap to pickle back)."""
+    slot_tiers = Counter()  # {(pick_num, tier): count}
+    pokemon_picks = Counter()  # {name: count}
+    pity = 0
+    dead_ends = 0
+    dead_end_drafts = 0
+    rolls = 0
+
+    for seed in seeds:
+        result = simulate_draft(num_players, seed)
+        for pick_num, name, tier in result["picks"]:
+            slot_tiers[(pick_num, tier)] += 1
+            pokemon_picks[name] += 1
+        pity += result["pity"]
+        dead_ends += result["dead_ends"]
+        dead_end_drafts += 1 if result["dead_ends"] else 0
+        rolls += result["rolls"]
+
+    return {
+        "drafts": len(seeds),
+        "slot_tiers": slot_tiers,
+        "pokemon_picks": pokemon_picks,
+        "pity": pity,
+        "dead_ends": dead_ends,
+        "dead_end_drafts": dead_end_drafts,
+        "rolls": rolls
+    }
+
+
+def run_simulation(num_drafts, num_players, workers=None, seed=0, batch_size=250):
+    """Fans the drafts out over a ProcessPoolExecutor and merges the batch counters."""
+    seeds = range(seed, seed + num_drafts)
+    batches = [seeds[i:i + batch_size] for i in range(0, num_drafts, batch_size)]
+
+    totals = {"drafts": 0, "slot_tiers": Counter(), "pokemon_picks": Counter(),
+              "pity": 0, "dead_ends": 0, "dead_end_drafts": 0, "rolls": 0}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        for batch in pool.map(run_batch, [num_players] * len(batches), batches):
+            for key, value in batch.items():
+                totals[key] += value
+
+    return totals
+
+
+# ==========================================
+# 📊 REPORT
+# ==========================================
+
+def build_report(totals, num_players):
+    """Turns raw counters into the distributions we tune with."""
+    drafts = totals["drafts"]
+    player_drafts = drafts * num_players
+
+    slots = {}
+    for pick_num in range(1, config.TOTAL_POKEMON + 1):
+        counts = {tier: n for (slot, tier), n in totals["slot_tiers"].items() if slot == pick_num}
+        filled = sum(counts.values())
+        slots[pick_num] = {
+            "mean_tier": (sum(t * n for t, n in counts.items()) / filled) if filled else 0.0,
+            "tier_share": {tier: n / filled for tier, n in sorted(counts.items(), reverse=True)} if filled else {}
+        }
+
+    pick_rates = {name: n / drafts for name, n in totals["pokemon_picks"].most_common()} if drafts else {}
+
+    return {
+        "drafts": drafts,
+        "players": num_players,
+        "max_points": config.MAX_POINTS,
+        "spend_per_slot": slots,
+        "pity_activation_rate": totals["pity"] / player_drafts if player_drafts else 0.0,
+        "dead_end_rate": totals["dead_ends"] / totals["rolls"] if totals["rolls"] else 0.0,
+        "drafts_with_dead_end": totals["dead_end_drafts"] / drafts if drafts else 0.0,
+        "pick_rates": pick_rates
+    }
+
+
+def print_report(report, elapsed, top=15):
+    print(f"🎲 {report['drafts']} drafts x {report['players']} players in {elapsed:.1f}s "
+          f"({report['drafts'] / elapsed:.0f} drafts/s)")
+    print(f"   Pity rule activation rate: {report['pity_activation_rate'] * 100:.2f}% of players")
+    print(f"   Zero-valid-tier dead ends: {report['dead_end_rate'] * 100:.3f}% of rolls "
+          f"({report['drafts_with_dead_end'] * 100:.2f}% of drafts)")
+    print("\n   Slot | Mean Tier | Top tiers")
+    for pick_num, slot in report["spend_per_slot"].items():
+        top_tiers = sorted(slot["tier_share"].items(), key=lambda kv: kv[1], reverse=True)[:4]
+        shares = ", ".join(f"T{t} {p * 100:.1f}%" for t, p in top_tiers)
+        print(f"   #{pick_num:<3} | {slot['mean_tier']:9.1f} | {shares}")
+    print(f"\n   Top {top} picks (picks per draft):")
+    for name, rate in list(report["pick_rates"].items())[:top]:
+        print(f"   {rate:6.3f}  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drafts", type=int, default=1000, help="Number of complete drafts to simulate")
+    parser.add_argument("--players", type=int, default=16, help="Players per draft")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first draft (draft N uses seed+N)")
+    parser.add_argument("--batch-size", type=int, default=250, help="Drafts per worker task")
+    parser.add_argument("--json", help="Also write the full report to this JSON file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    totals = run_simulation(args.drafts, args.players, args.workers, args.seed, args.batch_size)
+    elapsed = time.perf_counter() - start
+
+    report = build_report(totals, args.players)
+    print_report(report, elapsed)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n📝 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import os
+import io
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import config
+import http_pool
+import render_pool
+from PIL import Image
+
+logger = logging.getLogger("sprites")
+
+
+def decode_image(data):
+    """Decodes downloaded bytes into an RGBA Pillow Image (blocking, run on the render pool)."""
+    return Image.open(io.BytesIO(data)).convert("RGBA")
+
+
+# ==========================================
+# 🗄️ SPRITE CACHE (MEMORY LRU + DISK)
+# ==========================================
+
+class SpriteCache:
+    """
+    Two-level cache of decoded sprites, keyed by URL.
+
+    - Memory: LRU of decoded RGBA PIL Images (bounded by item count).
+    - Disk: content-addressed files (sha256 of the URL) holding the normalized RGBA PNG,
+      plus a small JSON sidecar with the ETag/Last-Modified validators. Bounded by total size,
+      least recently used files are evicted first.
+
+    Entries younger than `ttl` seconds are served without any network I/O. Older ones are
+    revalidated with a conditional GET (If-None-Match / If-Modified-Since).
+    """
+
+    def __init__(self, directory, max_disk_bytes, max_memory_items, ttl):
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_items = max_memory_items
+        self.ttl = ttl
+        self.memory = OrderedDict()  # {url: PIL Image}
+        self.disk_index = None  # {key: (size in bytes, last used)}, loaded lazily
+        self.disk_lock = threading.Lock()  # Disk writes/evictions run concurrently on render pool threads
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "revalidated": 0, "downloads": 0, "evictions": 0}
+
+    # --- paths & index ---
+
+    @staticmethod
+    def key_for(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def paths(self, key):
+        base = os.path.join(self.directory, key[:2], key)
+        return base + ".png", base + ".json"
+
+    def load_disk_index(self):
+        """Scans the cache directory once, so later evictions don't need directory walks."""
+        self.disk_index = {}
+        if not os.path.isdir(self.directory):
+            return
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                if filename.endswith(".png"):
+                    stat = os.stat(os.path.join(root, filename))
+                    self.disk_index[filename[:-4]] = (stat.st_size, stat.st_mtime)
+
+    def mark_used(self, key):
+        with self.disk_lock:  # Also called from the event loop while pool threads write/evict
+            if self.disk_index is not None and key in self.disk_index:
+                self.disk_index[key] = (self.disk_index[key][0], time.time())
+
+    # --- memory level ---
+
+    def remember(self, url, image):
+        self.memory[url] = image
+        self.memory.move_to_end(url)
+        while len(self.memory) > self.max_memory_items:
+            self.memory.popitem(last=False)
+
+    # --- disk level (blocking, run on the render pool) ---
+
+    def read_disk(self, key):
+        """Returns (image, metadata) or (None, None)."""
+        png_path, meta_path = self.paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            image = Image.open(png_path)
+            image.load()
+        except (OSError, ValueError):
+            return None, None
+        os.utime(png_path)  # Mark as recently used for LRU eviction (survives restarts)
+        self.mark_used(key)
+        return image.convert("RGBA"), meta
+
+    def write_disk(self, key, image, meta):
+        png_path, meta_path = self.paths(key)
+        os.makedirs(os.path.dirname(png_path), exist_ok=True)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        data = buffer.getvalue()
+
+        # Write to temp files first so a crash never leaves a half-written sprite behind
+        for path, payload, mode in ((png_path, data, "wb"), (meta_path, json.dumps(meta), "w")):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, mode) as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+
+        with self.disk_lock:
+            if self.disk_index is None:
+                self.load_disk_index()
+            self.disk_index[key] = (len(data), time.time())
+            self.evict_disk()
+
+    def touch_disk(self, key, meta):
+        """Refreshes the validators after a 304 Not Modified."""
+        _, meta_path = self.paths(key)
+        try:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+        except OSError as e:
+            logger.debug(f"Could not refresh sprite metadata {key}: {e}")
+
+    def evict_disk(self):
+        total = sum(size for size, _ in self.disk_index.values())
+        if total <= self.max_disk_bytes:
+            return
+        for key, (size, _) in sorted(self.disk_index.items(), key=lambda kv: kv[1][1]):
+            for path in self.paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            del self.disk_index[key]
+            self.stats["evictions"] += 1
+            total -= size
+            if total <= self.max_disk_bytes:
+                break
+
+    # --- public API ---
+
+    async def get(self, url):
+        """Returns a decoded RGBA copy of the sprite (safe to resize in place), or None on failure."""
+        key = self.key_for(url)
+        image = self.memory.get(url)
+        if image is not None:
+            self.memory.move_to_end(url)
+            self.mark_used(key)
+            self.stats["memory_hits"] += 1
+            return image.copy()
+
+        image, meta = await render_pool.render_pool.run(self.read_disk, key)
+
+        if image is not None and time.time() - meta.get("fetched_at", 0) < self.ttl:
+            self.stats["disk_hits"] += 1
+            self.remember(url, image)
+            return image.copy()
+
+        image = await self.download(url, key, image, meta)
+        if image is not None:
+            self.remember(url, image)
+            return image.copy()
+        return None
+
+    async def download(self, url, key, cached_image, meta):
+        """GETs the sprite, conditionally if a stale copy exists. Falls back to the stale copy on errors."""
+        headers = {}
+        if cached_image is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        result = await http_pool.fetch(url, headers=headers)
+        if result is None:
+            return cached_image
+
+        if result.status == 304 and cached_image is not None:
+            self.stats["revalidated"] += 1
+            meta["fetched_at"] = time.time()
+            await render_pool.render_pool.run(self.touch_disk, key, meta)
+            return cached_image
+
+        if result.status != 200:
+            logger.warning(f"Sprite request for {url} returned HTTP {result.status}")
+            return cached_image
+
+        try:
+            image = await render_pool.render_pool.run(decode_image, result.body)
+        except Exception as e:
+            logger.error(f"Failed to decode image {url}: {e}")
+            return cached_image
+
+        self.stats["downloads"] += 1
+        new_meta = {
+            "url": url,
+            "etag": result.headers.get("ETag"),
+            "last_modified": result.headers.get("Last-Modified"),
+            "fetched_at": time.time()
+        }
+        await render_pool.render_pool.run(self.write_disk, key, image, new_meta)
+        return image
+
+
+sprite_cache = SpriteCache(
+    directory=config.SPRITE_CACHE_DIR,
+    max_disk_bytes=config.SPRITE_CACHE_MAX_MB * 1024 * 1024,
+    max_memory_items=config.SPRITE_MEMORY_CACHE_ITEMS,
+    ttl=config.SPRITE_CACHE_TTL
+)
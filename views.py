@@ -4,7 +4,10 @@ import logic
 import logging
 import io
 import asyncio
-import aiohttp
+import sprites
+import atlas
+import render_pool
+import metrics
 from PIL import Image
 
 logger = logging.getLogger("views")
@@ -33,6 +36,14 @@ MSG = {
     "draft_cancelled": "🛑 **El draft ha sido cancelado forzosamente por un administrador.**",
     "err_no_active_draft": "⚠️ No hay ningún draft activo en este momento.",
     "err_draft_role": "🚫 Solo los miembros con el rol 'Draft' pueden usar este comando.",
+    "draft_resumed": "♻️ **Draft reanudado** (ID: `{draft_id}`) • Ronda {round_num}, turno de **{player}**.",
+    "err_nothing_to_resume": "⚠️ No hay ningún draft interrumpido para reanudar en este hilo.",
+    "err_no_history": "📚 Todavía no hay drafts guardados en el historial.",
+    "pool_reloaded": "🔄 **Pool recargado** ({rows} Pokémon: +{added} / -{removed}, {retiered} con tier nuevo). Se aplica {when}.",
+    "pool_now": "ahora mismo",
+    "pool_next_turn": "al empezar el próximo turno",
+    "err_pool_invalid": "❌ El CSV no es válido, se mantiene el pool actual:\n```\n{problems}\n```",
+    "profile_armed": "🔬 El próximo draft de este hilo se perfilará (informes junto a `kokoloko.log` al terminar).",
 
     # --- Engine.py (Game Flow & Turns) ---
     "draft_complete": "🏁 **¡Draft Finalizado!**",
@@ -46,9 +57,11 @@ MSG = {
     "action_reroll": "🔄 **{clicker}** utilizó un reintento! (le quedan {left}).",
     "action_keep": "✅ **{clicker}** aceptó **{name}**.",
     "action_timeout": "⏰ Tiempo agotado: se aceptó automáticamente **{name}**.",
-    "err_api_fatal": "🚨 **FATAL:** Discord API is continuously rejecting our connection. The draft has paused.",
-    "err_bot_crash": "🚨 A bot error occurred. The draft loop has paused. Check `kokoloko.log` for details.",
+    "err_api_fatal": "🚨 **FATAL:** Discord API is continuously rejecting our connection. The draft has paused. Staff can continue it with `!resume_draft`.",
+    "err_bot_crash": "🚨 A bot error occurred. The draft loop has paused. Check `kokoloko.log` for details. Staff can continue it with `!resume_draft`.",
     "dm_out_of_rerolls": "🔔 **Aviso:** ¡Te has quedado sin reintentos! \nA partir de ahora tus Pokémon serán aceptados automáticamente y ya no recibirás recordatorios de turno.",
+    "dm_draft_over": "El Kokoloko Draft ha concluido. Aquí está el resumen de tu equipo final:",
+    "dm_failed": "⚠️ No se pudo enviar el resumen por DM a: {names}",
     "announce_round_summary": "📢 Terminó la Ronda #{round_num} del Kokoloko Draft y así van los equipos de los coaches hasta el momento:",
     "announce_draft_complete_parent": "🏁 **¡El Kokoloko Draft ha concluido!** Estos son los equipos finales de todos los coaches:"
 }
@@ -153,15 +166,21 @@ def create_decision_embed(player, pick_num, name, tier, pts_left, curr_left, rou
     return embed
 
 
-def create_personal_summary_embed(player, draft_state):
+def create_personal_summary_embed(player, session):
     """
     Generates a compact summary embed for a single player.
     Used by the mid-turn 'Resumen' button to avoid channel bloat.
+    Served from the session's render cache until the summary version changes; returns a copy, safe to modify.
     """
-    roster = draft_state["rosters"].get(player.id, [])
-    points_spent = draft_state["points"].get(player.id, 0)
+    embed = cached_render(session, ("personal", player.id), lambda: [build_personal_summary_embed(player, session)])
+    return embed[0]
+
+
+def build_personal_summary_embed(player, session):
+    roster = session.rosters.get(player.id, [])
+    points_spent = session.points.get(player.id, 0)
     points_left = config.MAX_POINTS - points_spent
-    rerolls_left = config.MAX_REROLLS - draft_state["rerolls"].get(player.id, 0)
+    rerolls_left = config.MAX_REROLLS - session.rerolls.get(player.id, 0)
 
     embed = discord.Embed(title=f"📊 Resumen Personal • {player.display_name}", color=0x3498db)
 
@@ -172,17 +191,22 @@ def create_personal_summary_embed(player, draft_state):
     return embed
 
 
-def create_summary_embed(draft_state):
+def create_summary_embed(session):
     """
     Generates a Paginated Summary (List of Embeds) to avoid Discord char limits.
     Sent to the parent channel periodically and at the end of the draft.
+    Served from the session's render cache until the summary version changes.
     """
-    if not draft_state["rosters"]:
+    if session is None or not session.rosters:
         return [discord.Embed(title="📊 Sin información", description="El Draft no ha iniciado aún.")]
+    return cached_render(session, "summary", lambda: build_summary_embeds(session))
+
+
+def build_summary_embeds(session):
     embeds = []
     unique_players = []
     seen = set()
-    for p in draft_state['order']:
+    for p in session.order:
         if p.id not in seen:
             seen.add(p.id)
             unique_players.append(p)
@@ -195,10 +219,10 @@ def create_summary_embed(draft_state):
         embed = discord.Embed(title=f"📊 Resumen del Draft ({page_num}/{total_pages})", color=0x3498db)
 
         for player in chunk:
-            roster = draft_state["rosters"].get(player.id, [])
-            points_spent = draft_state["points"].get(player.id, 0)
+            roster = session.rosters.get(player.id, [])
+            points_spent = session.points.get(player.id, 0)
             points_left = config.MAX_POINTS - points_spent
-            rerolls_left = config.MAX_REROLLS - draft_state["rerolls"].get(player.id, 0)
+            rerolls_left = config.MAX_REROLLS - session.rerolls.get(player.id, 0)
 
             p_list = "\n".join([f"• **{p['name']}** ({p['tier']})" for p in roster]) if roster else "*(Sin Pokémon)*"
             val = f"{p_list}\n-------------------\n💰 **Pts:** {points_spent} (Restantes: {points_left})\n🎲 **Reintentos:** {rerolls_left}"
@@ -209,43 +233,108 @@ def create_summary_embed(draft_state):
     return embeds
 
 
+def cached_render(session, key, build):
+    """
+    Returns copies of the embeds cached under `key`, rebuilding them only when session.summary_version
+    moved past the version they were rendered at (a roster, points, rerolls or the order changed).
+    """
+    entry = session.render_cache.get(key)
+    if entry is not None and entry[0] == session.summary_version:
+        session.render_hits += 1
+    else:
+        session.render_misses += 1
+        entry = session.render_cache[key] = (session.summary_version, build())
+    return [embed.copy() for embed in entry[1]]
+
+
+def get_render_cache_stats(session):
+    """Returns the summary render cache counters of a session (for logs and `!cache_stats`)."""
+    lookups = session.render_hits + session.render_misses
+    return {
+        "hits": session.render_hits,
+        "misses": session.render_misses,
+        "entries": len(session.render_cache),
+        "hit_rate": (session.render_hits / lookups) if lookups else 0.0
+    }
+
+
+def create_cache_stats_embed(session):
+    """Staff diagnostics: turn cache, summary render cache and sprite cache counters."""
+    embed = discord.Embed(title=f"🗃️ Cachés • Draft {session.draft_id or '-'}", color=0x95a5a6)
+    for label, stats in (("Turn cache", logic.get_cache_stats(session)),
+                         ("Render cache (resúmenes)", get_render_cache_stats(session))):
+        embed.add_field(name=label, value=f"✅ {stats['hits']} hits • ❌ {stats['misses']} misses\n"
+                                          f"📦 {stats['entries']} entradas • 🎯 {stats['hit_rate'] * 100:.1f}%", inline=False)
+    sprite_stats = sprites.sprite_cache.stats
+    embed.add_field(name="Sprite cache", value=" • ".join(f"{k}: {v}" for k, v in sprite_stats.items()), inline=False)
+    return embed
+
+
 # ==========================================
-# 🖼️ IMAGE PROCESSING (PILLOW)
+# 📚 DRAFT HISTORY STATS
 # ==========================================
 
-async def fetch_image(session, url):
-    """Asynchronously downloads a sprite image and returns a Pillow Image object."""
-    try:
-        async with session.get(url) as resp:
-            if resp.status == 200:
-                data = await resp.read()
-                return Image.open(io.BytesIO(data)).convert("RGBA")
-    except Exception as e:
-        logger.error(f"Failed to fetch image {url}: {e}")
-    return None
+def create_most_picked_embed(rows):
+    """Staff stats: [(pokemon, times picked, average round)] from history.most_picked()."""
+    lines = [f"**{i}.** {name} • {count}x • ronda media {avg_round:.1f}"
+             for i, (name, count, avg_round) in enumerate(rows, start=1)]
+    return discord.Embed(title="📚 Pokémon más elegidos", description="\n".join(lines), color=0x3498db)
 
 
-async def create_roster_image_file(roster, filename="roster.png"):
+def create_spend_embed(rows, member=None):
+    """Staff stats: [(round, average tier, picks)] from history.spend_per_slot()."""
+    title = f"💰 Gasto medio por slot • {member.display_name}" if member else "💰 Gasto medio por slot"
+    lines = [f"**Slot {round_num}:** {avg_tier:.1f} pts ({picks} picks)" for round_num, avg_tier, picks in rows]
+    total = sum(avg_tier for _, avg_tier, _ in rows)
+    embed = discord.Embed(title=title, description="\n".join(lines), color=0xf1c40f)
+    embed.set_footer(text=f"Equipo medio: {total:.0f} pts")
+    return embed
+
+
+def create_player_history_embed(member, drafts):
+    """Staff stats: a player's drafts from history.player_history(), newest first."""
+    embed = discord.Embed(title=f"📜 Historial de {member.display_name}", color=0x9b59b6)
+    for draft_id, finished_at, seat, rerolls, points, picks in drafts:
+        embed.add_field(name=f"Draft {draft_id} • <t:{int(finished_at)}:d>",
+                        value=f"Puesto #{seat} • {points} pts • {rerolls} rerolls\n{picks or '-'}"[:1024], inline=False)
+    return embed
+
+
+def create_perf_embed(summary):
+    """Staff diagnostics: metrics.summary() as one field per metric (count, mean, p50, p95)."""
+    embed = discord.Embed(title="📈 Rendimiento", color=0x1abc9c)
+    if not summary:
+        embed.description = "Todavía no hay métricas."
+    for name, series in summary.items():
+        lines = []
+        for labels, stats in series.items():
+            if isinstance(stats, dict):
+                lines.append(f"`{labels}` n={stats['count']} • media {stats['mean_ms']:.2f}ms • "
+                             f"p50 {stats['p50_ms']:.2f}ms • p95 {stats['p95_ms']:.2f}ms")
+            else:
+                lines.append(f"`{labels}` {stats:g}")
+        embed.add_field(name=name, value="\n".join(lines)[:1024], inline=False)
+    return embed
+
+
+# ==========================================
+# 🖼️ IMAGE PROCESSING (PILLOW)
+# ==========================================
+
+async def fetch_image(url):
     """
-    Downloads up to 10 sprites concurrently and stitches them into a 5x2 grid.
-    Returns a discord.File object ready to be attached to a Discord message.
+    Returns the sprite as a Pillow Image object.
+    Served from the sprite cache (memory LRU, then disk) and only downloaded on a miss or once the cached copy is stale.
     """
-    urls = [p['sprite'] for p in roster if p.get('sprite') and p['sprite'].startswith("http")]
-    if not urls:
-        return None
+    return await sprites.sprite_cache.get(url)
 
-    # Concurrently fetch all images to speed up generation
-    async with aiohttp.ClientSession() as session:
-        tasks = [fetch_image(session, url) for url in urls]
-        results = await asyncio.gather(*tasks)
-
-    images = [img for img in results if img]
-    if not images:
-        return None
 
+def compose_roster_grid(images, box_size=100, cols=5):
+    """
+    Stitches the sprites into a 5x2 grid and returns the encoded PNG buffer.
+    Blocking Pillow work: runs on the render pool, never directly on the event loop.
+    """
     # Calculate grid dimensions (5 columns, 2 rows max)
-    box_size = 100
-    cols = 5
     rows = (len(images) + cols - 1) // cols
     bg_width = cols * box_size
     bg_height = rows * box_size
@@ -253,9 +342,10 @@ async def create_roster_image_file(roster, filename="roster.png"):
     # Create transparent background
     grid = Image.new("RGBA", (bg_width, bg_height), (255, 255, 255, 0))
 
-    # Paste images into the grid
+    # Paste images into the grid (atlas tiles are already box_size and read-only, so they skip the resize)
     for idx, img in enumerate(images):
-        img.thumbnail((box_size, box_size))
+        if img.size != (box_size, box_size):
+            img.thumbnail((box_size, box_size))
         x = (idx % cols) * box_size + (box_size - img.width) // 2
         y = (idx // cols) * box_size + (box_size - img.height) // 2
         grid.paste(img, (x, y), img)
@@ -264,7 +354,35 @@ async def create_roster_image_file(roster, filename="roster.png"):
     buffer = io.BytesIO()
     grid.save(buffer, format="PNG")
     buffer.seek(0)
+    return buffer
+
+
+async def roster_sprite(pick):
+    """Atlas tile when the sprite atlas has it (no I/O at all), otherwise the cached/downloaded sprite."""
+    tile = atlas.sprite_atlas.tile(pick['name'], pick['sprite'])
+    if tile is not None:
+        return tile
+    return await fetch_image(pick['sprite'])
+
+
+async def create_roster_image_file(roster, filename="roster.png"):
+    """
+    Collects up to 10 sprites (atlas tiles first, concurrent fetches for the rest) and stitches them
+    into a 5x2 grid on the render pool.
+    Returns a discord.File object ready to be attached to a Discord message.
+    """
+    picks = [p for p in roster if p.get('sprite') and p['sprite'].startswith("http")]
+    if not picks:
+        return None
+
+    with metrics.render_seconds.time():
+        results = await asyncio.gather(*(roster_sprite(p) for p in picks))
+
+        images = [img for img in results if img]
+        if not images:
+            return None
 
+        buffer = await render_pool.render_pool.run(compose_roster_grid, images)
     return discord.File(fp=buffer, filename=filename)
 
 
@@ -380,7 +498,8 @@ class RollView(discord.ui.View):
 
         try:
             if not interaction.response.is_done():
-                await interaction.response.edit_message(view=self)
+                with metrics.api_call("interaction.edit_message"):
+                    await interaction.response.edit_message(view=self)
         except discord.errors.NotFound:
             # Handles errors if the 5-second GIF delay causes the token to expire
             logger.debug("Interaction token expired or double-clicked. Ignoring safely.")
@@ -426,7 +545,8 @@ class DraftView(discord.ui.View):
         try:
             # Check if Discord already processed this interaction (prevents double-click errors)
             if not interaction.response.is_done():
-                await interaction.response.edit_message(view=self)
+                with metrics.api_call("interaction.edit_message"):
+                    await interaction.response.edit_message(view=self)
         except discord.errors.NotFound:
             # If the token expired due to lag or timing sequences, ignore it safely
             logger.debug("Interaction token expired or double-clicked. Ignoring safely.")